@@ -1,27 +1,234 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from typing import Dict
+import asyncio
+import functools
+import logging
+import threading
 
-from chatbot_core import EgyptianTourismChatbot
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+from typing import Dict, Optional
+
+from chatbot_core import (CONFIG, AICore, EgyptianTourismChatbot, KnowledgeBase,
+                          get_llm_backend, get_llm_dispatcher, get_response_cache,
+                          get_turn_metrics)
+from llm_dispatcher import DispatcherBusy, QueueStatus
+from session_backends import MemoryStateBackend, RedisStateBackend, SQLiteStateBackend
+from session_store import SessionStore
+from stream_frames import FrameCoalescer
 
 app = FastAPI()
+logger = logging.getLogger("fahmy")
+
+# Shared knowledge base for chat sessions and the HTTP lookup endpoints
+KNOWLEDGE_BASE = None
+KNOWLEDGE_BASE_LOCK = threading.Lock()
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    global KNOWLEDGE_BASE
+
+    # Sessions are built in worker threads; load the dataset only once
+    with KNOWLEDGE_BASE_LOCK:
+        if KNOWLEDGE_BASE is None:
+            KNOWLEDGE_BASE = KnowledgeBase()
+
+    return KNOWLEDGE_BASE
+
+
+def create_state_backend():
+    """Session state backend selected by CONFIG['session_backend']"""
+    backend = CONFIG["session_backend"]
+    if backend == "sqlite":
+        return SQLiteStateBackend(CONFIG["session_db_path"])
+    if backend == "redis":
+        return RedisStateBackend.from_url(CONFIG["session_redis_url"],
+                                          ttl=CONFIG["session_state_ttl"])
+    return MemoryStateBackend(limit=CONFIG["session_archive_limit"])
+
+
+# session_id -> chatbot instance, bounded and restorable from saved state
+sessions = SessionStore(
+    factory=lambda: EgyptianTourismChatbot(get_knowledge_base()),
+    backend=create_state_backend(),
+    max_sessions=CONFIG["max_sessions"],
+    idle_ttl=CONFIG["session_idle_ttl"],
+    max_bytes=CONFIG["session_memory_limit_mb"] * 1024 * 1024,
+    state_ttl=CONFIG["session_state_ttl"],
+    write_batch=CONFIG["session_write_batch"]
+)
+
+
+# session_id -> the turn currently streaming for it
+active_turns: Dict[str, asyncio.Task] = {}
+
+
+# Output stage: token chunks -> WebSocket frames
+frame_coalescer = FrameCoalescer(
+    max_bytes=CONFIG["stream_frame_bytes"],
+    max_delay=CONFIG["stream_frame_delay"]
+)
+
 
-# session_id -> chatbot instance
-sessions: Dict[str, EgyptianTourismChatbot] = {}
+def landmark_payload(landmark: Dict) -> Dict:
+    return {
+        key: landmark[key]
+        for key in ("id", "name", "city", "subcategory", "rating", "address",
+                    "latitude", "longitude", "distance_km")
+    }
+
+
+def parse_location(payload: Dict):
+    location = payload.get("location")
+    if not isinstance(location, dict):
+        return None
+    try:
+        return float(location["lat"]), float(location["lon"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@app.on_event("startup")
+def warm_llm_backend():
+    # Start the LLM backend (and its Ollama health probe) once per process
+    AICore()
+
+
+@app.on_event("startup")
+async def start_session_maintenance():
+    async def sweep_forever():
+        while True:
+            await asyncio.sleep(CONFIG["session_sweep_interval"])
+            sessions.sweep()
+            await sessions.prune()
+
+    async def flush_forever():
+        # Write-behind: turns only queue their state, this saves it in batches
+        while True:
+            await asyncio.sleep(CONFIG["session_flush_interval"])
+            try:
+                await sessions.flush()
+            except Exception as e:
+                logger.warning("Session state flush failed: %r", e)
+
+    asyncio.create_task(sweep_forever())
+    asyncio.create_task(flush_forever())
+
+
+@app.on_event("shutdown")
+async def flush_sessions():
+    await sessions.flush()
 
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    # The key predates pluggable backends; existing health checks read "ollama"
+    return {"status": "ok", "ollama": get_llm_backend().status()}
+
+
+@app.get("/sessions/metrics")
+def session_metrics():
+    return sessions.metrics()
+
+
+@app.get("/llm/metrics")
+def llm_metrics():
+    return get_llm_dispatcher().metrics()
+
+
+@app.get("/stream/metrics")
+def stream_metrics():
+    return frame_coalescer.metrics()
+
+
+@app.get("/cache/metrics")
+def cache_metrics():
+    # Don't load the dataset just to report that the cache is off
+    if not CONFIG["response_cache"]:
+        return {"enabled": False}
+    return get_response_cache(get_knowledge_base()).metrics()
+
+
+@app.get("/metrics")
+def metrics():
+    """Turn latencies and throughput, plus every component's counters in one document"""
+    return {
+        "turns": get_turn_metrics().metrics(),
+        "llm": {**llm_metrics(), "backend": get_llm_backend().status()},
+        "sessions": session_metrics(),
+        "cache": cache_metrics(),
+        "stream": stream_metrics(),
+    }
+
+
+@app.get("/landmarks/nearby")
+def nearby_landmarks(lat: float, lon: float, radius_km: Optional[float] = None,
+                     category: Optional[str] = None, limit: int = 20):
+    if radius_km is None:
+        radius_km = CONFIG["nearby_radius_km"]
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or radius_km <= 0:
+        raise HTTPException(status_code=400, detail="Invalid coordinates or radius")
+
+    landmarks = get_knowledge_base().nearby(lat, lon, radius_km, category, limit)
+    return {"landmarks": [landmark_payload(lm) for lm in landmarks]}
+
+
+@app.get("/landmarks/nearest")
+def nearest_landmarks(lat: float, lon: float, k: int = 5, category: Optional[str] = None,
+                      max_km: float = 500.0):
+    """Up to k landmarks within max_km; empty when the point is farther than that from all of them"""
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or k <= 0 or max_km <= 0:
+        raise HTTPException(status_code=400, detail="Invalid coordinates, k or max_km")
+
+    landmarks = get_knowledge_base().nearest(lat, lon, k, category, max_km)
+    return {"landmarks": [landmark_payload(lm) for lm in landmarks]}
+
+
+async def stream_turn(websocket: WebSocket, chatbot: EgyptianTourismChatbot,
+                      session_id: str, message: str, location):
+    """Stream one answer; cancelled when the client leaves or sends a newer message"""
+    try:
+        stream = chatbot.process_query_stream(message, location)
+        async for chunk in frame_coalescer.frames(stream):
+            if isinstance(chunk, QueueStatus):
+                await websocket.send_text(f"__QUEUE__:{chunk.position}")
+            elif chunk:
+                await websocket.send_text(chunk)
+    except DispatcherBusy:
+        # Too many queued generations; the client may retry later
+        await websocket.send_text("__BUSY__")
+    except asyncio.CancelledError:
+        # Superseded: close the partial answer so the next one starts clean
+        if websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await websocket.send_text("__END__")
+            except Exception:
+                pass
+        raise
+    except Exception:
+        await websocket.send_text("⚠️ Something went wrong.")
+
+    await websocket.send_text("__END__")
+    sessions.touch(session_id)
+
+
+async def cancel_turn(session_id: str):
+    """Stop the answer still streaming for this session, if any, and wait for it to unwind"""
+    task = active_turns.pop(session_id, None)
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def forget_turn(session_id: str, task: asyncio.Task):
+    if active_turns.get(session_id) is task:
+        del active_turns[session_id]
 
 
 @app.websocket("/chat/{session_id}")
 async def chat_ws(websocket: WebSocket, session_id: str):
     await websocket.accept()
 
-    if session_id not in sessions:
-        sessions[session_id] = EgyptianTourismChatbot()
-
-    chatbot = sessions[session_id]
+    chatbot = await sessions.acquire(session_id)
+    turn = None
 
     try:
         while True:
@@ -31,14 +238,23 @@ async def chat_ws(websocket: WebSocket, session_id: str):
             if not message:
                 continue
 
-            for chunk in chatbot.process_query_stream(message):
-                if chunk:
-                    await websocket.send_text(chunk)
-
-            await websocket.send_text("__END__")
+            # A newer message replaces the answer in flight, on any connection
+            await cancel_turn(session_id)
+            turn = asyncio.create_task(
+                stream_turn(websocket, chatbot, session_id, message, parse_location(payload))
+            )
+            active_turns[session_id] = turn
+            turn.add_done_callback(functools.partial(forget_turn, session_id))
 
     except WebSocketDisconnect:
         pass
 
     except Exception:
         await websocket.send_text("⚠️ Something went wrong.")
+
+    finally:
+        if turn is not None and not turn.done():
+            # Nobody is listening any more; free the LLM slot
+            turn.cancel()
+            await asyncio.gather(turn, return_exceptions=True)
+        sessions.release(session_id)
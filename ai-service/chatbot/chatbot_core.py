@@ -2,19 +2,42 @@
 # Fully AI-Powered Egyptian Tourism Chatbot - Fahmy 
 # ============================================================================
 
+import asyncio
+import heapq
+import itertools
+import logging
 import os
 import re
+import threading
 import time
-import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 import json
-from datetime import datetime
-import requests  # Added for API calls
+from collections import deque
+from functools import lru_cache
 import sys
+
+from embedding_index import EmbeddingIndex, HashingEmbedder, OllamaEmbedder, dataset_fingerprint
+from fuzzy_index import FuzzyNameIndex, normalize_name
+from geo_index import GeoIndex
+from landmark_store import Landmark
+from llm_backends import LLMBackend, OllamaBackend, OpenAIBackend
+from llm_client import get_ollama_client
+from llm_dispatcher import CHAT, CLASSIFY, DispatcherBusy, LLMDispatcher, QueueStatus
+from prompt_builder import (PromptBuilder, clean_summary, count_tokens, digest_line,
+                            summary_line, summary_request)
+from records import SlottedRecord
+from response_cache import ResponseCache
+from retrieval import (filter_by_interests, interest_filters, normalize_category,
+                       normalize_city, reciprocal_rank_fusion)
+from search_index import STOPWORDS, InvertedIndex, tokenize
+from tourism_classifier import TourismClassifier
+from turn_metrics import TurnMetrics
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATASET_PATH = os.path.join(BASE_DIR, 'filtered_landmark_dataset.csv')
 
+logger = logging.getLogger("fahmy")
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -24,12 +47,80 @@ CONFIG = {
     "embedding_model": "nomic-embed-text",
     "conversation_history_limit": 8,
     "streaming_delay": 0.02,
-    "context_window": 3000,
-    "ollama_base_url": "http://localhost:11434/api",  # Default Ollama API URL
-    "ollama_timeout": 1000,  # Timeout in seconds
-    "use_api_directly": True  # Set to True to use direct API calls, False for ollama python library
+    "stream_frame_bytes": 64,  # Flush a WebSocket frame once this many bytes are buffered
+    "stream_frame_delay": 0.02,  # ...or once the oldest is this old; streams slower than this are not buffered
+    "context_window": 3000,  # Model context (num_ctx) the prompt and answer must fit in
+    "max_response_tokens": 800,  # Part of context_window kept free for the answer
+    "digest_tokens": 150,  # Prompt tokens for the digest of turns no longer sent verbatim
+    "digest_max_lines": 40,  # Digest lines kept per conversation
+    "prompt_history_messages": 6,  # Most recent messages sent verbatim, budget permitting
+    "rolling_summary": True,  # Fold older turns into a model-written running summary, in the background
+    "summary_keep_messages": 4,  # Most recent messages never folded into the summary
+    "summary_batch_messages": 4,  # Older unsummarized messages that trigger a fold
+    "summary_tokens": 120,  # Size cap of the running summary
+    "ollama_base_url": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/api"),  # Default Ollama API URL
+    "ollama_connect_timeout": 5,  # Seconds to establish a connection to Ollama
+    "ollama_read_timeout": 300,  # Seconds to wait for the next response bytes
+    "ollama_pool_size": 20,  # Max concurrent connections to Ollama
+    "ollama_keepalive_connections": 10,  # Idle connections kept open for reuse
+    "ollama_keepalive_expiry": 30,  # Seconds an idle connection stays open
+    "ollama_health_interval": 30,  # Seconds between background model availability checks
+    "ollama_keep_alive": os.getenv("OLLAMA_KEEP_ALIVE", "30m"),  # How long Ollama keeps the model (and its prompt cache) loaded
+    "llm_backend": os.getenv("LLM_BACKEND", "ollama"),  # "ollama", or "openai" for an OpenAI-compatible API
+    "llm_base_url": os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1"),  # OpenAI-compatible backend only
+    "llm_model": os.getenv("LLM_MODEL", "llama-3.1-8b-instant"),  # OpenAI-compatible backend only
+    "llm_api_key": os.getenv("LLM_API_KEY"),  # OpenAI-compatible backend only
+    "classifier_confidence_threshold": 0.75,  # Below this the local classifier defers to the LLM
+    "pipelined_generation": True,  # Tag the turn with the local classifier's label; never wait on an LLM check
+    "search_field_weights": {"name": 3.0, "city": 2.0, "subcategory": 1.0, "address": 0.5},
+    "embedding_backend": "ollama",  # "ollama", or "hashing" for the deterministic local stand-in
+    "embedding_index_path": os.path.join(BASE_DIR, "landmark_embeddings"),  # Built by scripts/build_landmark_embeddings.py
+    "embedding_ivf_threshold": 50000,  # Catalogs at least this large get an IVF partition
+    "semantic_min_similarity": 0.2,  # Cosine floor for semantic hits; tune per embedding model
+    "retrieval_candidates": 20,  # Candidates taken from each ranking before fusion
+    "retrieval_limit": 3,  # Landmarks placed in the prompt context
+    "rrf_k": 60,  # Reciprocal rank fusion damping constant
+    "retrieval_context_share": 0.25,  # Share of context_window the landmark context may use
+    "nearby_radius_km": 3.0,  # Farthest landmark offered for "what's near me" questions
+    "nearby_limit": 3,  # Nearby landmarks placed in the prompt context
+    "max_sessions": 1000,  # Live chat sessions kept in memory
+    "session_idle_ttl": 1800,  # Seconds before an idle session is archived
+    "session_memory_limit_mb": 256,  # Estimated memory ceiling for live sessions
+    "session_archive_limit": 10000,  # Saved sessions kept by the in-memory backend
+    "session_sweep_interval": 60,  # Seconds between idle session sweeps
+    "session_backend": os.getenv("SESSION_BACKEND", "memory"),  # "memory", "sqlite" or "redis"
+    "session_db_path": os.getenv("SESSION_DB_PATH", os.path.join(BASE_DIR, "sessions.sqlite3")),
+    "session_redis_url": os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0"),
+    "session_state_ttl": 7 * 24 * 3600,  # Seconds saved session state is kept
+    "session_flush_interval": 1.0,  # Seconds between write-behind flushes
+    "session_write_batch": 200,  # Pending writes that trigger an early flush
+    "response_cache": os.getenv("RESPONSE_CACHE", "0") == "1",  # Reuse answers to repeated questions (opt-in)
+    "response_cache_size": 1000,  # Cached answers kept (LRU)
+    "response_cache_ttl": 3600,  # Seconds a cached answer stays valid
+    "response_cache_similarity": None,  # e.g. 0.92: also match similar questions by embedding cosine
+    "response_cache_min_words": 2,  # Shorter messages are follow-ups and never cached
+    "llm_max_concurrent": int(os.getenv("LLM_MAX_CONCURRENT", "2")),  # Ollama calls running at once
+    "llm_max_queue": int(os.getenv("LLM_MAX_QUEUE", "64")),  # Waiting calls before new ones are rejected as busy
+    "llm_max_queue_per_session": 2,  # Waiting chat calls per session
+    "metrics_window": 1000,  # Recent turns that /metrics percentiles are computed over
+    "turn_log": os.getenv("TURN_LOG", "0") == "1",  # Log every chat turn as one JSON line
+    "log_level": os.getenv("LOG_LEVEL", "INFO")  # "fahmy" logger level; INFO includes per-turn prompt sizes
 }
 
+# uvicorn only configures its own loggers; give ours a handler so INFO lines
+# (prompt tokens per turn) are emitted rather than dropped
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_log_handler)
+    logger.setLevel(CONFIG["log_level"])
+    logger.propagate = False
+
+
+def _elapsed_ms(start: float) -> float:
+    """Milliseconds since a time.perf_counter() reading"""
+    return round((time.perf_counter() - start) * 1000, 2)
+
 # ============================================================================
 # KNOWLEDGE BASE - LOAD DATASET
 # ============================================================================
@@ -39,343 +130,344 @@ class KnowledgeBase:
     
     def __init__(self):
         self.landmarks = {}
-        self.embeddings = {}
+        self.embeddings = None
         self.cities = set()
         self.categories = set()
         self._load_dataset()
+        self.search_index = InvertedIndex(CONFIG["search_field_weights"]).build(
+            self.landmarks.items()
+        )
+        self.embedder = create_embedder()
+        # Retrieval and the response cache embed the same query; embed it once
+        self.embed_query = lru_cache(maxsize=256)(self._embed_query)
+        self._load_embeddings()
+        self.geo_index = self._build_geo_index()
+        self.fuzzy_index = FuzzyNameIndex(
+            list(self.landmarks.keys()),
+            [lm['name'] for lm in self.landmarks.values()]
+        )
+        self._build_lookup_tables()
+        # Gazetteer of every city, category and landmark name; read-only, so
+        # all sessions share it
+        self.classifier = TourismClassifier(
+            cities=self.cities,
+            categories=self.categories,
+            landmark_names=[lm['name'] for lm in self.landmarks.values()]
+        )
         
     def _load_dataset(self):
         """Load and process the tourism dataset"""
+        # Imported here: pandas alone takes longer to import than the rest of
+        # the engine, and only the dataset load needs it
+        import pandas as pd
+        
         try:
             df = pd.read_csv(DATASET_PATH)
             
             # Process each landmark
-            for idx, row in df.iterrows():
+            for idx, row in enumerate(df.itertuples(index=False)):
                 landmark_id = f"landmark_{idx}"
                 
-                # Create comprehensive description
-                description = self._create_landmark_description(row)
-                
-                # Store landmark
-                self.landmarks[landmark_id] = {
-                    "id": landmark_id,
-                    "name": str(row['name']),
-                    "city": str(row['city']),
-                    "subcategory": str(row['subcategory']) if pd.notna(row['subcategory']) else "Attraction",
-                    "rating": float(row['rating']) if pd.notna(row['rating']) else 0.0,
-                    "address": str(row['address']) if pd.notna(row['address']) else "",
-                    "latitude": row['latitude'] if pd.notna(row['latitude']) else None,
-                    "longitude": row['longitude'] if pd.notna(row['longitude']) else None,
-                    "description": description,
-                    "full_text": self._create_full_text(row)
-                }
+                # Store landmark; description and full_text render lazily
+                self.landmarks[landmark_id] = Landmark(
+                    landmark_id=landmark_id,
+                    name=str(row.name),
+                    city=str(row.city),
+                    subcategory=str(row.subcategory) if pd.notna(row.subcategory) else "Attraction",
+                    rating=float(row.rating) if pd.notna(row.rating) else None,
+                    address=str(row.address) if pd.notna(row.address) else "",
+                    latitude=float(row.latitude) if pd.notna(row.latitude) else None,
+                    longitude=float(row.longitude) if pd.notna(row.longitude) else None
+                )
                 
                 # Add to sets
-                self.cities.add(str(row['city']))
-                if pd.notna(row['subcategory']):
-                    self.categories.add(str(row['subcategory']))
+                self.cities.add(str(row.city))
+                if pd.notna(row.subcategory):
+                    self.categories.add(str(row.subcategory))
             
         except Exception as e:
             self.landmarks = {}
 
     
-    def _create_landmark_description(self, row):
-        """Create a rich description for a landmark"""
-        name = str(row['name'])
-        city = str(row['city'])
-        category = str(row['subcategory']) if pd.notna(row['subcategory']) else "attraction"
-        rating = row['rating'] if pd.notna(row['rating']) else "Not rated"
-        address = str(row['address'])[:100] if pd.notna(row['address']) else "Location varies"
-        
-        description = f"{name} is a {category.lower()} located in {city}. "
-        
-        if pd.notna(row['rating']):
-            description += f"It has a rating of {rating}/5. "
-        
-        # Add category-specific details
-        if "Museum" in category:
-            description += f"This museum showcases Egyptian culture and history. "
-        elif "Nature" in category or "Park" in category:
-            description += f"This natural attraction offers beautiful scenery. "
-        elif "Shopping" in category:
-            description += f"This shopping destination has various stores and goods. "
-        elif "Sights" in category:
-            description += f"This historical site is worth visiting. "
-        
-        description += f"The address is {address}."
-        return description
-    
-    def _create_full_text(self, row):
-        """Create full text representation for search"""
-        text = f"{row['name']} in {row['city']}. "
-        if pd.notna(row['subcategory']):
-            text += f"Category: {row['subcategory']}. "
-        if pd.notna(row['rating']):
-            text += f"Rating: {row['rating']}/5. "
-        if pd.notna(row['address']):
-            text += f"Address: {row['address'][:150]}. "
-        return text
+    def dataset_fingerprint(self) -> str:
+        """Identifies which landmark each landmark_N id stands for"""
+        return dataset_fingerprint(
+            (landmark_id, lm['name'], lm['city']) for landmark_id, lm in self.landmarks.items()
+        )
     
-    def search_landmarks(self, query: str, limit: int = 5) -> List[Dict]:
-        """Search landmarks by name or description"""
-        query = query.lower()
-        results = []
+    def _load_embeddings(self):
+        """Memory-map precomputed full_text embeddings if they match the embedder and dataset"""
+        path = CONFIG["embedding_index_path"]
+        if not os.path.exists(f"{path}.npy"):
+            return
         
-        for landmark in self.landmarks.values():
-            score = 0
-            
-            # Name match
-            if query in landmark['name'].lower():
-                score += 3
-            
-            # City match
-            if query in landmark['city'].lower():
-                score += 2
-            
-            # Category match
-            if query in landmark['subcategory'].lower():
-                score += 1
-            
-            # Description match
-            if query in landmark['description'].lower():
-                score += 1
-            
-            if score > 0:
-                results.append((score, landmark))
+        try:
+            index = EmbeddingIndex.load(path)
+        except Exception:
+            self.embeddings = None
+            return
         
-        # Sort by score
-        results.sort(key=lambda x: x[0], reverse=True)
-        return [item[1] for item in results[:limit]]
+        if index.model != self.embedder.model:
+            return
+        # Ids are row numbers; after a dataset change they name other landmarks
+        if index.ids != list(self.landmarks) or index.fingerprint != self.dataset_fingerprint():
+            logger.warning("Landmark embeddings were built for another dataset; semantic search is off "
+                           "until scripts/build_landmark_embeddings.py is re-run")
+            return
+        self.embeddings = index
     
-    def get_landmarks_by_city(self, city: str) -> List[Dict]:
-        """Get all landmarks in a city"""
-        city_lower = city.lower()
-        return [lm for lm in self.landmarks.values() if city_lower in lm['city'].lower()]
+    def _build_geo_index(self) -> GeoIndex:
+        """Grid index over every landmark that has coordinates"""
+        located = [
+            lm for lm in self.landmarks.values()
+            if lm['latitude'] is not None and lm['longitude'] is not None
+        ]
+        return GeoIndex(
+            ids=[lm['id'] for lm in located],
+            lats=[lm['latitude'] for lm in located],
+            lons=[lm['longitude'] for lm in located],
+            categories=[lm['subcategory'] for lm in located]
+        )
     
-    def get_landmarks_by_category(self, category: str) -> List[Dict]:
-        """Get all landmarks in a category"""
-        category_lower = category.lower()
-        return [lm for lm in self.landmarks.values() if category_lower in lm['subcategory'].lower()]
-
-# ============================================================================
-# AI CORE - OLLAMA INTEGRATION WITH API
-# ============================================================================
+    def _build_lookup_tables(self):
+        """City and category tables keyed by normalized name, each presorted by rating"""
+        by_city = {}
+        by_category = {}
+        for lm in self.landmarks.values():
+            by_city.setdefault(normalize_city(lm['city']), []).append(lm)
+            by_category.setdefault(normalize_category(lm['subcategory']), []).append(lm)
+        
+        self.by_city = {key: _sorted_by_rating(lms) for key, lms in by_city.items()}
+        self.by_category = {key: _sorted_by_rating(lms) for key, lms in by_category.items()}
+    
+    def search_landmarks(self, query: str, limit: int = 5) -> List[Dict]:
+        """Search landmarks by name, city, category and address (BM25 ranked)"""
+        return [self.landmarks[landmark_id] for landmark_id, _ in self.search_index.search(query, limit)]
+    
+    def search_fuzzy(self, query: str, limit: int = 5) -> List[Dict]:
+        """Match misspelled or variant landmark names in a message.
 
-class AICore:
-    """Core AI functionality using Ollama API"""
+        Only words the lexical index has never seen are looked up, alone and
+        with their neighbours, so correctly spelled messages cost nothing here.
+        """
+        words = [w for w in normalize_name(query).split() if w not in STOPWORDS]
+        spans = []
+        for i, word in enumerate(words):
+            folded = tokenize(word)
+            if len(word) < 4 or (folded and folded[0] in self.search_index.postings):
+                continue
+            spans.append(word)
+            if i > 0:
+                spans.append(f"{words[i - 1]} {word}")
+            if i + 1 < len(words):
+                spans.append(f"{word} {words[i + 1]}")
+        
+        # Names matched by more spans rank first, then by closest edit distance
+        matches = {}
+        for span in spans:
+            for landmark_id, distance in self.fuzzy_index.search(span, limit):
+                spans_matched, best = matches.get(landmark_id, (0, distance))
+                matches[landmark_id] = (spans_matched + 1, min(best, distance))
+        
+        ranked = sorted(matches.items(), key=lambda item: (-item[1][0], item[1][1]))[:limit]
+        return [self.landmarks[landmark_id] for landmark_id, _ in ranked]
     
-    def __init__(self):
-        self.model = CONFIG["ollama_model"]
-        self.base_url = CONFIG["ollama_base_url"]
-        self.timeout = CONFIG["ollama_timeout"]
-        self.use_api_directly = CONFIG["use_api_directly"]
-        self.available = False
-        self._init_ollama()
-    
-    def _init_ollama(self):
+    def _embed_query(self, query: str) -> np.ndarray:
+        return self.embedder.embed([query])[0]
+    
+    def search_semantic(self, query: str, limit: int = 5) -> List[Dict]:
+        """Search landmarks by embedding similarity to the query"""
+        if self.embeddings is None:
+            return []
+        
         try:
-            models_url = f"{self.base_url}/tags"
-            response = requests.get(models_url, timeout=5)
+            query_vector = self.embed_query(query)
+        except Exception:
+            return []
+        
+        results = self.embeddings.search(query_vector, limit)
+        return [
+            self.landmarks[landmark_id] for landmark_id, score in results
+            if score >= CONFIG["semantic_min_similarity"] and landmark_id in self.landmarks
+        ]
+    
+    def nearby(self, lat: float, lon: float, radius_km: float = None,
+               category: str = None, limit: int = 10) -> List[Dict]:
+        """Landmarks within radius_km of a point, closest first, with distance_km"""
+        radius_km = radius_km or CONFIG["nearby_radius_km"]
+        results = self.geo_index.nearby(lat, lon, radius_km, category, limit)
+        return [dict(self.landmarks[landmark_id], distance_km=round(d, 3)) for landmark_id, d in results]
+    
+    def nearest(self, lat: float, lon: float, k: int = 5, category: str = None,
+                max_km: float = 500.0) -> List[Dict]:
+        """The k closest landmarks within max_km of a point, with distance_km"""
+        results = self.geo_index.nearest(lat, lon, k, category, max_radius_km=max_km)
+        return [dict(self.landmarks[landmark_id], distance_km=round(d, 3)) for landmark_id, d in results]
+    
+    def get_landmarks_by_city(self, city: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[Dict, ...]:
+        """Landmarks in a city (English or Arabic name), best rated first"""
+        return _paginate(_table_lookup(self.by_city, normalize_city(city)), offset, limit)
+    
+    def get_landmarks_by_category(self, category: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[Dict, ...]:
+        """Landmarks in a category, best rated first"""
+        return _paginate(_table_lookup(self.by_category, normalize_category(category)), offset, limit)
+    
+    def get_landmarks_for_interests(self, interests: List[str], limit: Optional[int] = None) -> Tuple[Dict, ...]:
+        """Best rated landmarks matching the cities and categories in extracted interests"""
+        cities, categories = interest_filters(interests)
+        
+        if cities:
+            pool = heapq.merge(*(self.by_city.get(c, ()) for c in cities), key=_rating_key)
+            matches = (lm for lm in pool if not categories or normalize_category(lm['subcategory']) in categories)
+        elif categories:
+            matches = heapq.merge(*(self.by_category.get(c, ()) for c in categories), key=_rating_key)
+        else:
+            return ()
+        
+        return tuple(itertools.islice(matches, limit))
 
-            if response.status_code != 200:
-                self.available = False
-                return
 
-            models = response.json().get("models", [])
-            model_names = [m["name"] for m in models]
+def _rating_key(landmark: Dict) -> float:
+    return -landmark['rating']
 
-            if self.model not in model_names:
-                print(f"⚠️ Model '{self.model}' not found. Available:", model_names)
-                self.available = False
-                return
 
-            self.available = True
+def _sorted_by_rating(landmarks: List[Dict]) -> Tuple[Dict, ...]:
+    return tuple(sorted(landmarks, key=_rating_key))
 
-        except Exception as e:
-            print("❌ Ollama init failed:", e)
-            self.available = False
 
+def _table_lookup(table: Dict[str, Tuple[Dict, ...]], key: str) -> Tuple[Dict, ...]:
+    """O(1) exact lookup; partial names ("museum") merge every key containing them"""
+    if key in table:
+        return table[key]
+    keys = [k for k in table if key and key in k]
+    if len(keys) == 1:
+        return table[keys[0]]
+    return tuple(heapq.merge(*(table[k] for k in keys), key=_rating_key))
+
+
+def _paginate(landmarks: Tuple[Dict, ...], offset: int, limit: Optional[int]) -> Tuple[Dict, ...]:
+    end = None if limit is None else offset + limit
+    return landmarks[offset:end]
+
+def create_embedder():
+    """Embedder selected by CONFIG["embedding_backend"]"""
+    if CONFIG["embedding_backend"] == "hashing":
+        return HashingEmbedder()
+    return OllamaEmbedder(
+        CONFIG["ollama_base_url"],
+        CONFIG["embedding_model"],
+        timeout=(CONFIG["ollama_connect_timeout"], CONFIG["ollama_read_timeout"])
+    )
+
+
+_RESPONSE_CACHE = None
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache(knowledge_base: KnowledgeBase) -> Optional[ResponseCache]:
+    """Process-wide response cache, or None unless CONFIG["response_cache"] is on"""
+    global _RESPONSE_CACHE
     
-    def _api_chat_stream(self, messages: List[Dict], options: Dict = None):
-        """Make streaming API call to Ollama"""
-        try:
-            chat_url = f"{self.base_url}/chat"
-            
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "stream": True,
-                "options": options or {
-                    "temperature": 0.8,
-                    "num_predict": 800,
-                    "top_p": 0.9,
-                    "repeat_penalty": 1.1
-                }
-            }
-            
-            response = requests.post(
-                chat_url, 
-                json=payload,
-                timeout=self.timeout,
-                stream=True
-            )
-            
-            if response.status_code == 200:
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            json_response = json.loads(line)
-                            if 'message' in json_response:
-                                content = json_response['message'].get('content', '')
-                                if content:
-                                    yield content
-                        except json.JSONDecodeError:
-                            continue
-            else:
-                yield None
-                
-        except Exception:
-            yield None
-    
-    def _api_chat(self, messages: List[Dict], options: Dict = None) -> Optional[str]:
-        """Make direct API call to Ollama"""
-        try:
-            chat_url = f"{self.base_url}/chat"
-            
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "stream": False,
-                "options": options or {
-                    "temperature": 0.8,
-                    "num_predict": 800,
-                    "top_p": 0.9,
-                    "repeat_penalty": 1.1
-                }
-            }
-            
-            response = requests.post(
-                chat_url, 
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('message', {}).get('content', '')
-            else:
-                return None
-                
-        except Exception:
-            return None
-    
-    def _library_chat(self, messages: List[Dict], options: Dict = None) -> Optional[str]:
-        """Use ollama python library"""
-        try:
-            import ollama
-            
-            response = ollama.chat(
-                model=self.model,
-                messages=messages,
-                options=options or {
-                    "temperature": 0.8,
-                    "num_predict": 800,
-                    "top_p": 0.9,
-                    "repeat_penalty": 1.1
-                }
+    if not CONFIG["response_cache"]:
+        return None
+    with _RESPONSE_CACHE_LOCK:
+        if _RESPONSE_CACHE is None:
+            _RESPONSE_CACHE = ResponseCache(
+                max_entries=CONFIG["response_cache_size"],
+                ttl=CONFIG["response_cache_ttl"],
+                similarity_threshold=CONFIG["response_cache_similarity"],
+                embed=knowledge_base.embed_query,
+                min_words=CONFIG["response_cache_min_words"]
             )
-            
-            return response['message']['content']
-            
-        except Exception:
-            return None
+    return _RESPONSE_CACHE
+
+
+_LLM_BACKEND = None
+_LLM_BACKEND_LOCK = threading.Lock()
+
+
+def get_llm_backend() -> LLMBackend:
+    """Process-wide chat model backend selected by CONFIG["llm_backend"]"""
+    global _LLM_BACKEND
     
-    def generate_response_stream(self, 
-                                 user_input: str, 
-                                 context: str = "", 
-                                 conversation_history: List[Dict] = None,
-                                 temperature: float = 0.8):
-        """Generate AI response with streaming"""
-        if not self.available:
-            yield None
-            return
-        
-        try:
-            # Prepare messages
-            messages = []
-            
-            # System prompt with context
-            system_prompt = self._create_system_prompt(context)
-            messages.append({"role": "system", "content": system_prompt})
-            
-            # Add conversation history
-            if conversation_history:
-                messages.extend(conversation_history[-6:])
-            
-            # Add current user input
-            messages.append({"role": "user", "content": user_input})
-            
-            # Prepare options
-            options = {
-                "temperature": temperature,
-                "num_predict": 800,
-                "top_p": 0.9,
-                "repeat_penalty": 1.1
-            }
-            
-            # Stream response
-            if self.use_api_directly:
-                for chunk in self._api_chat_stream(messages, options):
-                    yield chunk
+    with _LLM_BACKEND_LOCK:
+        if _LLM_BACKEND is None:
+            if CONFIG["llm_backend"] == "openai":
+                _LLM_BACKEND = OpenAIBackend(
+                    CONFIG["llm_base_url"],
+                    CONFIG["llm_model"],
+                    api_key=CONFIG["llm_api_key"],
+                    connect_timeout=CONFIG["ollama_connect_timeout"],
+                    read_timeout=CONFIG["ollama_read_timeout"],
+                    pool_size=CONFIG["ollama_pool_size"],
+                    keepalive_connections=CONFIG["ollama_keepalive_connections"],
+                    keepalive_expiry=CONFIG["ollama_keepalive_expiry"]
+                )
             else:
-                # Fallback to non-streaming
-                response = self._library_chat(messages, options)
-                if response:
-                    # Simulate streaming
-                    for char in response:
-                        yield char
-                        time.sleep(0.01)
-            
-        except Exception:
-            yield None
+                client = get_ollama_client(
+                    CONFIG["ollama_base_url"],
+                    CONFIG["ollama_model"],
+                    health_interval=CONFIG["ollama_health_interval"],
+                    connect_timeout=CONFIG["ollama_connect_timeout"],
+                    read_timeout=CONFIG["ollama_read_timeout"],
+                    pool_size=CONFIG["ollama_pool_size"],
+                    keepalive_connections=CONFIG["ollama_keepalive_connections"],
+                    keepalive_expiry=CONFIG["ollama_keepalive_expiry"]
+                )
+                _LLM_BACKEND = OllamaBackend(client, keep_alive=CONFIG["ollama_keep_alive"])
+    return _LLM_BACKEND
+
+
+_LLM_DISPATCHER = None
+
+
+def get_llm_dispatcher() -> LLMDispatcher:
+    """Process-wide admission control shared by every session's Ollama calls"""
+    global _LLM_DISPATCHER
     
-    def generate_response(self, 
-                         user_input: str, 
-                         context: str = "", 
-                         conversation_history: List[Dict] = None,
-                         temperature: float = 0.8) -> Optional[str]:
-        """Generate AI response (non-streaming fallback)"""
-        if not self.available:
-            return None
-        
-        try:
-            messages = []
-            system_prompt = self._create_system_prompt(context)
-            messages.append({"role": "system", "content": system_prompt})
-            
-            if conversation_history:
-                messages.extend(conversation_history[-6:])
-            
-            messages.append({"role": "user", "content": user_input})
-            
-            options = {
-                "temperature": temperature,
-                "num_predict": 800,
-                "top_p": 0.9,
-                "repeat_penalty": 1.1
-            }
-            
-            if self.use_api_directly:
-                return self._api_chat(messages, options)
-            else:
-                return self._library_chat(messages, options)
-            
-        except Exception:
-            return None
+    if _LLM_DISPATCHER is None:
+        _LLM_DISPATCHER = LLMDispatcher(
+            max_concurrent=CONFIG["llm_max_concurrent"],
+            max_queue=CONFIG["llm_max_queue"],
+            max_queue_per_session=CONFIG["llm_max_queue_per_session"]
+        )
+    return _LLM_DISPATCHER
+
+
+_TURN_METRICS = None
+
+
+def get_turn_metrics() -> TurnMetrics:
+    """Process-wide aggregate of chat turn timings, logging turns if CONFIG["turn_log"]"""
+    global _TURN_METRICS
     
-    def _create_system_prompt(self, context: str) -> str:
-        """Create system prompt for the AI"""
-        prompt = """You are Fahmy (فهمي), an Egyptian Tourism Guide AI. Your name means "understanding" in Arabic.
+    if _TURN_METRICS is None:
+        turn_log = None
+        if CONFIG["turn_log"]:
+            turn_log = logging.getLogger("fahmy.turns")
+            if not turn_log.handlers:
+                handler = logging.StreamHandler()
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                turn_log.addHandler(handler)
+                turn_log.setLevel(logging.INFO)
+                turn_log.propagate = False
+        _TURN_METRICS = TurnMetrics(window=CONFIG["metrics_window"], log=turn_log)
+    return _TURN_METRICS
+
+
+async def replay_response(text: str):
+    """Stream a stored answer word by word, like a generated one"""
+    for piece in re.findall(r"\s*\S+\s*$|\s*\S+", text):
+        yield piece
+
+# ============================================================================
+# PERSONA
+# ============================================================================
+
+# Sent first in every chat request, unchanged, so the prompt prefix (and
+# Ollama's KV cache for it) is shared across turns; per-turn context goes
+# after the history
+PERSONA_PROMPT = """You are Fahmy (فهمي), an Egyptian Tourism Guide AI. Your name means "understanding" in Arabic.
 
 CORE IDENTITY:
 - You're warm, genuine, and deeply passionate about Egypt
@@ -408,10 +500,8 @@ CONVERSATION STYLE:
 - Make connections between topics naturally
 - Show genuine interest in what the user wants
 
-KNOWLEDGE BASE:
-{context}
-
 HOW TO USE THE KNOWLEDGE:
+- Each user message comes with a KNOWLEDGE BASE note of relevant landmarks; rely on it
 - Weave facts naturally into conversation
 - Don't just dump information - tell stories
 - Connect landmarks to broader Egyptian culture
@@ -435,10 +525,181 @@ REMEMBER:
 - ALWAYS match the user's language
 - Make Egypt come alive through your words
 - Be the friend who knows Egypt inside and out"""
+
+# ============================================================================
+# AI CORE - LLM INTEGRATION
+# ============================================================================
+
+# Generation options (Ollama names; backends translate them) for calls that pass none
+DEFAULT_OPTIONS = {
+    "temperature": 0.8,
+    "num_predict": 800,
+    "top_p": 0.9,
+    "repeat_penalty": 1.1
+}
+
+class AICore:
+    """Core AI functionality over the configured LLM backend"""
+    
+    def __init__(self):
+        self.backend = get_llm_backend()
+        self.model = self.backend.model
+        self.base_url = self.backend.base_url
+        self.prompt_builder = PromptBuilder(
+            context_window=CONFIG["context_window"],
+            response_tokens=CONFIG["max_response_tokens"],
+            digest_tokens=CONFIG["digest_tokens"],
+            max_history=CONFIG["prompt_history_messages"]
+        )
+        # Token accounting of the most recent prompt
+        self.last_prompt = {}
+        # Each chatbot owns one AICore, so it doubles as the fair-queueing key
+        self.dispatcher = get_llm_dispatcher()
+        self.dispatch_key = id(self)
+    
+    @property
+    def available(self) -> bool:
+        """Cached model availability from the shared backend"""
+        return self.backend.available
+    
+    async def _chat_stream(self, messages: List[Dict], options: Dict = None):
+        """Streaming chat call; yields QueueStatus while waiting for a slot.
+
+        Closing or cancelling the generator closes the backend stream, which
+        closes the HTTP response so the model stops generating.
+        """
+        ticket = self.dispatcher.enqueue(self.dispatch_key, CHAT)
+        try:
+            async for position in ticket.positions():
+                yield QueueStatus(position)
+            self.last_prompt["queue_ms"] = _elapsed_ms(ticket.enqueued)
+            
+            usage = {}
+            async for chunk in self.backend.stream_chat(messages, options or DEFAULT_OPTIONS, usage):
+                yield chunk
+            # Tokens the model actually prefilled (cached prefix excluded) and generated
+            self.last_prompt["evaluated_tokens"] = usage.get("evaluated_tokens")
+            self.last_prompt["completion_tokens"] = usage.get("completion_tokens")
+                
+        except Exception as e:
+            logger.warning("LLM stream failed: %r", e)
+            yield None
+        finally:
+            ticket.release()
+    
+    async def _chat(self, messages: List[Dict], options: Dict = None,
+                    kind: str = CHAT) -> Optional[str]:
+        """Whole-answer chat call once the dispatcher grants a slot"""
+        ticket = self.dispatcher.enqueue(self.dispatch_key, kind)
+        try:
+            await ticket.wait()
+            return await self.backend.chat(messages, options or DEFAULT_OPTIONS)
+                
+        except Exception as e:
+            logger.warning("LLM call failed: %r", e)
+            return None
+        finally:
+            ticket.release()
+    
+    def _build_messages(self, user_input: str, context: str,
+                        conversation_history: Optional[List[Dict]],
+                        digest: Optional[List[str]], summary: str = "") -> List[Dict]:
+        """Persona, history, then summary/digest/context and the input, fitted to the context window"""
+        messages, stats = self.prompt_builder.build(
+            self._create_system_prompt(), user_input, conversation_history, digest,
+            context=self._create_context_prompt(context), summary=summary
+        )
+        self.last_prompt = stats
+        logger.info(
+            "prompt_tokens=%d budget=%d system=%d context=%d summary=%d digest=%d history=%d user=%d "
+            "history_sent=%d history_dropped=%d",
+            stats["prompt_tokens"], stats["budget"], stats["system_tokens"], stats["context_tokens"],
+            stats["summary_tokens"], stats["digest_tokens"], stats["history_tokens"], stats["user_tokens"],
+            stats["history_sent"], stats["history_dropped"]
+        )
+        return messages
+    
+    def _generation_options(self, temperature: float) -> Dict:
+        return {
+            "temperature": temperature,
+            "num_predict": CONFIG["max_response_tokens"],
+            "num_ctx": CONFIG["context_window"],
+            "top_p": 0.9,
+            "repeat_penalty": 1.1
+        }
+    
+    async def generate_response_stream(self, 
+                                       user_input: str, 
+                                       context: str = "", 
+                                       conversation_history: List[Dict] = None,
+                                       temperature: float = 0.8,
+                                       digest: List[str] = None,
+                                       summary: str = ""):
+        """Generate AI response with streaming"""
+        if not self.available:
+            yield None
+            return
+        
+        try:
+            messages = self._build_messages(user_input, context, conversation_history, digest, summary)
+            options = self._generation_options(temperature)
+            
+            # Stream response
+            async for chunk in self._chat_stream(messages, options):
+                yield chunk
+            
+        except DispatcherBusy:
+            # Backpressure goes up to the caller instead of a silent fallback
+            raise
+        except Exception:
+            yield None
+    
+    async def generate_response(self, 
+                                user_input: str, 
+                                context: str = "", 
+                                conversation_history: List[Dict] = None,
+                                temperature: float = 0.8,
+                                digest: List[str] = None,
+                                summary: str = "") -> Optional[str]:
+        """Generate AI response (non-streaming fallback)"""
+        if not self.available:
+            return None
         
-        return prompt.format(context=context if context else "General Egyptian tourism knowledge available.")
+        try:
+            messages = self._build_messages(user_input, context, conversation_history, digest, summary)
+            options = self._generation_options(temperature)
+            
+            return await self._chat(messages, options)
+            
+        except Exception:
+            return None
+    
+    def _create_system_prompt(self) -> str:
+        """Static persona prompt; byte-identical every turn so Ollama can reuse its KV cache"""
+        return PERSONA_PROMPT
     
-    def is_tourism_related(self, text: str, knowledge_base: KnowledgeBase) -> Tuple[bool, str]:
+    def _create_context_prompt(self, context: str) -> str:
+        """Per-turn knowledge, sent after the conversation history"""
+        return "KNOWLEDGE BASE:\n" + (context if context else "General Egyptian tourism knowledge available.")
+    
+    async def summarize(self, previous: str, lines: List[str]) -> Optional[str]:
+        """Fold messages into the running summary; background work, so only
+        when an LLM slot is free right now (None otherwise, retried next turn)"""
+        ticket = self.dispatcher.try_acquire(self.dispatch_key)
+        if ticket is None:
+            return None
+        try:
+            options = {"temperature": 0.2, "num_predict": CONFIG["summary_tokens"],
+                       "num_ctx": CONFIG["context_window"]}
+            messages = summary_request(previous, lines, CONFIG["summary_tokens"])
+            return clean_summary(await self.backend.chat(messages, options), CONFIG["summary_tokens"]) or None
+        except Exception as e:
+            logger.warning("Summary update failed: %r", e)
+            return None
+        finally:
+            ticket.release()
+    
+    async def is_tourism_related(self, text: str, knowledge_base: KnowledgeBase) -> Tuple[bool, str]:
         """Use AI to determine if query is tourism-related"""
         if not self.available:
             return False, "no_ai"
@@ -458,9 +719,11 @@ Consider it tourism-related if it's about:
 Respond with ONLY one word: YES or NO"""
 
             messages = [{"role": "user", "content": prompt}]
-            options = {"temperature": 0.1, "num_predict": 10}
+            # Same num_ctx as chat requests; a different value makes Ollama reload the model
+            options = {"temperature": 0.1, "num_predict": 10, "num_ctx": CONFIG["context_window"]}
             
-            response_text = self._api_chat(messages, options)
+            # Busy dispatcher raises here; the caller falls back to the local classifier
+            response_text = await self._chat(messages, options, kind=CLASSIFY)
             
             if response_text:
                 result = response_text.strip().upper()
@@ -471,42 +734,146 @@ Respond with ONLY one word: YES or NO"""
         except Exception:
             return False, "error"
     
-    def check_health(self) -> bool:
-        """Check if Ollama API is healthy"""
-        try:
-            health_url = self.base_url.replace('/api', '')
-            response = requests.get(health_url, timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+    async def check_health(self) -> bool:
+        """Check if the LLM API is healthy"""
+        return await self.backend.check_health()
 
 # ============================================================================
 # CONVERSATION MANAGER
 # ============================================================================
 
+# Whole words or phrases only: "nearly" or "حوالي" (about, approximately)
+# say nothing about where the user is
+NEARBY_PATTERN = re.compile(
+    r"\b(?:near|nearby|nearest|close to me|around me|around here|walking distance"
+    r"|près|proche|قريب|قريبة|القريب|القريبة|جنبي|حواليا|حوالين)\b",
+    re.IGNORECASE
+)
+
+
+class HistoryEntry(SlottedRecord):
+    """One message in the conversation history; m['role'] style access still works"""
+    
+    __slots__ = ("role", "content", "timestamp")
+    
+    FIELDS = __slots__
+    
+    def __init__(self, role: str, content: str, timestamp=None):
+        self.role = role
+        self.content = content
+        # Epoch seconds; formatted only if someone needs to read it
+        self.timestamp = time.time() if timestamp is None else timestamp
+    
+    def __repr__(self) -> str:
+        return f"HistoryEntry({self.role!r}, {self.content[:30]!r})"
+
+
 class ConversationManager:
     """Manage conversation flow and context"""
     
     def __init__(self):
-        self.history = []
+        # Bounded: the oldest message drops out (into the digest) as a new one arrives
+        self.history: Deque[HistoryEntry] = deque(maxlen=CONFIG["conversation_history_limit"] * 2)
+        # One-line gists of unsummarized turns that fell out of history, oldest first
+        self.digest: Deque[str] = deque(maxlen=CONFIG["digest_max_lines"])
+        # Model-written summary of every message before index `summarized`;
+        # indexes count all messages of the conversation, including evicted ones
+        self.summary = ""
+        self.summarized = 0
+        self.message_count = 0
         self.context = ""
         self.user_interests = []
         self.conversation_mode = "general"
+        # Stats of the most recent retrieve_landmarks call
+        self.last_retrieval = {}
+        # Ids of the landmarks placed in the latest context
+        self.context_landmark_ids = []
+        # (lat, lon) shared by the client, used for "near me" questions
+        self.user_location = None
+    
+    def export_state(self) -> Dict:
+        """Compact state needed to resume the conversation"""
+        return {
+            "history": [[m.role, m.content, m.timestamp] for m in self.history],
+            "digest": list(self.digest),
+            "summary": self.summary,
+            # How many of the saved history messages the summary already covers
+            "summarized": max(0, self.summarized - self._history_start()),
+            "interests": self.user_interests,
+            "mode": self.conversation_mode,
+            "location": list(self.user_location) if self.user_location else None
+        }
+    
+    def estimated_bytes(self) -> int:
+        """Rough memory held by this conversation's own messages and text"""
+        texts = itertools.chain(self.digest, self.user_interests, (self.summary, self.context))
+        return (sum(sys.getsizeof(m) + sys.getsizeof(m.content) for m in self.history)
+                + sum(sys.getsizeof(text) for text in texts))
+    
+    def restore_state(self, state: Dict):
+        self.history.clear()
+        self.history.extend(
+            HistoryEntry(role, content, timestamp)
+            for role, content, timestamp in state.get("history", [])
+        )
+        self.digest.clear()
+        self.digest.extend(state.get("digest", []))
+        self.summary = state.get("summary", "")
+        self.summarized = state.get("summarized", 0)
+        self.message_count = len(self.history)
+        self.user_interests = list(state.get("interests", []))
+        self.conversation_mode = state.get("mode", "general")
+        location = state.get("location")
+        self.user_location = tuple(location) if location else None
         
     def add_message(self, role: str, content: str):
         """Add message to history"""
-        self.history.append({
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        if len(self.history) > CONFIG["conversation_history_limit"] * 2:
-            self.history = self.history[-CONFIG["conversation_history_limit"] * 2:]
+        if len(self.history) == self.history.maxlen and self._history_start() >= self.summarized:
+            # About to fall out of history and not summarized yet; keep its gist
+            self.digest.append(digest_line(self.history[0]))
+        self.history.append(HistoryEntry(role, content))
+        self.message_count += 1
+    
+    def _history_start(self) -> int:
+        """Conversation index of the oldest message still in history"""
+        return self.message_count - len(self.history)
+    
+    def prompt_history(self) -> List[HistoryEntry]:
+        """History messages the running summary does not cover yet"""
+        skip = max(0, self.summarized - self._history_start())
+        return list(itertools.islice(self.history, skip, None))
+    
+    def pending_summary(self, keep: int, batch: int) -> Optional[Tuple[List[str], int, str]]:
+        """(summarizer input lines, index they run up to, summary they extend), once
+        at least `batch` messages older than the last `keep` are unsummarized"""
+        upto = self.message_count - keep
+        if upto - self.summarized < batch:
+            return None
+        start = self._history_start()
+        lines = list(self.digest)
+        lines.extend(
+            summary_line(m)
+            for m in itertools.islice(self.history, max(0, self.summarized - start), max(0, upto - start))
+        )
+        return lines, upto, self.summary
     
-    def get_recent_history(self, max_messages: int = 6) -> List[Dict]:
+    def apply_summary(self, summary: str, upto: int, base: str) -> bool:
+        """Install a summary covering messages before `upto`, unless the state moved on"""
+        if self.summary != base or not self.summarized < upto <= self.message_count:
+            return False
+        # Digest lines stand for the evicted messages just before the history start
+        start = self._history_start()
+        covered = min(len(self.digest), max(0, upto - (start - len(self.digest))))
+        for _ in range(covered):
+            self.digest.popleft()
+        self.summary = summary
+        self.summarized = upto
+        return True
+    
+    def get_recent_history(self, max_messages: int = 6) -> List[HistoryEntry]:
         """Get recent conversation history"""
-        return self.history[-max_messages:] if self.history else []
+        start = max(0, len(self.history) - max_messages)
+        return list(itertools.islice(self.history, start, None))
     
     def extract_interests(self, text: str) -> List[str]:
         """Extract user interests from conversation"""
@@ -528,9 +895,14 @@ class ConversationManager:
         
         return interests
     
+    def asks_nearby(self, text: str) -> bool:
+        """Whether the message asks about places close to the user"""
+        return NEARBY_PATTERN.search(text) is not None
+    
     def update_context(self, knowledge_base: KnowledgeBase, user_input: str) -> str:
         """Update context based on conversation"""
-        relevant_landmarks = knowledge_base.search_landmarks(user_input, limit=3)
+        relevant_landmarks = self.retrieve_landmarks(knowledge_base, user_input)
+        self.context_landmark_ids = [lm['id'] for lm in relevant_landmarks]
         
         context_parts = []
         
@@ -539,6 +911,16 @@ class ConversationManager:
             for lm in relevant_landmarks:
                 context_parts.append(f"- {lm['name']} ({lm['city']}): {lm['description']}")
         
+        if self.user_location and self.asks_nearby(user_input):
+            lat, lon = self.user_location
+            nearby = knowledge_base.nearest(lat, lon, k=CONFIG["nearby_limit"],
+                                            max_km=CONFIG["nearby_radius_km"])
+            self.context_landmark_ids.extend(f"near:{lm['id']}" for lm in nearby)
+            if nearby:
+                context_parts.append("\nNEARBY LANDMARKS (distance from the user):")
+                for lm in nearby:
+                    context_parts.append(f"- {lm['name']} ({lm['subcategory']}): {lm['distance_km']:.1f} km")
+        
         if self.user_interests:
             context_parts.append(f"\nUSER INTERESTS: {', '.join(self.user_interests)}")
         
@@ -546,6 +928,43 @@ class ConversationManager:
         
         self.context = "\n".join(context_parts)
         return self.context
+    
+    def retrieve_landmarks(self, knowledge_base: KnowledgeBase, user_input: str) -> List[Dict]:
+        """Fuse lexical and semantic rankings, filter by interests and fit the token budget"""
+        stage_start = time.perf_counter()
+        candidates = CONFIG["retrieval_candidates"]
+        
+        lexical = [lm['id'] for lm in knowledge_base.search_landmarks(user_input, limit=candidates)]
+        semantic = [lm['id'] for lm in knowledge_base.search_semantic(user_input, limit=candidates)]
+        fuzzy = [lm['id'] for lm in knowledge_base.search_fuzzy(user_input, limit=candidates)]
+        fused = reciprocal_rank_fusion([lexical, semantic, fuzzy], k=CONFIG["rrf_k"])
+        
+        ranked = [knowledge_base.landmarks[landmark_id] for landmark_id, _ in fused]
+        interests = self.extract_interests(user_input)
+        # City/category focused turns fall back to the top rated matches
+        ranked = (filter_by_interests(ranked, interests)
+                  or list(knowledge_base.get_landmarks_for_interests(interests, CONFIG["retrieval_limit"]))
+                  or ranked)
+        
+        budget = int(CONFIG["context_window"] * CONFIG["retrieval_context_share"])
+        selected = []
+        used_tokens = 0
+        for lm in ranked[:CONFIG["retrieval_limit"]]:
+            tokens = count_tokens(f"- {lm['name']} ({lm['city']}): {lm['description']}")
+            if used_tokens + tokens > budget:
+                break
+            selected.append(lm)
+            used_tokens += tokens
+        
+        self.last_retrieval = {
+            "latency_ms": _elapsed_ms(stage_start),
+            "lexical_hits": len(lexical),
+            "semantic_hits": len(semantic),
+            "fuzzy_hits": len(fuzzy),
+            "selected": len(selected),
+            "context_tokens": used_tokens
+        }
+        return selected
 
 # ============================================================================
 # MAIN CHATBOT
@@ -554,78 +973,164 @@ class ConversationManager:
 class EgyptianTourismChatbot:
     """Main chatbot class - Fully AI-driven"""
     
-    def __init__(self):
-        # Initialize components SILENTLY
-        self.knowledge_base = KnowledgeBase()
+    def __init__(self, knowledge_base: Optional[KnowledgeBase] = None,
+                 response_cache: Optional[ResponseCache] = None):
+        # Initialize components SILENTLY; sessions may share one knowledge base
+        self.knowledge_base = knowledge_base or KnowledgeBase()
+        self.response_cache = response_cache or get_response_cache(self.knowledge_base)
         self.ai_core = AICore()
         self.conversation = ConversationManager()
+        self.classifier = self.knowledge_base.classifier
         
         self.stats = {
             "total_queries": 0,
             "tourism_queries": 0,
             "casual_queries": 0
         }
+        # Per-stage timings (ms) of the most recent streamed turn
+        self.last_timings = {}
+        self.turn_metrics = get_turn_metrics()
+        # Background running-summary update, at most one at a time
+        self.summary_task = None
+        # Called when state changes outside a turn; SessionStore queues a save
+        self.on_state_change = None
         # Check if we're in limited mode without showing it to user
         if not self.ai_core.available:
             # We don't show this to the user - it will just use fallback responses
             pass
     
-    def process_query_stream(self, user_input: str):
-        """Process user input and generate streaming response"""
+    def export_state(self) -> Dict:
+        """Serializable session state (conversation and stats)"""
+        return {"conversation": self.conversation.export_state(), "stats": dict(self.stats)}
+    
+    def estimated_bytes(self) -> int:
+        """Variable part of this session's memory; the knowledge base and clients are shared"""
+        return self.conversation.estimated_bytes()
+    
+    def restore_state(self, state: Dict):
+        self.conversation.restore_state(state.get("conversation", {}))
+        self.stats.update(state.get("stats", {}))
+    
+    async def process_query_stream(self, user_input: str, location: Optional[Tuple[float, float]] = None):
+        """Process user input and generate streaming response.
+
+        Yields text chunks, plus QueueStatus updates while waiting for an Ollama
+        slot; raises DispatcherBusy when the LLM queue rejects the turn.
+        Cancelling the consuming task abandons the turn: the Ollama request is
+        closed and nothing is added to the history.
+        """
         self.stats["total_queries"] += 1
+        if location:
+            self.conversation.user_location = location
+        turn_start = time.perf_counter()
+        timings = {}
+        self.last_timings = timings
         
         # Check for exit
         if user_input.lower() in ['exit', 'quit', 'bye', 'goodbye', 'خروج', 'مع السلامة']:
+            timings["outcome"] = "farewell"
+            self.turn_metrics.observe(timings)
             yield self._create_farewell()
             return
         
         # Update user interests
+        stage_start = time.perf_counter()
         new_interests = self.conversation.extract_interests(user_input)
         self.conversation.user_interests.extend(new_interests)
         self.conversation.user_interests = list(set(self.conversation.user_interests))[:5]
+        timings["interests_ms"] = _elapsed_ms(stage_start)
         
         # Determine conversation mode
-        if self.ai_core.available:
-            is_tourism, method = self.ai_core.is_tourism_related(user_input, self.knowledge_base)
-        else:
-            is_tourism = False
-            method = "no_ai"
-        
-        if is_tourism:
-            self.stats["tourism_queries"] += 1
-            self.conversation.conversation_mode = "tourism_focused"
+        if CONFIG["pipelined_generation"]:
+            # The mode only changes one context line. An LLM check would take
+            # an Ollama slot ahead of chat turns for it, so the local label stands
+            stage_start = time.perf_counter()
+            is_tourism, _ = self.classifier.classify(user_input, new_interests)
+            timings["classify_ms"] = _elapsed_ms(stage_start)
+            timings["classify_method"] = "local_classifier"
         else:
-            self.stats["casual_queries"] += 1
-            self.conversation.conversation_mode = "casual"
-        
-        # Update context
-        context = self.conversation.update_context(self.knowledge_base, user_input)
+            is_tourism, method = await self._timed_classify(user_input, new_interests, timings)
+        self._apply_conversation_mode(is_tourism)
         
-        # Generate streaming response
-        full_response = ""
-        if self.ai_core.available:
-            for chunk in self.ai_core.generate_response_stream(
-                user_input=user_input,
-                context=context,
-                conversation_history=self.conversation.get_recent_history(),
-                temperature=0.8
-            ):
-                if chunk:
-                    full_response += chunk
-                    yield chunk
-        else:
-            # Fallback
-            fallback = self._create_fallback_response(user_input, is_tourism)
-            full_response = fallback
-            for char in fallback:
-                yield char
-                time.sleep(0.01)
+        try:
+            # Update context
+            stage_start = time.perf_counter()
+            context = await asyncio.to_thread(
+                self.conversation.update_context, self.knowledge_base, user_input
+            )
+            timings["retrieval_ms"] = _elapsed_ms(stage_start)
+            timings["retrieval"] = self.conversation.last_retrieval
+            
+            # Same question over the same landmarks: reuse the stored answer
+            cached = None
+            if self.response_cache:
+                cache_key = (user_input, self.conversation.conversation_mode,
+                             list(self.conversation.context_landmark_ids))
+                cached = await asyncio.to_thread(self.response_cache.get, *cache_key)
+                timings["cache"] = "hit" if cached is not None else "miss"
+            
+            # Generate streaming response
+            # Chunks are collected and joined once; += would copy the reply per token
+            parts = []
+            full_response = ""
+            if cached is not None or self.ai_core.available:
+                if cached is not None:
+                    source = replay_response(cached)
+                else:
+                    source = self.ai_core.generate_response_stream(
+                        user_input=user_input,
+                        context=context,
+                        conversation_history=self.conversation.prompt_history(),
+                        temperature=0.8,
+                        digest=self.conversation.digest,
+                        summary=self.conversation.summary
+                    )
+                failed = False
+                first_chunk_at = last_chunk_at = None
+                async for chunk in source:
+                    if isinstance(chunk, QueueStatus):
+                        # Waiting for an Ollama slot; let the client show it
+                        yield chunk
+                    elif chunk:
+                        last_chunk_at = time.perf_counter()
+                        if first_chunk_at is None:
+                            first_chunk_at = last_chunk_at
+                            timings["ttft_ms"] = _elapsed_ms(turn_start)
+                        parts.append(chunk)
+                        yield chunk
+                    elif chunk is None:
+                        failed = True
+                full_response = "".join(parts)
+                
+                if cached is None:
+                    timings["prompt"] = self.ai_core.last_prompt
+                    timings["outcome"] = "failed" if failed and not full_response else "generated"
+                    self._record_throughput(timings, full_response, first_chunk_at, last_chunk_at)
+                    if self.response_cache and full_response and not failed:
+                        await asyncio.to_thread(self.response_cache.put, *cache_key, full_response)
+                else:
+                    timings["outcome"] = "cache"
+            else:
+                # Fallback
+                fallback = self._create_fallback_response(user_input, is_tourism)
+                full_response = fallback
+                timings["ttft_ms"] = _elapsed_ms(turn_start)
+                timings["outcome"] = "fallback"
+                yield fallback
+        except DispatcherBusy:
+            timings["outcome"] = "busy"
+            raise
+        finally:
+            # Turns that end without an outcome were cancelled
+            timings["total_ms"] = _elapsed_ms(turn_start)
+            self.turn_metrics.observe(timings)
         
         # Add to history
         self.conversation.add_message("user", user_input)
         self.conversation.add_message("assistant", full_response)
+        self._schedule_summary()
     
-    def process_query(self, user_input: str) -> str:
+    async def process_query(self, user_input: str) -> str:
         """Non-streaming version"""
         self.stats["total_queries"] += 1
         
@@ -636,25 +1141,18 @@ class EgyptianTourismChatbot:
         self.conversation.user_interests.extend(new_interests)
         self.conversation.user_interests = list(set(self.conversation.user_interests))[:5]
         
-        if self.ai_core.available:
-            is_tourism, method = self.ai_core.is_tourism_related(user_input, self.knowledge_base)
-        else:
-            is_tourism = False
-        
-        if is_tourism:
-            self.stats["tourism_queries"] += 1
-            self.conversation.conversation_mode = "tourism_focused"
-        else:
-            self.stats["casual_queries"] += 1
-            self.conversation.conversation_mode = "casual"
+        is_tourism, method = await self._classify_query(user_input, new_interests)
+        self._apply_conversation_mode(is_tourism)
         
         context = self.conversation.update_context(self.knowledge_base, user_input)
         
-        ai_response = self.ai_core.generate_response(
+        ai_response = await self.ai_core.generate_response(
             user_input=user_input,
             context=context,
-            conversation_history=self.conversation.get_recent_history(),
-            temperature=0.8
+            conversation_history=self.conversation.prompt_history(),
+            temperature=0.8,
+            digest=self.conversation.digest,
+            summary=self.conversation.summary
         )
         
         if not ai_response:
@@ -662,9 +1160,66 @@ class EgyptianTourismChatbot:
         
         self.conversation.add_message("user", user_input)
         self.conversation.add_message("assistant", ai_response)
+        self._schedule_summary()
         
         return ai_response
     
+    def _schedule_summary(self):
+        """Fold older turns into the running summary after the reply, off the response path"""
+        if not CONFIG["rolling_summary"] or not self.ai_core.available:
+            return
+        if self.summary_task is not None and not self.summary_task.done():
+            return
+        pending = self.conversation.pending_summary(
+            CONFIG["summary_keep_messages"], CONFIG["summary_batch_messages"]
+        )
+        if pending is not None:
+            self.summary_task = asyncio.create_task(self._update_summary(*pending))
+    
+    async def _update_summary(self, lines: List[str], upto: int, base: str):
+        summary = await self.ai_core.summarize(base, lines)
+        if summary and self.conversation.apply_summary(summary, upto, base):
+            # The turn's save ran before the fold finished
+            if self.on_state_change is not None:
+                self.on_state_change()
+    
+    def _record_throughput(self, timings: Dict, response: str,
+                           first_chunk_at: Optional[float], last_chunk_at: Optional[float]):
+        """Generated tokens and decode rate between the first and last streamed chunk"""
+        if not response:
+            return
+        tokens = self.ai_core.last_prompt.get("completion_tokens") or count_tokens(response)
+        timings["completion_tokens"] = tokens
+        if tokens > 1 and last_chunk_at > first_chunk_at:
+            timings["tokens_per_second"] = round((tokens - 1) / (last_chunk_at - first_chunk_at), 2)
+    
+    async def _classify_query(self, user_input: str, interests: List[str]) -> Tuple[bool, str]:
+        """Classify locally first; only ask the LLM when the local classifier is unsure"""
+        is_tourism, confidence = self.classifier.classify(user_input, interests)
+        
+        if confidence >= CONFIG["classifier_confidence_threshold"] or not self.ai_core.available:
+            return is_tourism, "local_classifier"
+        
+        ai_is_tourism, method = await self.ai_core.is_tourism_related(user_input, self.knowledge_base)
+        if method == "error":
+            return is_tourism, "local_classifier"
+        return ai_is_tourism, method
+    
+    async def _timed_classify(self, user_input: str, interests: List[str], timings: Dict) -> Tuple[bool, str]:
+        stage_start = time.perf_counter()
+        result = await self._classify_query(user_input, interests)
+        timings["classify_ms"] = _elapsed_ms(stage_start)
+        timings["classify_method"] = result[1]
+        return result
+    
+    def _apply_conversation_mode(self, is_tourism: bool):
+        if is_tourism:
+            self.stats["tourism_queries"] += 1
+            self.conversation.conversation_mode = "tourism_focused"
+        else:
+            self.stats["casual_queries"] += 1
+            self.conversation.conversation_mode = "casual"
+    
     def _create_fallback_response(self, user_input: str, is_tourism: bool) -> str:
         """Fallback when AI is not available"""
         if is_tourism:
@@ -0,0 +1,194 @@
+# embedding_index.py
+# Dense vector retrieval over precomputed landmark embeddings
+# ============================================================================
+#
+# Landmark embeddings are computed offline (scripts/build_landmark_embeddings.py)
+# into a float32 .npy matrix that is memory-mapped at load, so every worker
+# shares the same pages. Queries are embedded once and scored with a single
+# matrix-vector product, or through a coarse IVF partition for large catalogs.
+
+import hashlib
+import json
+import os
+import re
+import zlib
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import requests
+
+# ============================================================================
+# EMBEDDERS
+# ============================================================================
+
+class OllamaEmbedder:
+    """Embeds text with an Ollama embedding model (e.g. nomic-embed-text)"""
+
+    def __init__(self, base_url: str, model: str, timeout: Tuple[float, float] = (5, 60)):
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self._session = requests.Session()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = self._session.post(
+            f"{self.base_url}/embed",
+            json={"model": self.model, "input": list(texts)},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return _normalize(np.asarray(response.json()["embeddings"], dtype=np.float32))
+
+
+class HashingEmbedder:
+    """Deterministic local stand-in for an embedding model.
+
+    Hashes word tokens and character trigrams into a fixed number of
+    dimensions. No network or model weights, so it is used for tests,
+    benchmarks and offline development.
+    """
+
+    model = "hashing"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                bucket = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if bucket & 0x80000000 else -1.0
+                matrix[row, bucket % self.dim] += sign
+        return _normalize(matrix)
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = list(words)
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def dataset_fingerprint(rows: Iterable[Sequence[str]]) -> str:
+    """Digest of the rows the vectors were computed for, e.g. (id, name, city)"""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update("\x1f".join(row).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+# ============================================================================
+# EMBEDDING INDEX
+# ============================================================================
+
+class EmbeddingIndex:
+    """Cosine top-k search over an L2-normalized embedding matrix.
+
+    ``fingerprint`` identifies the dataset the vectors belong to (see
+    dataset_fingerprint), so a stale matrix can be recognised at load.
+    """
+
+    def __init__(self, ids: List[str], vectors: np.ndarray, model: str,
+                 fingerprint: Optional[str] = None):
+        self.ids = ids
+        self.vectors = vectors
+        self.model = model
+        self.fingerprint = fingerprint
+
+        # Optional IVF partition: centroids plus the row numbers in each list
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[np.ndarray] = []
+
+    @classmethod
+    def build(cls, ids: List[str], texts: Sequence[str], embedder,
+              batch_size: int = 64, fingerprint: Optional[str] = None) -> "EmbeddingIndex":
+        """Embed ``texts`` in batches and return a new index"""
+        batches = [
+            embedder.embed(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]
+        vectors = np.vstack(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        return cls(list(ids), vectors.astype(np.float32), embedder.model, fingerprint)
+
+    def save(self, path: str):
+        """Write ``path``.npy (vectors) and ``path``.json (ids, model, fingerprint)"""
+        np.save(f"{path}.npy", self.vectors)
+        with open(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump({"model": self.model, "dim": int(self.vectors.shape[1]),
+                       "fingerprint": self.fingerprint, "ids": self.ids}, f)
+
+        if self.centroids is not None:
+            assignment = np.zeros(len(self.ids), dtype=np.int32)
+            for c, rows in enumerate(self.lists):
+                assignment[rows] = c
+            np.savez(f"{path}.ivf.npz", centroids=self.centroids, assignment=assignment)
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingIndex":
+        """Load a saved index; the matrix is memory-mapped read-only"""
+        with open(f"{path}.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        vectors = np.load(f"{path}.npy", mmap_mode="r")
+        index = cls(meta["ids"], vectors, meta["model"], meta.get("fingerprint"))
+
+        if os.path.exists(f"{path}.ivf.npz"):
+            ivf = np.load(f"{path}.ivf.npz")
+            index.centroids = ivf["centroids"]
+            index.lists = [np.flatnonzero(ivf["assignment"] == c) for c in range(len(index.centroids))]
+
+        return index
+
+    def build_ivf(self, num_lists: int, iterations: int = 10, seed: int = 0):
+        """Partition vectors with k-means so queries only scan the closest lists"""
+        rng = np.random.default_rng(seed)
+        vectors = np.asarray(self.vectors)
+        centroids = vectors[rng.choice(len(vectors), size=num_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            for c in range(num_lists):
+                members = vectors[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        self.centroids = centroids
+        self.lists = [np.flatnonzero(assignment == c) for c in range(num_lists)]
+
+    def search(self, query_vector: np.ndarray, limit: int = 5,
+               nprobe: int = 8) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` (id, cosine similarity) pairs, best first"""
+        if limit <= 0 or len(self.ids) == 0:
+            return []
+
+        query_vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+
+        if self.centroids is not None:
+            nearest_lists = np.argsort(-(self.centroids @ query_vector))[:nprobe]
+            rows = np.concatenate([self.lists[c] for c in nearest_lists])
+            scores = self.vectors[rows] @ query_vector
+        else:
+            rows = None
+            scores = self.vectors @ query_vector
+
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        if rows is not None:
+            return [(self.ids[rows[i]], float(scores[i])) for i in top]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def __len__(self) -> int:
+        return len(self.ids)
@@ -0,0 +1,262 @@
+# fake_ollama.py
+# Local stand-in for the Ollama and OpenAI-compatible APIs, used for load testing offline
+# ============================================================================
+#
+# Run with:
+#   uvicorn fake_ollama:app --port 11435
+# and point the chatbot at it:
+#   OLLAMA_BASE_URL=http://localhost:11435/api uvicorn app:app
+# or, over the OpenAI protocol (also what the storytelling router speaks):
+#   LLM_BACKEND=openai LLM_BASE_URL=http://localhost:11435/v1 uvicorn app:app
+#
+# Replies are deterministic and stream at FAKE_OLLAMA_TOKENS_PER_SEC after
+# FAKE_OLLAMA_LATENCY seconds.
+#
+# Optionally models prompt prefill like llama.cpp: each slot remembers its
+# last prompt, only the part after the longest shared prefix is evaluated,
+# and the model (with its cache) unloads once keep_alive runs out.
+
+import asyncio
+import json
+import os
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from prompt_builder import count_tokens
+
+FAKE_CONFIG = {
+    "model": os.getenv("FAKE_OLLAMA_MODEL", "mistral:7b"),
+    "first_token_latency": float(os.getenv("FAKE_OLLAMA_LATENCY", "0.2")),  # Seconds before the first token
+    "tokens_per_second": float(os.getenv("FAKE_OLLAMA_TOKENS_PER_SEC", "50")),
+    "num_tokens": int(os.getenv("FAKE_OLLAMA_NUM_TOKENS", "40")),
+    "prefill_tokens_per_second": float(os.getenv("FAKE_OLLAMA_PREFILL_TOKENS_PER_SEC", "0")),  # 0: prefill is free
+    "load_latency": float(os.getenv("FAKE_OLLAMA_LOAD_LATENCY", "0")),  # Seconds to load an unloaded model
+    "num_parallel": int(os.getenv("FAKE_OLLAMA_NUM_PARALLEL", "1")),  # Prompt cache slots
+    "default_keep_alive": os.getenv("FAKE_OLLAMA_KEEP_ALIVE", "5m"),
+}
+
+# Model residency and the last prompt seen by each cache slot
+MODEL_STATE = {"loaded_until": 0.0, "slots": []}
+
+# Streaming generations: open now, finished, and dropped by the client midway
+STREAM_STATE = {"open": 0, "completed": 0, "aborted": 0, "tokens": 0}
+
+app = FastAPI()
+
+
+def _summary_tokens(prompt: str):
+    """Extractive stand-in for a summarizer: the old summary plus the user's new
+    messages, a dozen words each, so facts from early turns carry forward"""
+    current, _, new = prompt.partition("NEW MESSAGES:")
+    current = current.replace("CURRENT SUMMARY:", "").strip()
+    parts = [] if current == "(empty)" else [current]
+    for line in new.splitlines():
+        if line.startswith("User:"):
+            parts.append(" ".join(line[5:].split()[:12]))
+    return [word + " " for word in " ".join(parts).split()]
+
+
+def _reply_tokens(payload):
+    """Deterministic reply: classifier prompts get YES, summary requests an extract,
+    everything else a fixed sentence; capped by num_predict / max_tokens"""
+    messages = payload.get("messages", [])
+    prompt = messages[-1]["content"] if messages else ""
+    if "YES or NO" in prompt:
+        return ["YES"]
+
+    if "NEW MESSAGES:" in prompt:
+        words = _summary_tokens(prompt)
+    else:
+        words = [f"word{i} " for i in range(FAKE_CONFIG["num_tokens"])]
+    limit = payload.get("max_tokens") or (payload.get("options") or {}).get("num_predict")
+    return words[:limit] if limit and limit > 0 else words
+
+
+def _keep_alive_seconds(value) -> float:
+    """Ollama keep_alive: seconds, or a duration like '30m'; negative keeps the model forever"""
+    if value is None:
+        value = FAKE_CONFIG["default_keep_alive"]
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = re.fullmatch(r"(-?[\d.]+)\s*(ms|s|m|h)?", str(value).strip())
+        if not match:
+            return 300.0
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}[match.group(2)]
+        seconds = float(match.group(1)) * scale
+    return float("inf") if seconds < 0 else seconds
+
+
+def _render_prompt(messages) -> str:
+    """Flatten chat messages the way a chat template would"""
+    return "".join(f"<|{m.get('role')}|>\n{m.get('content', '')}\n" for m in messages) + "<|assistant|>\n"
+
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _prefill(payload):
+    """(load seconds, prompt tokens, evaluated tokens) for this request, updating the cache"""
+    now = time.monotonic()
+    load = 0.0
+    if now > MODEL_STATE["loaded_until"]:
+        load = FAKE_CONFIG["load_latency"]
+        MODEL_STATE["slots"] = []
+
+    prompt = _render_prompt(payload.get("messages", []))
+    slots = MODEL_STATE["slots"]
+    best, shared = None, 0
+    for index, cached in enumerate(slots):
+        length = _common_prefix(prompt, cached)
+        if length > shared:
+            best, shared = index, length
+    if best is None:
+        if len(slots) >= FAKE_CONFIG["num_parallel"]:
+            slots.pop(0)
+        slots.append(prompt)
+    else:
+        slots[best] = prompt
+
+    total = count_tokens(prompt)
+    cached_tokens = count_tokens(prompt[:shared]) if shared else 0
+    evaluated = max(1, total - cached_tokens)
+
+    keep_alive = _keep_alive_seconds(payload.get("keep_alive"))
+    MODEL_STATE["loaded_until"] = now + keep_alive
+    return load, total, evaluated
+
+
+def _prefill_seconds(load: float, evaluated: int) -> float:
+    rate = FAKE_CONFIG["prefill_tokens_per_second"]
+    return load + (evaluated / rate if rate else 0.0)
+
+
+def _timing_fields(load: float, evaluated: int, eval_count: int) -> dict:
+    return {
+        "load_duration": int(load * 1e9),
+        "prompt_eval_count": evaluated,
+        "prompt_eval_duration": int(_prefill_seconds(0.0, evaluated) * 1e9),
+        "eval_count": eval_count,
+    }
+
+
+@app.get("/api/tags")
+def tags():
+    return {"models": [{"name": FAKE_CONFIG["model"]}]}
+
+
+@app.get("/")
+def root():
+    return "Ollama is running"
+
+
+async def _paced_tokens(tokens, first_token: float, delay: float):
+    """Yield the reply token by token at the configured latency and rate"""
+    # Starlette cancels the response (and this generator) when the client disconnects
+    STREAM_STATE["open"] += 1
+    completed = False
+    try:
+        await asyncio.sleep(first_token)
+        for token in tokens:
+            STREAM_STATE["tokens"] += 1
+            yield token
+            await asyncio.sleep(delay)
+        completed = True
+    finally:
+        STREAM_STATE["open"] -= 1
+        STREAM_STATE["completed" if completed else "aborted"] += 1
+
+
+def _plan(payload):
+    """(reply tokens, seconds to the first token, seconds per token, load, evaluated)"""
+    tokens = _reply_tokens(payload)
+    load, _, evaluated = _prefill(payload)
+    first_token = FAKE_CONFIG["first_token_latency"] + _prefill_seconds(load, evaluated)
+    return tokens, first_token, 1.0 / FAKE_CONFIG["tokens_per_second"], load, evaluated
+
+# ============================================================================
+# OLLAMA API
+# ============================================================================
+
+@app.post("/api/chat")
+async def chat(request: Request):
+    payload = await request.json()
+    tokens, first_token, delay, load, evaluated = _plan(payload)
+
+    if not payload.get("stream", True):
+        await asyncio.sleep(first_token + delay * len(tokens))
+        return {
+            "model": payload.get("model"),
+            "message": {"role": "assistant", "content": "".join(tokens)},
+            "done": True,
+            **_timing_fields(load, evaluated, len(tokens))
+        }
+
+    async def stream():
+        async for token in _paced_tokens(tokens, first_token, delay):
+            yield json.dumps({
+                "model": payload.get("model"),
+                "message": {"role": "assistant", "content": token},
+                "done": False
+            }) + "\n"
+        yield json.dumps({
+            "model": payload.get("model"),
+            "done": True,
+            **_timing_fields(load, evaluated, len(tokens))
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# ============================================================================
+# OPENAI-COMPATIBLE API
+# ============================================================================
+
+@app.get("/v1/models")
+def models():
+    return {"object": "list", "data": [{"id": FAKE_CONFIG["model"], "object": "model"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    payload = await request.json()
+    tokens, first_token, delay, load, evaluated = _plan(payload)
+    total = count_tokens(_render_prompt(payload.get("messages", [])))
+    usage = {
+        "prompt_tokens": total,
+        "completion_tokens": len(tokens),
+        "total_tokens": total + len(tokens),
+        "prompt_tokens_details": {"cached_tokens": total - evaluated},
+    }
+    base = {"id": f"chatcmpl-{time.monotonic_ns()}", "model": payload.get("model"),
+            "created": int(time.time())}
+
+    if not payload.get("stream"):
+        await asyncio.sleep(first_token + delay * len(tokens))
+        return {
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "".join(tokens)}}],
+            "usage": usage,
+        }
+
+    def event(body) -> str:
+        return f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', **body})}\n\n"
+
+    async def stream():
+        async for token in _paced_tokens(tokens, first_token, delay):
+            yield event({"choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]})
+        yield event({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            yield event({"choices": [], "usage": usage})
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
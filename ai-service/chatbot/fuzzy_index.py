@@ -0,0 +1,152 @@
+# fuzzy_index.py
+# Character-trigram index with bounded edit-distance re-ranking for landmark names
+# ============================================================================
+#
+# Catches misspellings ("Karnac", "Abu Simble") and Arabic spelling variants
+# that exact token matching misses. Trigram overlap prunes the catalog to a
+# few dozen candidates; only those get an edit-distance check.
+
+import math
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ============================================================================
+# NORMALIZATION
+# ============================================================================
+
+ARABIC_DIACRITICS = re.compile(r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+ARABIC_LETTER_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",  # alef variants
+    "ة": "ه",  # taa marbuta
+    "ى": "ي",  # alef maksura
+    "ؤ": "و", "ئ": "ي",
+})
+NON_WORD = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize_arabic(text: str) -> str:
+    """Fold alef variants, taa marbuta and alef maksura; drop diacritics and tatweel"""
+    return ARABIC_DIACRITICS.sub("", text).translate(ARABIC_LETTER_MAP)
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, Arabic-normalized, punctuation-free, single-spaced"""
+    text = normalize_arabic(str(text).lower())
+    return " ".join(NON_WORD.sub(" ", text).replace("_", " ").split())
+
+
+def trigrams(text: str) -> List[str]:
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance, or max_distance + 1 as soon as it must exceed max_distance.
+
+    Only the diagonal band |i - j| <= max_distance of the DP table is filled.
+    """
+    over = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return over
+    if len(a) < len(b):
+        a, b = b, a
+
+    width = len(b)
+    previous = [j if j <= max_distance else over for j in range(width + 1)]
+    for i in range(1, len(a) + 1):
+        char_a = a[i - 1]
+        lo = max(1, i - max_distance)
+        hi = min(width, i + max_distance)
+        current = [over] * (width + 1)
+        current[0] = i if i <= max_distance else over
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            value = previous[j - 1] + (char_a != b[j - 1])
+            deletion = previous[j] + 1
+            if deletion < value:
+                value = deletion
+            insertion = current[j - 1] + 1
+            if insertion < value:
+                value = insertion
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous = current
+
+    return previous[width] if previous[width] <= max_distance else over
+
+# ============================================================================
+# FUZZY NAME INDEX
+# ============================================================================
+
+class FuzzyNameIndex:
+    """Trigram candidate pruning followed by bounded edit-distance ranking"""
+
+    def __init__(self, ids: Sequence[str], names: Sequence[str],
+                 max_candidates: int = 25, min_overlap: float = 0.3):
+        self.ids = list(ids)
+        self.names = [normalize_name(n) for n in names]
+        self.name_tokens = [n.split() for n in self.names]
+        self.max_candidates = max_candidates
+        self.min_overlap = min_overlap
+
+        postings: Dict[str, List[int]] = {}
+        for row, name in enumerate(self.names):
+            for gram in set(trigrams(name)):
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: np.asarray(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def _candidates(self, query: str) -> np.ndarray:
+        grams = [g for g in set(trigrams(query)) if g in self.postings]
+        if not grams:
+            return np.zeros(0, dtype=np.int32)
+
+        counts = np.bincount(
+            np.concatenate([self.postings[g] for g in grams]),
+            minlength=len(self.names)
+        )
+        needed = max(1, math.ceil(self.min_overlap * len(set(trigrams(query)))))
+        rows = np.flatnonzero(counts >= needed)
+        if len(rows) > self.max_candidates:
+            rows = rows[np.argpartition(-counts[rows], self.max_candidates - 1)[:self.max_candidates]]
+        return rows
+
+    def _distance(self, query: str, row: int, max_distance: int) -> int:
+        """Best distance between the query and any same-length word window of the name"""
+        best = bounded_levenshtein(query, self.names[row], max_distance)
+        tokens = self.name_tokens[row]
+        width = len(query.split())
+        for start in range(0, max(0, len(tokens) - width) + 1):
+            if best == 0:
+                break
+            window = " ".join(tokens[start:start + width])
+            best = min(best, bounded_levenshtein(query, window, min(best, max_distance)))
+        return best
+
+    def search(self, query: str, limit: int = 5,
+               max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(id, edit distance) pairs for names close to the query, best first.
+
+        ``max_distance`` defaults to roughly one edit per three characters.
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+        if max_distance is None:
+            max_distance = max(1, len(query) // 3)
+
+        scored = []
+        for row in self._candidates(query):
+            distance = self._distance(query, int(row), max_distance)
+            if distance <= max_distance:
+                scored.append((distance, len(self.names[row]), int(row)))
+
+        scored.sort()
+        return [(self.ids[row], distance) for distance, _, row in scored[:limit]]
+
+    def __len__(self) -> int:
+        return len(self.ids)
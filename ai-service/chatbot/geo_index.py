@@ -0,0 +1,102 @@
+# geo_index.py
+# Grid spatial index over landmark coordinates for "near me" queries
+# ============================================================================
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to many"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+# ============================================================================
+# GEO INDEX
+# ============================================================================
+
+class GeoIndex:
+    """Fixed-size lat/lon grid; queries only measure points in nearby cells"""
+
+    def __init__(self, ids: Sequence[str], lats: Sequence[float], lons: Sequence[float],
+                 categories: Sequence[str], cell_deg: float = 0.05):
+        self.ids = list(ids)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_deg = cell_deg
+
+        self.category_names = sorted(set(categories))
+        category_codes = {name: code for code, name in enumerate(self.category_names)}
+        self.categories = np.array([category_codes[c] for c in categories], dtype=np.int16)
+
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for row, (lat, lon) in enumerate(zip(self.lats, self.lons)):
+            cells.setdefault(self._cell(lat, lon), []).append(row)
+        self.cells = {cell: np.asarray(rows, dtype=np.int64) for cell, rows in cells.items()}
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def _candidate_rows(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        lat_lo, lon_lo = self._cell(lat - dlat, lon - dlon)
+        lat_hi, lon_hi = self._cell(lat + dlat, lon + dlon)
+
+        span = (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1)
+        if span > len(self.cells):
+            # Huge radius: walking occupied cells is cheaper than the bounding box
+            keys = [c for c in self.cells
+                    if lat_lo <= c[0] <= lat_hi and lon_lo <= c[1] <= lon_hi]
+        else:
+            keys = [(i, j) for i in range(lat_lo, lat_hi + 1)
+                    for j in range(lon_lo, lon_hi + 1) if (i, j) in self.cells]
+
+        if not keys:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([self.cells[k] for k in keys])
+
+    def _category_mask(self, rows: np.ndarray, category: Optional[str]) -> np.ndarray:
+        if not category:
+            return np.ones(len(rows), dtype=bool)
+        fragment = category.lower()
+        codes = [code for code, name in enumerate(self.category_names) if fragment in name.lower()]
+        return np.isin(self.categories[rows], codes)
+
+    def nearby(self, lat: float, lon: float, radius_km: float,
+               category: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(id, distance_km) pairs within ``radius_km``, closest first"""
+        rows = self._candidate_rows(lat, lon, radius_km)
+        rows = rows[self._category_mask(rows, category)]
+        if len(rows) == 0:
+            return []
+
+        distances = haversine_km(lat, lon, self.lats[rows], self.lons[rows])
+        inside = distances <= radius_km
+        rows, distances = rows[inside], distances[inside]
+
+        order = np.argsort(distances, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return [(self.ids[rows[i]], float(distances[i])) for i in order]
+
+    def nearest(self, lat: float, lon: float, k: int = 5, category: Optional[str] = None,
+                max_radius_km: float = 500.0) -> List[Tuple[str, float]]:
+        """The ``k`` closest points within ``max_radius_km``; fewer, or none, when not enough are that close"""
+        radius = min(self.cell_deg * KM_PER_DEGREE_LAT, max_radius_km)
+        while True:
+            results = self.nearby(lat, lon, radius, category, limit=k)
+            if len(results) >= k or radius >= max_radius_km:
+                return results
+            radius = min(radius * 2, max_radius_km)
+
+    def __len__(self) -> int:
+        return len(self.ids)
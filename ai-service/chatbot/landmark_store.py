@@ -0,0 +1,94 @@
+# landmark_store.py
+# Compact landmark records with lazily rendered descriptions
+# ============================================================================
+#
+# Each landmark is a __slots__ record instead of a dict, city and category
+# strings are interned so every row shares one copy, and the description /
+# full_text strings are rendered on access through a bounded LRU cache
+# instead of being stored for every row. Records still support
+# landmark['name'] style access so callers can treat them like the old dicts.
+
+import sys
+from functools import lru_cache
+from typing import Optional
+
+from records import SlottedRecord
+
+DESCRIPTION_CACHE_SIZE = 2048
+
+# ============================================================================
+# LANDMARK RECORD
+# ============================================================================
+
+class Landmark(SlottedRecord):
+    """One catalogue row; landmark['name'] and dict(landmark) keep working"""
+
+    __slots__ = ("id", "name", "city", "subcategory", "rating", "rated",
+                 "address", "latitude", "longitude")
+
+    FIELDS = ("id", "name", "city", "subcategory", "rating", "address",
+              "latitude", "longitude", "description", "full_text")
+
+    def __init__(self, landmark_id: str, name: str, city: str, subcategory: str,
+                 rating: Optional[float], address: str,
+                 latitude: Optional[float], longitude: Optional[float]):
+        self.id = landmark_id
+        self.name = name
+        self.city = sys.intern(city)
+        self.subcategory = sys.intern(subcategory)
+        self.rated = rating is not None
+        self.rating = rating if rating is not None else 0.0
+        self.address = address
+        self.latitude = latitude
+        self.longitude = longitude
+
+    @property
+    def description(self) -> str:
+        return render_description(self)
+
+    @property
+    def full_text(self) -> str:
+        return render_full_text(self)
+
+    def __repr__(self) -> str:
+        return f"Landmark({self.id!r}, {self.name!r}, {self.city!r})"
+
+# ============================================================================
+# LAZY RENDERING
+# ============================================================================
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def render_description(landmark: Landmark) -> str:
+    """Create a rich description for a landmark"""
+    category = landmark.subcategory
+    address = landmark.address[:100] if landmark.address else "Location varies"
+
+    description = f"{landmark.name} is a {category.lower()} located in {landmark.city}. "
+
+    if landmark.rated:
+        description += f"It has a rating of {landmark.rating}/5. "
+
+    # Add category-specific details
+    if "Museum" in category:
+        description += "This museum showcases Egyptian culture and history. "
+    elif "Nature" in category or "Park" in category:
+        description += "This natural attraction offers beautiful scenery. "
+    elif "Shopping" in category:
+        description += "This shopping destination has various stores and goods. "
+    elif "Sights" in category:
+        description += "This historical site is worth visiting. "
+
+    description += f"The address is {address}."
+    return description
+
+
+@lru_cache(maxsize=DESCRIPTION_CACHE_SIZE)
+def render_full_text(landmark: Landmark) -> str:
+    """Create full text representation for search"""
+    text = f"{landmark.name} in {landmark.city}. "
+    text += f"Category: {landmark.subcategory}. "
+    if landmark.rated:
+        text += f"Rating: {landmark.rating}/5. "
+    if landmark.address:
+        text += f"Address: {landmark.address[:150]}. "
+    return text
@@ -0,0 +1,243 @@
+# llm_backends.py
+# Chat model backends behind one async interface: Ollama and OpenAI-compatible APIs
+# ============================================================================
+#
+# Callers only say "send these messages, stream the answer". A backend
+# speaks one provider protocol: Ollama's /api/chat (NDJSON lines) or
+# /chat/completions on OpenAI-compatible APIs (Groq, vLLM, llama.cpp
+# server; server-sent events). fake_ollama.py serves both, so either can be
+# load tested offline. Options use Ollama's names (temperature, num_predict,
+# top_p, ...) and are translated per backend.
+#
+# Shared with the storytelling router, which imports it from the service root
+# as chatbot.llm_backends; keep it free of imports from sibling chatbot modules.
+
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+
+class LLMBackendError(Exception):
+    """The model API answered with an error or an unexpected body"""
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+class LLMBackend:
+    """One chat model. ``usage``, when given, receives token counts for the call:
+    evaluated_tokens (prompt tokens actually processed, cached prefix excluded)
+    and completion_tokens, whichever the API reports.
+    """
+
+    name = "llm"
+
+    def __init__(self, base_url: str, model: str):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.counters = {"requests": 0, "errors": 0}
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def stream_chat(self, messages: List[Dict], options: Optional[Dict] = None,
+                    usage: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Yields the answer's text chunks; closing the generator closes the request"""
+        raise NotImplementedError
+
+    async def chat(self, messages: List[Dict], options: Optional[Dict] = None,
+                   usage: Optional[Dict] = None) -> str:
+        """The whole answer in one request"""
+        raise NotImplementedError
+
+    async def check_health(self) -> bool:
+        return self.available
+
+    def status(self) -> Dict:
+        return {"backend": self.name, "model": self.model, "base_url": self.base_url,
+                "available": self.available, **self.counters}
+
+# ============================================================================
+# OLLAMA
+# ============================================================================
+
+class OllamaBackend(LLMBackend):
+    """Ollama /api/chat over the shared OllamaClient (pool and cached health)"""
+
+    name = "ollama"
+
+    def __init__(self, client, keep_alive: Optional[str] = None):
+        super().__init__(client.base_url, client.model)
+        self.client = client
+        self.keep_alive = keep_alive
+
+    @property
+    def available(self) -> bool:
+        return self.client.available
+
+    def _payload(self, messages: List[Dict], options: Optional[Dict], stream: bool) -> Dict:
+        payload = {"model": self.model, "messages": messages, "stream": stream,
+                   "options": options or {}}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    @staticmethod
+    def _record_usage(body: Dict, usage: Optional[Dict]):
+        if usage is not None:
+            usage["evaluated_tokens"] = body.get("prompt_eval_count")
+            usage["completion_tokens"] = body.get("eval_count")
+
+    async def stream_chat(self, messages, options=None, usage=None):
+        self.counters["requests"] += 1
+        http = self.client.async_http()
+        async with http.stream("POST", f"{self.base_url}/chat",
+                               json=self._payload(messages, options, True)) as response:
+            if response.status_code != 200:
+                self.counters["errors"] += 1
+                raise LLMBackendError(f"Ollama returned {response.status_code}")
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                try:
+                    body = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if body.get("done"):
+                    self._record_usage(body, usage)
+                content = body.get("message", {}).get("content", "")
+                if content:
+                    yield content
+
+    async def chat(self, messages, options=None, usage=None):
+        self.counters["requests"] += 1
+        response = await self.client.async_http().post(
+            f"{self.base_url}/chat", json=self._payload(messages, options, False)
+        )
+        if response.status_code != 200:
+            self.counters["errors"] += 1
+            raise LLMBackendError(f"Ollama returned {response.status_code}")
+        body = response.json()
+        self._record_usage(body, usage)
+        return body.get("message", {}).get("content", "")
+
+    async def check_health(self) -> bool:
+        try:
+            response = await self.client.async_http().get(
+                self.base_url.replace("/api", ""), timeout=5
+            )
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    def status(self) -> Dict:
+        return {**super().status(), **self.client.status()}
+
+# ============================================================================
+# OPENAI-COMPATIBLE
+# ============================================================================
+
+# Ollama option -> OpenAI request field
+OPENAI_OPTIONS = {"temperature": "temperature", "top_p": "top_p",
+                  "num_predict": "max_tokens", "stop": "stop", "seed": "seed"}
+
+
+class OpenAIBackend(LLMBackend):
+    """/chat/completions on an OpenAI-compatible API (Groq, vLLM, ...).
+
+    ``base_url`` includes the version prefix, e.g. https://api.groq.com/openai/v1.
+    Options without an OpenAI equivalent (num_ctx, repeat_penalty) are dropped.
+    """
+
+    name = "openai"
+
+    def __init__(self, base_url: str, model: str, api_key: Optional[str] = None,
+                 connect_timeout: float = 5.0, read_timeout: float = 300.0,
+                 pool_size: int = 20, keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0):
+        super().__init__(base_url, model)
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._http = None
+        self._loop = None
+
+    def async_http(self) -> httpx.AsyncClient:
+        """Pooled client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._http = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, headers=headers)
+            self._loop = loop
+        return self._http
+
+    def _payload(self, messages: List[Dict], options: Optional[Dict], stream: bool) -> Dict:
+        payload = {"model": self.model, "messages": messages, "stream": stream}
+        for key, value in (options or {}).items():
+            if key in OPENAI_OPTIONS:
+                payload[OPENAI_OPTIONS[key]] = value
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+        return payload
+
+    @staticmethod
+    def _record_usage(body: Dict, usage: Optional[Dict]):
+        reported = body.get("usage")
+        if usage is None or not reported:
+            return
+        cached = (reported.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        usage["evaluated_tokens"] = reported.get("prompt_tokens", 0) - cached
+        usage["completion_tokens"] = reported.get("completion_tokens")
+
+    def _error(self, status_code: int, body: str) -> LLMBackendError:
+        self.counters["errors"] += 1
+        return LLMBackendError(f"{self.base_url} returned {status_code}: {body[:200]}")
+
+    async def stream_chat(self, messages, options=None, usage=None):
+        self.counters["requests"] += 1
+        async with self.async_http().stream("POST", f"{self.base_url}/chat/completions",
+                                            json=self._payload(messages, options, True)) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode("utf-8", "replace")
+                raise self._error(response.status_code, body)
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    body = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                self._record_usage(body, usage)
+                for choice in body.get("choices") or ():
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        yield content
+
+    async def chat(self, messages, options=None, usage=None):
+        self.counters["requests"] += 1
+        response = await self.async_http().post(f"{self.base_url}/chat/completions",
+                                                json=self._payload(messages, options, False))
+        if response.status_code != 200:
+            raise self._error(response.status_code, response.text)
+        body = response.json()
+        if not body.get("choices"):
+            raise self._error(response.status_code, response.text)
+        self._record_usage(body, usage)
+        return body["choices"][0]["message"]["content"]
+
+    async def check_health(self) -> bool:
+        try:
+            response = await self.async_http().get(f"{self.base_url}/models", timeout=5)
+            return response.status_code == 200
+        except Exception:
+            return False
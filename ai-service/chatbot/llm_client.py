@@ -0,0 +1,191 @@
+# llm_client.py
+# Shared Ollama client - one per process, reused by every chat session
+# ============================================================================
+
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# ============================================================================
+# OLLAMA CLIENT
+# ============================================================================
+
+class _CountingTransport(httpx.AsyncHTTPTransport):
+    """Pooled transport that records how many requests reused a kept-alive connection"""
+
+    def __init__(self, stats: Dict, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def handle_async_request(self, request):
+        self._stats["requests"] += 1
+        request.extensions["trace"] = self._trace
+        return await super().handle_async_request(request)
+
+    async def _trace(self, event_name: str, info: Dict):
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["connections_opened"] += 1
+
+
+class OllamaClient:
+    """Process-level Ollama client with a cached model availability status.
+
+    The model list is probed once when the client starts and then re-checked
+    by a background thread, so creating a chat session never blocks on
+    Ollama's /api/tags. Chat calls share one keep-alive connection pool.
+    """
+
+    def __init__(self, base_url: str, model: str,
+                 health_interval: float = 30.0, probe_timeout: float = 5.0,
+                 connect_timeout: float = 5.0, read_timeout: float = 300.0,
+                 pool_size: int = 20, keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0):
+        self.base_url = base_url
+        self.model = model
+        self.health_interval = health_interval
+        self.probe_timeout = probe_timeout
+
+        # connect bounds reaching Ollama; read bounds the gap between streamed chunks
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+
+        self.available = False
+        self.model_names: List[str] = []
+        self.last_checked = None
+
+        self._stop = threading.Event()
+        self._thread = None
+
+        # The health probe keeps its own single kept-alive connection
+        self._probe_session = requests.Session()
+        self._probe_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self._probe_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+        self._async_http = None
+        self._async_loop = None
+        self.pool_stats = {"requests": 0, "connections_opened": 0}
+
+    def refresh(self) -> bool:
+        """Probe Ollama once and update the cached status"""
+        try:
+            response = self._probe_session.get(
+                f"{self.base_url}/tags",
+                timeout=(self.probe_timeout, self.probe_timeout)
+            )
+
+            if response.status_code != 200:
+                self._set_status(False, [])
+                return self.available
+
+            models = response.json().get("models", [])
+            model_names = [m["name"] for m in models]
+
+            if self.model not in model_names:
+                if self.available or self.last_checked is None:
+                    print(f"⚠️ Model '{self.model}' not found. Available:", model_names)
+                self._set_status(False, model_names)
+                return self.available
+
+            self._set_status(True, model_names)
+
+        except Exception as e:
+            if self.available or self.last_checked is None:
+                print("❌ Ollama health check failed:", e)
+            self._set_status(False, [])
+
+        return self.available
+
+    def _set_status(self, available: bool, model_names: List[str]):
+        self.available = available
+        self.model_names = model_names
+        self.last_checked = datetime.now()
+
+    def start(self):
+        """Run the first probe and start periodic background re-checks"""
+        if self._thread is not None:
+            return
+
+        self.refresh()
+
+        self._thread = threading.Thread(
+            target=self._health_loop,
+            name="ollama-health",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background health checks"""
+        self._stop.set()
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.refresh()
+
+    def async_http(self) -> httpx.AsyncClient:
+        """Async HTTP client for chat calls, bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_loop is not loop:
+            self._async_http = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=_CountingTransport(self.pool_stats, limits=self.limits)
+            )
+            self._async_loop = loop
+        return self._async_http
+
+    def connection_stats(self) -> Dict:
+        """Requests sent over the chat pool and how many reused a connection"""
+        requests_sent = self.pool_stats["requests"]
+        opened = self.pool_stats["connections_opened"]
+        reused = max(0, requests_sent - opened)
+        return {
+            "requests": requests_sent,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / requests_sent, 3) if requests_sent else 0.0,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections
+        }
+
+    def status(self) -> Dict:
+        """Cached health status, safe to call on every request"""
+        return {
+            "available": self.available,
+            "model": self.model,
+            "models": list(self.model_names),
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "pool": self.connection_stats()
+        }
+
+# ============================================================================
+# PROCESS-LEVEL REGISTRY
+# ============================================================================
+
+_CLIENTS: Dict[Tuple[str, str], OllamaClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_ollama_client(base_url: str, model: str, **options) -> OllamaClient:
+    """Return the shared client for this Ollama URL and model, starting it on first use.
+
+    ``options`` are passed to OllamaClient the first time the client is created.
+    """
+    key = (base_url, model)
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = OllamaClient(base_url, model, **options)
+            client.start()
+            _CLIENTS[key] = client
+
+    return client
@@ -0,0 +1,206 @@
+# llm_dispatcher.py
+# Admission control for Ollama calls: concurrency limit, fair queueing, backpressure
+# ============================================================================
+#
+# A CPU-bound model gets slower for everyone with each extra parallel
+# generation, so only max_concurrent calls run at once. Waiting chat calls
+# are served round-robin across sessions, so one chatty client can't starve
+# the rest; classifier calls (a few tokens each) jump the queue. When the
+# queue is full the call is rejected straight away with DispatcherBusy
+# instead of waiting without bound. Background work (conversation
+# summaries) never queues: it only runs when a slot is free right now.
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict, Hashable, List, Optional
+
+CHAT = "chat"
+CLASSIFY = "classify"
+
+
+class DispatcherBusy(Exception):
+    """Raised when an LLM call is rejected because the queue is full"""
+
+
+class QueueStatus:
+    """Queue position update, streamed to clients while their turn waits"""
+
+    __slots__ = ("position",)
+
+    def __init__(self, position: int):
+        self.position = position
+
+    def __repr__(self) -> str:
+        return f"QueueStatus({self.position})"
+
+# ============================================================================
+# TICKETS
+# ============================================================================
+
+class Ticket:
+    """One admitted call; granted when it may run, released when it is done"""
+
+    __slots__ = ("dispatcher", "key", "kind", "position", "granted", "done",
+                 "changed", "enqueued")
+
+    def __init__(self, dispatcher: "LLMDispatcher", key: Hashable, kind: str):
+        self.dispatcher = dispatcher
+        self.key = key
+        self.kind = kind
+        self.position = 0
+        self.granted = False
+        self.done = False
+        self.changed = asyncio.Event()
+        self.enqueued = time.perf_counter()
+
+    async def positions(self) -> AsyncIterator[int]:
+        """Yields the queue position each time it changes, until granted"""
+        last = None
+        while True:
+            # Clear before checking: a grant while the consumer was paused
+            # at the yield must not be wiped out
+            self.changed.clear()
+            if self.granted:
+                return
+            if self.position != last:
+                last = self.position
+                yield last
+                continue
+            await self.changed.wait()
+
+    async def wait(self):
+        async for _ in self.positions():
+            pass
+
+    def release(self):
+        """Free the slot, or leave the queue if never granted; safe to call twice"""
+        self.dispatcher._release(self)
+
+# ============================================================================
+# DISPATCHER
+# ============================================================================
+
+class LLMDispatcher:
+    """Concurrency limit with round-robin per-session queues and classifier priority"""
+
+    def __init__(self, max_concurrent: int = 2, max_queue: int = 64,
+                 max_queue_per_session: int = 2):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_per_session = max_queue_per_session
+
+        self.active = 0
+        self.priority: Deque[Ticket] = deque()
+        # session key -> waiting chat tickets; dict order is the round-robin order
+        self.sessions: "OrderedDict[Hashable, Deque[Ticket]]" = OrderedDict()
+        self.counters = {"granted": 0, "queued": 0, "rejected": 0, "cancelled": 0,
+                         "deferred": 0}
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return len(self.priority) + sum(len(q) for q in self.sessions.values())
+
+    def enqueue(self, key: Hashable, kind: str = CHAT) -> Ticket:
+        """Admit a call; raises DispatcherBusy when it would overfill the queue"""
+        ticket = Ticket(self, key, kind)
+        if self.active < self.max_concurrent and not self.waiting:
+            self._grant(ticket)
+            return ticket
+
+        session_queue = self.sessions.get(key, ())
+        if self.waiting >= self.max_queue or (
+                kind == CHAT and len(session_queue) >= self.max_queue_per_session):
+            self.counters["rejected"] += 1
+            raise DispatcherBusy(f"LLM queue full ({self.waiting} waiting)")
+
+        if kind == CLASSIFY:
+            self.priority.append(ticket)
+        else:
+            self.sessions.setdefault(key, deque()).append(ticket)
+        self.counters["queued"] += 1
+        self._update_positions()
+        return ticket
+
+    def try_acquire(self, key: Hashable, kind: str = CHAT) -> Optional[Ticket]:
+        """A granted ticket if a slot is free and nobody is waiting, else None"""
+        if self.active >= self.max_concurrent or self.waiting:
+            self.counters["deferred"] += 1
+            return None
+        ticket = Ticket(self, key, kind)
+        self._grant(ticket)
+        return ticket
+
+    def _grant(self, ticket: Ticket):
+        ticket.granted = True
+        ticket.position = 0
+        self.active += 1
+        self.counters["granted"] += 1
+        waited = (time.perf_counter() - ticket.enqueued) * 1000
+        self.wait_ms_total += waited
+        self.wait_ms_max = max(self.wait_ms_max, waited)
+        ticket.changed.set()
+
+    def _next(self) -> Ticket:
+        if self.priority:
+            return self.priority.popleft()
+        key, queue = next(iter(self.sessions.items()))
+        ticket = queue.popleft()
+        if queue:
+            self.sessions.move_to_end(key)
+        else:
+            del self.sessions[key]
+        return ticket
+
+    def _release(self, ticket: Ticket):
+        if ticket.done:
+            return
+        ticket.done = True
+        if ticket.granted:
+            self.active -= 1
+        else:
+            # Gave up while waiting (client left, turn cancelled)
+            self.counters["cancelled"] += 1
+            if ticket in self.priority:
+                self.priority.remove(ticket)
+            else:
+                queue = self.sessions.get(ticket.key)
+                if queue is not None and ticket in queue:
+                    queue.remove(ticket)
+                    if not queue:
+                        del self.sessions[ticket.key]
+
+        while self.active < self.max_concurrent and self.waiting:
+            self._grant(self._next())
+        self._update_positions()
+
+    def _service_order(self) -> List[Ticket]:
+        """Waiting tickets in the order they will be granted"""
+        order = list(self.priority)
+        queues = [list(queue) for queue in self.sessions.values()]
+        depth = 0
+        while True:
+            layer = [queue[depth] for queue in queues if depth < len(queue)]
+            if not layer:
+                return order
+            order.extend(layer)
+            depth += 1
+
+    def _update_positions(self):
+        for position, ticket in enumerate(self._service_order(), start=1):
+            if ticket.position != position:
+                ticket.position = position
+                ticket.changed.set()
+
+    def metrics(self) -> Dict:
+        granted = self.counters["granted"]
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "avg_wait_ms": self.wait_ms_total / granted if granted else 0.0,
+            "max_wait_ms": self.wait_ms_max,
+            **self.counters,
+        }
@@ -0,0 +1,227 @@
+# prompt_builder.py
+# Token-budgeted chat prompt assembly
+# ============================================================================
+#
+# Prefill time on a CPU Ollama grows with every prompt token, so the prompt
+# is assembled against a fixed budget: the system prompt, landmark context
+# and the new message always go in, recent history fills what is left
+# (newest first), and turns that no longer fit are kept only as one-line
+# entries in a rolling digest. Once the model has folded older turns into
+# a running summary, the summary stands in for them and the digest.
+#
+# Layout: static system prompt, history, then one system message with the
+# digest and per-turn context, then the user message. Everything that
+# changes every turn comes last, so consecutive requests share the longest
+# possible prefix and Ollama can reuse its KV cache for it.
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# ============================================================================
+# TOKEN COUNTING
+# ============================================================================
+
+TOKEN_PIECES = re.compile(r"[A-Za-z]+|\d|[^\W\d_]+|[^\w\s]", re.UNICODE)
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count for a Llama/Mistral-style SentencePiece vocabulary.
+
+    Latin words cost about one token per five letters, digits one token each,
+    other scripts (Arabic) about one per two letters since the vocabulary
+    has few merges for them, and punctuation or emoji one token per symbol
+    (emoji a few, through byte fallback).
+    """
+    tokens = 0
+    for piece in TOKEN_PIECES.findall(text):
+        first = piece[0]
+        if first.isascii():
+            tokens += 1 if not first.isalpha() else (len(piece) + 4) // 5
+        elif first.isalpha():
+            tokens += (len(piece) + 1) // 2
+        else:
+            tokens += 1 if ord(first) < 0x2000 else 3
+    return max(1, tokens)
+
+
+@lru_cache(maxsize=16)
+def count_tokens_cached(text: str) -> int:
+    """count_tokens for text sent unchanged every turn (the system prompt)"""
+    return count_tokens(text)
+
+
+# Per-message overhead of the chat template (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# ============================================================================
+# ROLLING DIGEST
+# ============================================================================
+
+DIGEST_HEADER = "EARLIER IN THIS CONVERSATION:\n"
+SENTENCE_END = re.compile(r"(?<=[.!?؟])\s")
+
+
+def digest_line(message: Dict, max_chars: int = 120) -> str:
+    """One-line gist of a message: its first sentence, clipped"""
+    text = " ".join(str(message.get("content", "")).split())
+    first = SENTENCE_END.split(text, maxsplit=1)[0]
+    if len(first) > max_chars:
+        first = first[:max_chars].rsplit(" ", 1)[0] + "…"
+    speaker = "User" if message.get("role") == "user" else "Fahmy"
+    return f"{speaker}: {first}"
+
+
+def fit_digest(lines: Sequence[str], budget: int) -> List[str]:
+    """Most recent digest lines that fit the token budget, oldest first"""
+    kept = []
+    used = 0
+    for line in reversed(lines):
+        tokens = count_tokens(line) + 1
+        if used + tokens > budget:
+            break
+        kept.append(line)
+        used += tokens
+    return kept[::-1]
+
+# ============================================================================
+# RUNNING SUMMARY
+# ============================================================================
+
+SUMMARY_HEADER = "CONVERSATION SUMMARY:\n"
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a chat between a tourist and Fahmy, an "
+    "Egyptian tourism guide. Update the summary with the new messages. Keep the "
+    "tourist's preferences, constraints, plans, dates and the places already "
+    "discussed; drop greetings and small talk. Write in the tourist's language, "
+    "as plain sentences, at most {words} words. Reply with the summary only."
+)
+
+
+def summary_line(message: Dict, max_chars: int = 300) -> str:
+    """A message as summarizer input: speaker and content, clipped"""
+    text = " ".join(str(message.get("content", "")).split())
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0] + "…"
+    speaker = "User" if message.get("role") == "user" else "Fahmy"
+    return f"{speaker}: {text}"
+
+
+def summary_request(previous: str, lines: Sequence[str], max_tokens: int) -> List[Dict]:
+    """Chat messages asking the model to fold ``lines`` into ``previous``"""
+    words = max(20, int(max_tokens * 0.6))
+    current = previous or "(empty)"
+    return [
+        {"role": "system", "content": SUMMARY_INSTRUCTIONS.format(words=words)},
+        {"role": "user", "content": f"CURRENT SUMMARY:\n{current}\n\nNEW MESSAGES:\n" + "\n".join(lines)},
+    ]
+
+
+def clean_summary(text: Optional[str], max_tokens: int) -> str:
+    """The model's summary on one paragraph, cut to the token budget at a word boundary"""
+    text = " ".join((text or "").split())
+    if text.upper().startswith(SUMMARY_HEADER.strip().upper()):
+        text = text[len(SUMMARY_HEADER.strip()):].strip()
+    while text and count_tokens(text) > max_tokens:
+        text = text.rsplit(" ", 1)[0] if " " in text else ""
+    return text
+
+# ============================================================================
+# PROMPT BUILDER
+# ============================================================================
+
+class PromptBuilder:
+    """Fits system prompt, context, digest, history and the new message in the window.
+
+    ``context_window`` is the model context (Ollama num_ctx); ``response_tokens``
+    of it are kept free for the answer. At most ``max_history`` history messages
+    are sent verbatim even when more would fit.
+    """
+
+    def __init__(self, context_window: int = 3000, response_tokens: int = 800,
+                 digest_tokens: int = 150, max_history: int = 6):
+        self.context_window = context_window
+        self.response_tokens = response_tokens
+        self.digest_tokens = digest_tokens
+        self.max_history = max_history
+
+    @property
+    def prompt_budget(self) -> int:
+        return self.context_window - self.response_tokens
+
+    def build(self, system_prompt: str, user_input: str,
+              history: Optional[Sequence[Dict]] = None,
+              digest: Optional[Sequence[str]] = None,
+              context: str = "", summary: str = "") -> Tuple[List[Dict], Dict]:
+        """Chat messages within the prompt budget, plus token accounting.
+
+        ``history`` holds only messages the summary does not cover yet.
+        """
+        history = list(history or [])
+        digest = list(digest or [])
+
+        system_tokens = count_tokens_cached(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+        context_tokens = count_tokens(context) + MESSAGE_OVERHEAD_TOKENS if context else 0
+        user_tokens = count_tokens(user_input) + MESSAGE_OVERHEAD_TOKENS
+        remaining = max(0, self.prompt_budget - system_tokens - context_tokens - user_tokens)
+
+        costs = [count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in history]
+        summary_text = SUMMARY_HEADER + summary if summary else ""
+        summary_tokens = count_tokens(summary_text) if summary else 0
+        if summary_tokens > remaining // 2:
+            # Window too small to carry it; the digest is the fallback
+            summary_text, summary_tokens = "", 0
+        # Leave room for the digest (and summary) whenever there is (or will be) one
+        digest_budget = max(min(self.digest_tokens, remaining // 4), summary_tokens)
+        overflow = sum(costs) > remaining or len(history) > self.max_history
+        history_budget = remaining - digest_budget if digest or summary_text or overflow else remaining
+
+        # Newest turns first, as many as fit
+        kept = 0
+        history_tokens = 0
+        for tokens in reversed(costs):
+            if kept == self.max_history or history_tokens + tokens > history_budget:
+                break
+            kept += 1
+            history_tokens += tokens
+        recent = history[len(history) - kept:]
+        dropped = history[:len(history) - kept]
+
+        # Older turns not in the summary survive only as digest lines, after the summary
+        digest_lines = fit_digest(
+            digest + [digest_line(m) for m in dropped],
+            digest_budget - summary_tokens - count_tokens(DIGEST_HEADER) - MESSAGE_OVERHEAD_TOKENS
+        )
+
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend({"role": m["role"], "content": m["content"]} for m in recent)
+
+        dynamic = []
+        if summary_text:
+            dynamic.append(summary_text)
+        digest_tokens = 0
+        if digest_lines:
+            digest_text = DIGEST_HEADER + "\n".join(digest_lines)
+            dynamic.append(digest_text)
+            digest_tokens = count_tokens(digest_text)
+        if context:
+            dynamic.append(context)
+        if dynamic:
+            messages.append({"role": "system", "content": "\n\n".join(dynamic)})
+        messages.append({"role": "user", "content": user_input})
+
+        stats = {
+            "system_tokens": system_tokens,
+            "context_tokens": context_tokens,
+            "summary_tokens": summary_tokens,
+            "digest_tokens": digest_tokens,
+            "history_tokens": history_tokens,
+            "user_tokens": user_tokens,
+            "prompt_tokens": (system_tokens + context_tokens + summary_tokens + digest_tokens
+                              + history_tokens + user_tokens),
+            "budget": self.prompt_budget,
+            "history_sent": kept,
+            "history_dropped": len(dropped),
+            "digest_lines": len(digest_lines),
+        }
+        return messages, stats
@@ -0,0 +1,36 @@
+# records.py
+# Read-only mapping access for __slots__ records
+# ============================================================================
+#
+# Landmarks and conversation history entries used to be dicts. They are now
+# __slots__ records, which are much smaller, but callers still index them
+# (landmark['name'], message['role']) and turn them into dicts. This mixin
+# provides that access over the record's FIELDS.
+
+from typing import Iterator, Tuple
+
+
+class SlottedRecord:
+    """Mixin: record['field'], record.get(), keys(), dict(record) over FIELDS"""
+
+    __slots__ = ()
+
+    # Readable names: attributes or properties of the record
+    FIELDS: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
@@ -0,0 +1,183 @@
+# response_cache.py
+# Shared cache of generated answers for repeated questions
+# ============================================================================
+#
+# "Tell me about the pyramids" is asked over and over. Answers are cached
+# under the normalized question, its language, the conversation mode and the
+# landmarks placed in the prompt, so a hit is an answer generated from the
+# same facts. With a similarity threshold and an embedder, differently worded
+# questions over the same landmarks can hit as well.
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fuzzy_index import normalize_name
+
+# ============================================================================
+# LANGUAGE
+# ============================================================================
+
+ARABIC_LETTERS = re.compile(r"[\u0600-\u06FF]")
+FRENCH_HINTS = re.compile(
+    r"[àâçéèêëîïôûùüÿœ]|\b(le|la|les|des|est|quels?|quelles?|je|vous|tu|pour|avec|où)\b"
+)
+
+
+def detect_language(text: str) -> str:
+    """'ar', 'fr' or 'en', by script and a few French markers"""
+    if ARABIC_LETTERS.search(text):
+        return "ar"
+    if FRENCH_HINTS.search(text.lower()):
+        return "fr"
+    return "en"
+
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+CacheScope = Tuple[str, str, Tuple[str, ...]]
+
+
+class _CacheEntry:
+    __slots__ = ("query", "response", "created", "vector")
+
+    def __init__(self, query: str, response: str, created: float, vector: Optional[np.ndarray]):
+        self.query = query
+        self.response = response
+        self.created = created
+        self.vector = vector
+
+
+class ResponseCache:
+    """LRU + TTL cache of answers, keyed on (language, mode, landmark ids, query).
+
+    ``embed`` maps a query to a unit vector; together with
+    ``similarity_threshold`` it lets a lookup match a cached query of the same
+    scope by cosine similarity instead of exact normalized text.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600,
+                 similarity_threshold: Optional[float] = None,
+                 embed: Optional[Callable[[str], np.ndarray]] = None,
+                 min_words: int = 2, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed if similarity_threshold else None
+        self.min_words = min_words
+        self.clock = clock
+
+        self.entries: "OrderedDict[Tuple[CacheScope, str], _CacheEntry]" = OrderedDict()
+        # scope -> normalized queries cached under it, for similarity lookups
+        self.scopes: Dict[CacheScope, set] = {}
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "semantic_hits": 0, "misses": 0, "skipped": 0,
+                         "stores": 0, "evicted_lru": 0, "expired": 0}
+
+    @staticmethod
+    def scope(user_input: str, mode: str, landmark_ids: Sequence[str]) -> CacheScope:
+        return detect_language(user_input), mode, tuple(landmark_ids)
+
+    def cacheable(self, query: str) -> bool:
+        """Short follow-ups ("yes", "tell me more") depend on the conversation"""
+        return len(normalize_name(query).split()) >= self.min_words
+
+    def get(self, user_input: str, mode: str, landmark_ids: Sequence[str]) -> Optional[str]:
+        if not self.cacheable(user_input):
+            self.counters["skipped"] += 1
+            return None
+
+        query = normalize_name(user_input)
+        scope = self.scope(user_input, mode, landmark_ids)
+        now = self.clock()
+        with self.lock:
+            entry = self._live_entry((scope, query), now)
+            if entry is not None:
+                self.counters["hits"] += 1
+                return entry.response
+            candidates = [(q, self.entries[(scope, q)]) for q in self.scopes.get(scope, ())]
+
+        if self.embed and candidates:
+            match = self._similar(query, candidates)
+            if match is not None:
+                with self.lock:
+                    entry = self._live_entry((scope, match), now)
+                    if entry is not None:
+                        self.counters["semantic_hits"] += 1
+                        return entry.response
+
+        self.counters["misses"] += 1
+        return None
+
+    def put(self, user_input: str, mode: str, landmark_ids: Sequence[str], response: str):
+        if not response or not self.cacheable(user_input):
+            return
+        query = normalize_name(user_input)
+        scope = self.scope(user_input, mode, landmark_ids)
+        vector = self._vector(query) if self.embed else None
+
+        with self.lock:
+            key = (scope, query)
+            self.entries[key] = _CacheEntry(query, response, self.clock(), vector)
+            self.entries.move_to_end(key)
+            self.scopes.setdefault(scope, set()).add(query)
+            self.counters["stores"] += 1
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+                self.counters["evicted_lru"] += 1
+
+    def _live_entry(self, key, now: float) -> Optional[_CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if now - entry.created > self.ttl:
+            self._remove(key)
+            self.counters["expired"] += 1
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key):
+        self.entries.pop(key, None)
+        scope, query = key
+        queries = self.scopes.get(scope)
+        if queries is not None:
+            queries.discard(query)
+            if not queries:
+                del self.scopes[scope]
+
+    def _vector(self, query: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(self.embed(query), dtype=np.float32)
+        except Exception:
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _similar(self, query: str, candidates) -> Optional[str]:
+        """Cached query of the same scope most similar to this one, above the threshold"""
+        vector = self._vector(query)
+        if vector is None:
+            return None
+        best, best_score = None, self.similarity_threshold
+        for cached_query, entry in candidates:
+            if entry.vector is None:
+                continue
+            score = float(np.dot(vector, entry.vector))
+            if score >= best_score:
+                best, best_score = cached_query, score
+        return best
+
+    def metrics(self) -> Dict:
+        lookups = self.counters["hits"] + self.counters["semantic_hits"] + self.counters["misses"]
+        hits = self.counters["hits"] + self.counters["semantic_hits"]
+        return {
+            "entries": len(self.entries),
+            "hit_rate": hits / lookups if lookups else 0.0,
+            **self.counters,
+        }
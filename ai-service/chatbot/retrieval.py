@@ -0,0 +1,92 @@
+# retrieval.py
+# Hybrid retrieval helpers: rank fusion and interest filters
+# ============================================================================
+
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from fuzzy_index import normalize_arabic
+
+# ============================================================================
+# INTEREST FILTERS
+# ============================================================================
+
+# Alias (English, Arabic, French, short forms) -> normalized city key.
+# Arabic spelling variants (alef, taa marbuta, diacritics) are folded before lookup.
+CITY_ALIASES = {
+    "cairo": "cairo", "القاهرة": "cairo", "le caire": "cairo", "caire": "cairo",
+    "giza": "giza", "gizeh": "giza", "الجيزة": "giza", "جيزة": "giza",
+    "luxor": "luxor", "louxor": "luxor", "الأقصر": "luxor",
+    "aswan": "aswan", "assouan": "aswan", "أسوان": "aswan",
+    "alexandria": "alexandria", "alex": "alexandria", "alexandrie": "alexandria",
+    "الإسكندرية": "alexandria", "اسكندرية": "alexandria",
+    "sharm": "sharm el sheikh", "sharm el sheikh": "sharm el sheikh", "شرم الشيخ": "sharm el sheikh",
+    "hurghada": "hurghada", "الغردقة": "hurghada",
+}
+
+# Alias (including extract_interests keywords) -> normalized subcategory key
+CATEGORY_ALIASES = {
+    "museum": "museums", "museums": "museums", "musée": "museums", "متحف": "museums", "متاحف": "museums",
+    "pyramid": "sights & landmarks", "temple": "sights & landmarks", "sights": "sights & landmarks",
+    "landmarks": "sights & landmarks", "هرم": "sights & landmarks", "معبد": "sights & landmarks",
+    "آثار": "sights & landmarks", "معالم": "sights & landmarks",
+    "shopping": "shopping", "market": "shopping", "bazaar": "shopping", "سوق": "shopping", "تسوق": "shopping",
+    "park": "nature & parks", "parks": "nature & parks", "nature": "nature & parks", "حديقة": "nature & parks",
+    "desert": "outdoor activities", "outdoor": "outdoor activities", "صحراء": "outdoor activities",
+    "zoo": "zoos & aquariums", "aquarium": "zoos & aquariums",
+}
+
+
+def _alias_key(text: str) -> str:
+    return " ".join(normalize_arabic(str(text).lower()).split())
+
+
+# Alias tables keyed by normalized spelling, so 'الاقصر' and 'الأقصر' both resolve
+_CITY_LOOKUP = {_alias_key(alias): city for alias, city in CITY_ALIASES.items()}
+_CATEGORY_LOOKUP = {_alias_key(alias): category for alias, category in CATEGORY_ALIASES.items()}
+
+
+def normalize_city(name: str) -> str:
+    key = _alias_key(name)
+    return _CITY_LOOKUP.get(key, key)
+
+
+def normalize_category(name: str) -> str:
+    key = _alias_key(name)
+    return _CATEGORY_LOOKUP.get(key, key)
+
+
+def interest_filters(interests: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """Split extracted interests into normalized city and category keys"""
+    keys = [_alias_key(i) for i in interests]
+    cities = {_CITY_LOOKUP[k] for k in keys if k in _CITY_LOOKUP}
+    categories = {_CATEGORY_LOOKUP[k] for k in keys if k in _CATEGORY_LOOKUP}
+    return cities, categories
+
+
+def filter_by_interests(landmarks: List[Dict], interests: Iterable[str]) -> List[Dict]:
+    """Keep landmarks in the mentioned cities and categories.
+
+    Returns the input unchanged when no city or category was mentioned,
+    and an empty list when nothing matches.
+    """
+    cities, categories = interest_filters(interests)
+    if not cities and not categories:
+        return landmarks
+
+    return [
+        lm for lm in landmarks
+        if (not cities or normalize_city(lm['city']) in cities)
+        and (not categories or normalize_category(lm['subcategory']) in categories)
+    ]
+
+# ============================================================================
+# RANK FUSION
+# ============================================================================
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse several ranked id lists; each id scores sum(1 / (k + rank))"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,137 @@
+# search_index.py
+# Tokenized inverted index with BM25 ranking for landmark retrieval
+# ============================================================================
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from fuzzy_index import normalize_arabic
+
+# ============================================================================
+# TOKENIZATION
+# ============================================================================
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+# Possessives and contractions ("giza's", "i'm", "don't") keep only the word
+APOSTROPHE_SUFFIX = re.compile(r"['\u2019](?:s|m|t|d|re|ve|ll)\b")
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "and", "or", "is",
+    "are", "was", "be", "me", "my", "i", "you", "your", "we", "it", "its",
+    "about", "tell", "what", "whats", "where", "which", "who", "how", "when",
+    "can", "could", "should", "would", "do", "does", "there", "any", "some",
+    "best", "good", "show", "give", "want", "like", "know", "near", "with",
+    "egypt", "st", "street", "rd",
+    "في", "عن", "من", "علي", "الي", "ايه", "عايز", "انا",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, Arabic-normalized word tokens with stopwords, single characters
+    and possessive suffixes removed and plurals folded"""
+    tokens = []
+    text = APOSTROPHE_SUFFIX.sub("", normalize_arabic(text.lower()))
+    for token in TOKEN_PATTERN.findall(text):
+        if len(token) < 2 or token in STOPWORDS or token.isdigit():
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+# ============================================================================
+# INVERTED INDEX
+# ============================================================================
+
+class InvertedIndex:
+    """BM25 index over several weighted text fields of each document.
+
+    Each term's postings are stored as NumPy arrays sorted by their BM25
+    contribution, so a query only scores the strongest ``candidate_limit``
+    postings per term and lookups stay sub-millisecond on large catalogs.
+    """
+
+    def __init__(self, fields: Dict[str, float], k1: float = 1.2, b: float = 0.75,
+                 candidate_limit: int = 2000):
+        self.fields = fields
+        self.k1 = k1
+        self.b = b
+        self.candidate_limit = candidate_limit
+
+        self.doc_ids: List[str] = []
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def build(self, documents: Iterable[Tuple[str, Dict]]) -> "InvertedIndex":
+        """Index (doc_id, document) pairs; replaces any previous contents"""
+        term_freqs: Dict[str, Dict[int, float]] = {}
+        doc_lengths = []
+        self.doc_ids = []
+
+        for doc_idx, (doc_id, document) in enumerate(documents):
+            self.doc_ids.append(doc_id)
+            length = 0.0
+
+            for field, weight in self.fields.items():
+                for token in tokenize(str(document.get(field) or "")):
+                    term_freqs.setdefault(token, {})
+                    term_freqs[token][doc_idx] = term_freqs[token].get(doc_idx, 0.0) + weight
+                    length += weight
+
+            doc_lengths.append(length)
+
+        num_docs = len(self.doc_ids)
+        lengths = np.asarray(doc_lengths, dtype=np.float32)
+        avg_length = float(lengths.mean()) if num_docs else 1.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1e-9))
+
+        self.postings = {}
+        for term, docs in term_freqs.items():
+            ids = np.fromiter(docs.keys(), dtype=np.int32, count=len(docs))
+            tfs = np.fromiter(docs.values(), dtype=np.float32, count=len(docs))
+            idf = np.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            impacts = idf * tfs * (self.k1 + 1) / (tfs + norms[ids])
+
+            order = np.argsort(-impacts, kind="stable")
+            self.postings[term] = (ids[order], impacts[order].astype(np.float32))
+
+        return self
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return up to ``limit`` (doc_id, score) pairs, best first"""
+        return self.search_tokens(tokenize(query), limit)
+
+    def search_tokens(self, tokens: List[str], limit: int = 5) -> List[Tuple[str, float]]:
+        ids_parts = []
+        score_parts = []
+
+        for token in set(tokens):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            ids, impacts = posting
+            ids_parts.append(ids[:self.candidate_limit])
+            score_parts.append(impacts[:self.candidate_limit])
+
+        if not ids_parts or limit <= 0:
+            return []
+
+        if len(ids_parts) == 1:
+            candidates, scores = ids_parts[0], score_parts[0]
+        else:
+            all_ids = np.concatenate(ids_parts)
+            candidates, inverse = np.unique(all_ids, return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [(self.doc_ids[candidates[i]], float(scores[i])) for i in top]
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
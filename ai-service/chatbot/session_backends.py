@@ -0,0 +1,237 @@
+# session_backends.py
+# Storage backends for serialized chat session state
+# ============================================================================
+#
+# Sessions are stored as opaque compressed blobs (see session_store.encode_state)
+# keyed by session id. The in-memory backend keeps them in this process; the
+# SQLite and Redis backends let several chatbot workers share sessions without
+# sticky routing. WriteBehindBackend wraps any of them so a chat turn only
+# updates a dict and the store write happens later in one batch.
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+# ============================================================================
+# IN-MEMORY
+# ============================================================================
+
+class MemoryStateBackend:
+    """Process-local state, oldest entries dropped past ``limit``"""
+
+    def __init__(self, limit: int = 10000):
+        self.limit = limit
+        self.blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        with self.lock:
+            return self.blobs.get(session_id)
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        with self.lock:
+            for session_id, blob in items:
+                self.blobs[session_id] = blob
+                self.blobs.move_to_end(session_id)
+            while len(self.blobs) > self.limit:
+                self.blobs.popitem(last=False)
+                self.dropped += 1
+
+    def delete(self, session_id: str):
+        with self.lock:
+            self.blobs.pop(session_id, None)
+
+    def prune(self, max_age: float) -> int:
+        return 0
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "backend": "memory",
+                "stored_sessions": len(self.blobs),
+                "stored_bytes": sum(len(blob) for blob in self.blobs.values()),
+                "dropped": self.dropped,
+            }
+
+# ============================================================================
+# SQLITE
+# ============================================================================
+
+class SQLiteStateBackend:
+    """State in a SQLite file (WAL mode) shared by workers on one host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_state "
+            "(session_id TEXT PRIMARY KEY, state BLOB NOT NULL, updated REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT state FROM session_state WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        now = time.time()
+        rows = [(session_id, blob, now) for session_id, blob in items]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO session_state (session_id, state, updated) VALUES (?, ?, ?)",
+                rows
+            )
+
+    def delete(self, session_id: str):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+
+    def prune(self, max_age: float) -> int:
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM session_state WHERE updated < ?", (time.time() - max_age,)
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        with self.lock:
+            count, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(state)), 0) FROM session_state"
+            ).fetchone()
+        return {"backend": "sqlite", "stored_sessions": count, "stored_bytes": size}
+
+# ============================================================================
+# REDIS
+# ============================================================================
+
+class RedisStateBackend:
+    """State in Redis, or anything speaking the same client API.
+
+    ``client`` needs ``get``, ``delete`` and ``pipeline()`` with ``set(..., ex=)``
+    and ``execute()``, as provided by redis-py.
+    """
+
+    def __init__(self, client, prefix: str = "fahmy:session:", ttl: Optional[int] = None):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisStateBackend":
+        import redis  # optional dependency, only needed for this backend
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + session_id)
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        pipeline = self.client.pipeline()
+        for session_id, blob in items:
+            pipeline.set(self.prefix + session_id, blob, ex=self.ttl)
+        pipeline.execute()
+
+    def delete(self, session_id: str):
+        self.client.delete(self.prefix + session_id)
+
+    def prune(self, max_age: float) -> int:
+        # Redis expires keys on its own (ttl)
+        return 0
+
+    def stats(self) -> Dict:
+        return {"backend": "redis", "prefix": self.prefix}
+
+# ============================================================================
+# WRITE-BEHIND
+# ============================================================================
+
+class WriteBehindBackend:
+    """Buffers writes in memory and hands them to the backend in batches.
+
+    ``put`` never touches the store; ``flush`` (called periodically, or when
+    ``batch_size`` writes are pending) writes the latest blob per session.
+    Reads see pending writes first, then the batch being flushed, so a
+    session is never read back older than its last write.
+    """
+
+    def __init__(self, backend, batch_size: int = 200):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.pending: Dict[str, bytes] = {}
+        # The batch handed to the backend; readable until put_many returns
+        self.inflight: Dict[str, bytes] = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.writes = 0
+        self.flushes = 0
+        self.flushed_items = 0
+
+    def get(self, session_id: str) -> Optional[bytes]:
+        with self.lock:
+            blob = self.pending.get(session_id)
+            if blob is None:
+                blob = self.inflight.get(session_id)
+        return blob if blob is not None else self.backend.get(session_id)
+
+    def put(self, session_id: str, blob: bytes) -> bool:
+        """Queue a write; True when the batch is full and should be flushed"""
+        with self.lock:
+            self.pending[session_id] = blob
+            self.writes += 1
+            return len(self.pending) >= self.batch_size
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]):
+        for session_id, blob in items:
+            self.put(session_id, blob)
+
+    def flush(self) -> int:
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, {}
+                self.inflight = batch
+            if not batch:
+                return 0
+            try:
+                self.backend.put_many(batch.items())
+            except Exception:
+                # Keep the batch (unless superseded) for the next flush
+                with self.lock:
+                    for session_id, blob in batch.items():
+                        self.pending.setdefault(session_id, blob)
+                raise
+            finally:
+                with self.lock:
+                    self.inflight = {}
+            self.flushes += 1
+            self.flushed_items += len(batch)
+            return len(batch)
+
+    def delete(self, session_id: str):
+        with self.lock:
+            self.pending.pop(session_id, None)
+            self.inflight.pop(session_id, None)
+        self.backend.delete(session_id)
+
+    def prune(self, max_age: float) -> int:
+        return self.backend.prune(max_age)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            pending = len(self.pending)
+        return {
+            **self.backend.stats(),
+            "pending_writes": pending,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "flushed_items": self.flushed_items,
+        }
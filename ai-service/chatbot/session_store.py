@@ -0,0 +1,227 @@
+# session_store.py
+# Bounded store of live chatbot sessions backed by compact saved state
+# ============================================================================
+#
+# Live sessions are kept in LRU order and evicted when they sit idle past the
+# TTL, when there are too many of them, or when their estimated size passes
+# the memory ceiling. The estimate is a fixed per-session overhead plus what
+# the session reports for its conversation (history, digest, summary,
+# context), so long conversations count for more than short ones. A
+# disconnected session stays live until one of those limits evicts it, so a
+# quick reconnect finds it in memory. An evicted
+# session is not lost: its conversation state is serialized to a few compressed bytes in a pluggable
+# backend (session_backends.py) and the session is rebuilt from them the next
+# time its id shows up, on this worker or another one sharing the backend.
+
+import asyncio
+import functools
+import json
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from session_backends import MemoryStateBackend, WriteBehindBackend
+
+# Footprint of an empty session (chatbot objects, conversation deques), about
+# 2.6 KB measured with tracemalloc; the knowledge base is shared, not counted
+SESSION_BASE_BYTES = 3_000
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+
+def encode_state(state: Dict) -> bytes:
+    """Compact JSON, zlib-compressed"""
+    return zlib.compress(
+        json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    )
+
+
+def decode_state(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+# ============================================================================
+# SESSION STORE
+# ============================================================================
+
+class _Entry:
+    __slots__ = ("session", "last_seen", "size", "active", "version")
+
+    def __init__(self, session: Any, now: float, version: int = 0):
+        self.session = session
+        self.last_seen = now
+        self.size = SESSION_BASE_BYTES
+        self.active = 0
+        self.version = version
+
+
+class SessionStore:
+    """Live sessions with idle TTL, count and memory limits, and LRU eviction.
+
+    ``factory`` builds a session; sessions expose ``export_state()`` and
+    ``restore_state(state)``, may expose ``estimated_bytes()`` (otherwise the
+    size of their saved state is counted), and may have an ``on_state_change`` attribute,
+    which the store sets to a callback that queues a save for state changed
+    outside a turn (background work). State is saved to ``backend`` after every turn
+    through a write-behind buffer, so evicted sessions (or sessions last
+    served by another worker sharing the backend) are restored from it.
+    Sessions with an open connection are never evicted, so the limits can be
+    exceeded while every session is in use.
+    """
+
+    def __init__(self, factory: Callable[[], Any], backend=None, max_sessions: int = 1000,
+                 idle_ttl: float = 1800, max_bytes: int = 256 * 1024 * 1024,
+                 state_ttl: Optional[float] = None, write_batch: int = 200,
+                 clock: Callable[[], float] = time.monotonic):
+        self.factory = factory
+        self.state = WriteBehindBackend(backend or MemoryStateBackend(), write_batch)
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.state_ttl = state_ttl
+        self.clock = clock
+
+        self.live: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.live_bytes = 0
+        self.counters = {
+            "created": 0,
+            "restored": 0,
+            "refreshed": 0,
+            "evicted_idle": 0,
+            "evicted_lru": 0,
+            "evicted_memory": 0,
+        }
+
+    def _load(self, session_id: str, build: bool) -> Tuple[Any, Optional[Dict]]:
+        blob = self.state.get(session_id)
+        state = decode_state(blob) if blob is not None else None
+        return (self.factory() if build else None), state
+
+    async def acquire(self, session_id: str) -> Any:
+        """The live session for this id, restoring or creating it if needed"""
+        entry = self.live.get(session_id)
+        if entry is None or not entry.active:
+            # Store reads and session construction are blocking work
+            session, state = await asyncio.to_thread(self._load, session_id, entry is None)
+            # Another connection may have built it meanwhile
+            entry = self.live.get(session_id) or entry
+            if entry is None:
+                entry = _Entry(session, self.clock())
+                if hasattr(session, "on_state_change"):
+                    session.on_state_change = functools.partial(self._save, session_id, entry)
+                self.live[session_id] = entry
+                self.live_bytes += entry.size
+                if state is not None:
+                    self.counters["restored"] += 1
+                else:
+                    self.counters["created"] += 1
+            elif session_id not in self.live:
+                self.live[session_id] = entry
+                self.live_bytes += entry.size
+            if state is not None and state.get("version", 0) > entry.version:
+                if entry.version:
+                    # Another worker served this session since we last did
+                    self.counters["refreshed"] += 1
+                entry.session.restore_state(state)
+                entry.version = state["version"]
+                self._resize(session_id, entry)
+
+        entry.active += 1
+        entry.last_seen = self.clock()
+        self.live.move_to_end(session_id)
+        self.enforce_limits()
+        return entry.session
+
+    def touch(self, session_id: str):
+        """Record activity after a turn and queue the session state for saving"""
+        entry = self.live.get(session_id)
+        if entry is None:
+            return
+        entry.last_seen = self.clock()
+        self.live.move_to_end(session_id)
+        self._save(session_id, entry)
+        self.enforce_limits()
+
+    def _save(self, session_id: str, entry: _Entry):
+        """Queue the session state for saving; also for a session evicted since"""
+        entry.version += 1
+        state = entry.session.export_state()
+        state["version"] = entry.version
+        blob = encode_state(state)
+        if self.state.put(session_id, blob):
+            asyncio.get_running_loop().create_task(self.flush())
+
+        self._resize(session_id, entry, len(blob))
+
+    def _resize(self, session_id: str, entry: _Entry, saved_bytes: Optional[int] = None):
+        """Re-estimate a session's size from its content, or from its saved state"""
+        estimate = getattr(entry.session, "estimated_bytes", None)
+        if estimate is not None:
+            size = SESSION_BASE_BYTES + estimate()
+        elif saved_bytes is not None:
+            size = SESSION_BASE_BYTES + saved_bytes
+        else:
+            return
+        if self.live.get(session_id) is entry:
+            self.live_bytes += size - entry.size
+        entry.size = size
+
+    def release(self, session_id: str):
+        """Drop a connection; without one the session becomes evictable"""
+        entry = self.live.get(session_id)
+        if entry is None:
+            return
+        entry.active = max(0, entry.active - 1)
+        entry.last_seen = self.clock()
+        if entry.active == 0:
+            # Limits held off while every session was connected apply now
+            self.enforce_limits()
+
+    async def flush(self) -> int:
+        """Write pending session state to the backend"""
+        return await asyncio.to_thread(self.state.flush)
+
+    async def prune(self) -> int:
+        """Delete stored state untouched for longer than state_ttl"""
+        if not self.state_ttl:
+            return 0
+        return await asyncio.to_thread(self.state.prune, self.state_ttl)
+
+    def sweep(self) -> int:
+        """Evict sessions idle for longer than the TTL"""
+        cutoff = self.clock() - self.idle_ttl
+        expired = [sid for sid, entry in self.live.items()
+                   if entry.active == 0 and entry.last_seen < cutoff]
+        for session_id in expired:
+            self._evict(session_id)
+        self.counters["evicted_idle"] += len(expired)
+        return len(expired)
+
+    def enforce_limits(self):
+        """Evict least recently used idle sessions until under both limits"""
+        for session_id in list(self.live):
+            if len(self.live) <= self.max_sessions and self.live_bytes <= self.max_bytes:
+                break
+            if self.live[session_id].active:
+                continue
+            reason = "evicted_lru" if len(self.live) > self.max_sessions else "evicted_memory"
+            self._evict(session_id)
+            self.counters[reason] += 1
+
+    def _evict(self, session_id: str):
+        # State was queued for saving after its last turn; just unload it
+        entry = self.live.pop(session_id)
+        self.live_bytes -= entry.size
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.live or self.state.get(session_id) is not None
+
+    def metrics(self) -> Dict:
+        return {
+            "live_sessions": len(self.live),
+            "active_sessions": sum(1 for entry in self.live.values() if entry.active),
+            "live_bytes": self.live_bytes,
+            **self.counters,
+            "state": self.state.stats(),
+        }
@@ -0,0 +1,117 @@
+# stream_frames.py
+# Coalesce streamed text chunks into WebSocket frames
+# ============================================================================
+#
+# Ollama streams roughly one token per chunk. Sending each as its own frame
+# costs a send call, a frame header and a hop through the Nest gateway per
+# token. Chunks are buffered and flushed as one frame once the buffer holds
+# max_bytes or its oldest chunk is max_delay old. The first chunk of a
+# stream goes out immediately so time to first token does not grow, and so
+# does every chunk while tokens arrive further apart than max_delay (a
+# CPU-bound model): nothing would join them in time, so waiting only adds
+# latency. The gap is a moving average, so one stall doesn't switch modes.
+# Cancelling the consumer cancels the pending read, which unwinds the source
+# generators and closes the upstream request.
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict
+
+
+class FrameCoalescer:
+    """Merges text chunks by size and age when they arrive faster than max_delay;
+    non-text items pass through in order"""
+
+    # Weight of the newest gap in the moving average of inter-chunk gaps
+    GAP_SMOOTHING = 0.3
+
+    def __init__(self, max_bytes: int = 64, max_delay: float = 0.02):
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.counters = {"streams": 0, "chunks_in": 0, "frames_out": 0, "bytes_out": 0,
+                         "slow_flushes": 0}
+
+    async def frames(self, source: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        self.counters["streams"] += 1
+        iterator = source.__aiter__()
+        parts = []
+        size = 0
+        first_at = 0.0
+        sent_any = False
+        last_at = None
+        gap = 0.0
+        pending = None
+
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                timeout = None
+                if parts:
+                    timeout = max(0.0, first_at + self.max_delay - time.perf_counter())
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+
+                if not done:
+                    # Upstream is slow; don't hold buffered text any longer
+                    yield self._flush(parts)
+                    parts, size = [], 0
+                    continue
+
+                task, pending = pending, None
+                try:
+                    item = task.result()
+                except StopAsyncIteration:
+                    break
+
+                if not isinstance(item, str):
+                    if parts:
+                        yield self._flush(parts)
+                        parts, size = [], 0
+                    yield item
+                    continue
+                if not item:
+                    continue
+
+                self.counters["chunks_in"] += 1
+                now = time.perf_counter()
+                if last_at is not None:
+                    observed = now - last_at
+                    gap = observed if gap == 0.0 else gap + self.GAP_SMOOTHING * (observed - gap)
+                last_at = now
+                if not parts:
+                    first_at = now
+                parts.append(item)
+                size += len(item.encode("utf-8"))
+                slow = gap >= self.max_delay
+                if not sent_any or slow or size >= self.max_bytes:
+                    if sent_any and slow:
+                        self.counters["slow_flushes"] += 1
+                    sent_any = True
+                    yield self._flush(parts)
+                    parts, size = [], 0
+
+            if parts:
+                yield self._flush(parts)
+        finally:
+            # Cancelled or abandoned mid-stream: unwind the source now, so
+            # the upstream request closes before this generator returns
+            if pending is not None and not pending.done():
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _flush(self, parts) -> str:
+        frame = "".join(parts)
+        self.counters["frames_out"] += 1
+        self.counters["bytes_out"] += len(frame.encode("utf-8"))
+        return frame
+
+    def metrics(self) -> Dict:
+        frames = self.counters["frames_out"]
+        return {
+            **self.counters,
+            "chunks_per_frame": self.counters["chunks_in"] / frames if frames else 0.0,
+            "bytes_per_frame": self.counters["bytes_out"] / frames if frames else 0.0,
+        }
@@ -0,0 +1,109 @@
+# tourism_classifier.py
+# Local keyword/gazetteer classifier for tourism-related messages
+# ============================================================================
+#
+# Runs in microseconds on the CPU so most messages never need the extra
+# YES/NO round trip to Ollama. Only low-confidence messages fall back to
+# AICore.is_tourism_related.
+
+import re
+from typing import Iterable, List, Set, Tuple
+
+# ============================================================================
+# VOCABULARY
+# ============================================================================
+
+TOURISM_KEYWORDS = {
+    # English
+    "egypt", "egyptian", "travel", "trip", "visit", "visiting", "tour", "tourist",
+    "tourism", "vacation", "holiday", "itinerary", "hotel", "resort", "flight",
+    "ticket", "tickets", "guide", "sightseeing", "landmark", "attraction",
+    "pyramid", "pyramids", "sphinx", "pharaoh", "pharaohs", "tomb", "tombs",
+    "temple", "temples", "museum", "museums", "nile", "cruise", "felucca",
+    "desert", "oasis", "safari", "beach", "beaches", "diving", "snorkeling",
+    "bazaar", "souk", "market", "mosque", "church", "citadel", "history",
+    "ancient", "culture", "food", "cuisine", "koshari", "felafel", "falafel",
+    "visa", "currency", "weather", "season", "park", "zoo", "aquarium",
+    # French
+    "egypte", "voyage", "visiter", "musée", "pyramides", "temple", "plage",
+    "désert", "croisière", "caire",
+}
+
+TOURISM_KEYWORDS_AR = [
+    "مصر", "سياح", "سفر", "رحلة", "زيارة", "فندق", "متحف", "هرم", "أهرام",
+    "اهرام", "معبد", "نيل", "شاطئ", "صحراء", "سوق", "مسجد", "قلعة", "آثار",
+    "اثار", "فرعون", "تذكرة", "أكل", "القاهرة", "الجيزة", "الأقصر", "أسوان",
+    "الإسكندرية",
+]
+
+CASUAL_PATTERNS = [
+    r"^(hi|hello|hey|yo|hiya|good (morning|evening|afternoon))\b",
+    r"\bhow are you\b", r"\bwhat'?s up\b", r"\bthank(s| you)\b", r"\bwho are you\b",
+    r"\bwhat is your name\b", r"\bbonjour\b", r"\bmerci\b", r"\bça va\b",
+    r"مرحب", r"اهلا", r"أهلا", r"عامل ا", r"ازيك", r"إزيك", r"شكرا", r"السلام عليكم",
+]
+
+# Words too generic to count as a gazetteer hit on their own
+GAZETTEER_STOPWORDS = {
+    "the", "of", "and", "in", "at", "a", "an", "el", "al", "de", "la",
+    "center", "centre", "house", "tower", "garden", "club", "city", "new",
+    "old", "street", "square", "cafe", "company", "hall", "shows", "games",
+    "fun", "activities", "resources", "traveler", "outdoor", "water",
+}
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# ============================================================================
+# CLASSIFIER
+# ============================================================================
+
+class TourismClassifier:
+    """Cheap tourism/casual classifier with a confidence score.
+
+    Confidence >= the caller's threshold means the label can be trusted
+    without asking the LLM.
+    """
+
+    def __init__(self, cities: Iterable[str] = (), categories: Iterable[str] = (),
+                 landmark_names: Iterable[str] = ()):
+        self.keywords: Set[str] = set(TOURISM_KEYWORDS)
+        self.gazetteer: Set[str] = set()
+
+        for value in list(cities) + list(categories) + list(landmark_names):
+            for token in self._tokenize(value):
+                if len(token) > 2 and token not in GAZETTEER_STOPWORDS:
+                    self.gazetteer.add(token)
+
+        self.casual_patterns = [re.compile(p, re.IGNORECASE) for p in CASUAL_PATTERNS]
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def classify(self, text: str, interests: Iterable[str] = ()) -> Tuple[bool, float]:
+        """Return (is_tourism, confidence) for a user message"""
+        text_lower = text.lower()
+        tokens = self._tokenize(text_lower)
+
+        keyword_hits = sum(1 for t in tokens if t in self.keywords)
+        keyword_hits += sum(1 for kw in TOURISM_KEYWORDS_AR if kw in text_lower)
+        gazetteer_hits = sum(1 for t in tokens if t in self.gazetteer)
+        interest_hits = len(list(interests))
+        casual = any(p.search(text_lower) for p in self.casual_patterns)
+
+        evidence = 2 * keyword_hits + 2 * interest_hits + gazetteer_hits
+
+        if evidence >= 2:
+            return True, min(0.99, 0.75 + 0.05 * evidence)
+
+        if casual and evidence == 0:
+            return False, 0.9 if len(tokens) <= 8 else 0.7
+
+        if evidence == 1:
+            return True, 0.6
+
+        # Short messages with no signal are almost always small talk
+        if len(tokens) <= 3:
+            return False, 0.6
+
+        return False, 0.5
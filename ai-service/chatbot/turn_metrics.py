@@ -0,0 +1,109 @@
+# turn_metrics.py
+# Per-turn latency and throughput figures, aggregated for /metrics
+# ============================================================================
+#
+# Every finished (or abandoned) chat turn reports the timings dict built by
+# EgyptianTourismChatbot.process_query_stream. Counts, sums and maxima are
+# kept for the life of the process; percentiles come from the most recent
+# samples of each series, so they describe current load rather than the
+# average since startup. Optionally each turn is also logged as one JSON line.
+
+import json
+import logging
+import threading
+from collections import Counter, deque
+from typing import Deque, Dict, Optional
+
+# Numeric fields of a turn record that are aggregated
+SERIES = ("ttft_ms", "total_ms", "queue_ms", "classify_ms", "retrieval_ms", "tokens_per_second",
+          "prompt_tokens", "evaluated_tokens", "completion_tokens")
+
+
+def _percentile(ordered, pct: float) -> float:
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class _Series:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def summary(self) -> Dict:
+        if not self.count:
+            return {"count": 0}
+        ordered = sorted(self.recent)
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 2),
+            "max": round(self.max, 2),
+            "p50": round(_percentile(ordered, 50), 2),
+            "p95": round(_percentile(ordered, 95), 2),
+            "p99": round(_percentile(ordered, 99), 2),
+        }
+
+
+def turn_record(timings: Dict) -> Dict:
+    """Flat, JSON-ready view of one turn's timings"""
+    prompt = timings.get("prompt") or {}
+    retrieval = timings.get("retrieval") or {}
+    record = {
+        "outcome": timings.get("outcome", "cancelled"),
+        "cache": timings.get("cache"),
+        "classify_method": timings.get("classify_method"),
+        "prompt_tokens": prompt.get("prompt_tokens"),
+        "evaluated_tokens": prompt.get("evaluated_tokens"),
+        "queue_ms": prompt.get("queue_ms"),
+        "history_sent": prompt.get("history_sent"),
+        "landmarks": retrieval.get("selected"),
+    }
+    for key in ("ttft_ms", "total_ms", "classify_ms", "retrieval_ms", "interests_ms",
+                "completion_tokens", "tokens_per_second"):
+        record[key] = timings.get(key)
+    return record
+
+
+class TurnMetrics:
+    """Process-wide aggregate of chat turn records"""
+
+    def __init__(self, window: int = 1000, log: Optional[logging.Logger] = None):
+        self.window = window
+        self.log = log
+        self.series = {name: _Series(window) for name in SERIES}
+        self.outcomes: Counter = Counter()
+        self.classify_methods: Counter = Counter()
+        # observe() runs on the event loop, metrics() in the endpoint's worker thread
+        self.lock = threading.Lock()
+
+    def observe(self, timings: Dict):
+        record = turn_record(timings)
+        with self.lock:
+            self.outcomes[record["outcome"]] += 1
+            if record["classify_method"]:
+                self.classify_methods[record["classify_method"]] += 1
+            for name in SERIES:
+                value = record.get(name)
+                if value is not None:
+                    self.series[name].add(float(value))
+        if self.log is not None:
+            self.log.info(json.dumps({"event": "chat_turn", **record}, ensure_ascii=False))
+
+    def metrics(self) -> Dict:
+        with self.lock:
+            return {
+                "turns": sum(self.outcomes.values()),
+                "outcomes": dict(self.outcomes),
+                "classify_methods": dict(self.classify_methods),
+                "window": self.window,
+                **{name: series.summary() for name, series in self.series.items()},
+            }
@@ -0,0 +1,164 @@
+"""
+CLI startup benchmark: time until Fahmy's command line is usable.
+
+Starts the fake Ollama server in-process and runs fahmy_chatbot.py in
+fresh interpreters, reporting the median over --runs of:
+  * import      importing chatbot_core (and, separately, pandas)
+  * --test      the model connection check
+  * prompt      launch until the "You:" prompt is shown
+  * reply       first message sent until the first answer text arrives;
+                the message goes --think seconds after the prompt appears
+                (0: at once, so any loading still running is included)
+Pass --legacy with another copy of the CLI (e.g. one exported with
+git show) to measure its prompt and reply times the same way.
+
+    python scripts/bench_cli_startup.py --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT_DIR = os.path.join(BASE_DIR, "chatbot")
+CLI_PATH = os.path.join(CHATBOT_DIR, "fahmy_chatbot.py")
+sys.path.insert(0, CHATBOT_DIR)
+
+FAKE_OLLAMA_PORT = 11441
+FAKE_OLLAMA_URL = f"http://127.0.0.1:{FAKE_OLLAMA_PORT}"
+
+import fake_ollama  # noqa: E402
+from local_servers import serve_in_thread  # noqa: E402
+
+MESSAGE = "Tell me about the pyramids of Giza"
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+
+def child_env():
+    return {**os.environ, "OLLAMA_BASE_URL": f"{FAKE_OLLAMA_URL}/api", "PYTHONUNBUFFERED": "1"}
+
+
+def timed_run(args) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=CHATBOT_DIR, env=child_env(),
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+
+class Output:
+    """Incremental reader of a child's stdout"""
+
+    def __init__(self, proc):
+        self.fd = proc.stdout.fileno()
+        self.buffer = b""
+
+    def wait_for(self, marker: bytes, after: int = 0) -> int:
+        """Read until ``marker`` appears past offset ``after``; returns the offset past it"""
+        while True:
+            found = self.buffer.find(marker, after)
+            if found >= 0:
+                return found + len(marker)
+            chunk = os.read(self.fd, 4096)
+            if not chunk:
+                raise RuntimeError(f"CLI exited before printing {marker!r}: {self.buffer[-300:]!r}")
+            self.buffer += chunk
+
+    def wait_for_more(self, offset: int):
+        while len(self.buffer.rstrip()) <= offset:
+            chunk = os.read(self.fd, 4096)
+            if not chunk:
+                raise RuntimeError("CLI exited before answering")
+            self.buffer += chunk
+
+
+def interactive_run(cli_path, think):
+    """(seconds to the prompt, seconds from the first message to answer text)"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, cli_path, FAKE_OLLAMA_URL], cwd=CHATBOT_DIR,
+                            env=child_env(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL)
+    output = Output(proc)
+    try:
+        offset = output.wait_for("You: ".encode())
+        prompt = time.perf_counter() - start
+        time.sleep(think)
+
+        sent = time.perf_counter()
+        proc.stdin.write(f"{MESSAGE}\n".encode())
+        proc.stdin.flush()
+        offset = output.wait_for("Fahmy: ".encode(), offset)
+        output.wait_for_more(offset)
+        reply = time.perf_counter() - sent
+
+        output.wait_for("You: ".encode(), offset)
+        proc.stdin.write(b"exit\n")
+        proc.stdin.flush()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            # The previous CLI missed some of its own farewells and kept prompting
+            pass
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    return prompt, reply
+
+
+def median_ms(samples) -> str:
+    return f"{statistics.median(samples) * 1000:>8.0f}" if samples else f"{'-':>8}"
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+def measure(cli_path, runs, think, test=True):
+    # The previous CLI ignored the URL with --test and checked localhost instead
+    test = [timed_run([cli_path, FAKE_OLLAMA_URL, "--test"]) for _ in range(runs)] if test else None
+    sessions = [interactive_run(cli_path, think) for _ in range(runs)]
+    return test, [p for p, _ in sessions], [r for _, r in sessions]
+
+
+def main(runs, think, legacy):
+    fake_ollama.FAKE_CONFIG.update(first_token_latency=0.0, tokens_per_second=10000)
+    server, thread = serve_in_thread(fake_ollama.app, FAKE_OLLAMA_PORT)
+
+    try:
+        imports = {
+            "import chatbot_core": [timed_run(["-c", "import chatbot_core"]) for _ in range(runs)],
+            "import pandas": [timed_run(["-c", "import pandas"]) for _ in range(runs)],
+            "python (empty)": [timed_run(["-c", "pass"]) for _ in range(runs)],
+        }
+        clis = {"fahmy_chatbot.py": measure(CLI_PATH, runs, think)}
+        if legacy:
+            clis[f"{os.path.basename(legacy)} (legacy)"] = measure(os.path.abspath(legacy), runs, think, test=False)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    print(f"median of {runs} runs, milliseconds; first message {think:g}s after the prompt")
+    for name, samples in imports.items():
+        print(f"{name:<32}{median_ms(samples)}")
+    print()
+    print(f"{'cli':<32}{'--test':>8}{'prompt':>8}{'reply':>8}")
+    for name, (test, prompt, reply) in clis.items():
+        print(f"{name:<32}{median_ms(test)}{median_ms(prompt)}{median_ms(reply)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="seconds between the prompt and the first message")
+    parser.add_argument("--legacy", help="another fahmy_chatbot.py to measure the same way")
+    args = parser.parse_args()
+    main(args.runs, args.think, args.legacy)
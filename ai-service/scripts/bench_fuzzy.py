@@ -0,0 +1,96 @@
+"""
+Fuzzy landmark name lookup benchmark: trigram index vs pairwise edit distance.
+
+Builds a synthetic catalogue of real landmark names plus generated names,
+then times misspelled queries through FuzzyNameIndex and through a plain
+edit-distance comparison against every name.
+
+    python scripts/bench_fuzzy.py --size 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT_DIR = os.path.join(BASE_DIR, "chatbot")
+sys.path.insert(0, CHATBOT_DIR)
+
+import pandas as pd  # noqa: E402
+
+from fuzzy_index import FuzzyNameIndex, bounded_levenshtein, normalize_name  # noqa: E402
+
+EXTRA_NAMES = [
+    "Karnak Temple", "Abu Simbel Temples", "Valley of the Kings", "Luxor Temple",
+    "Philae Temple", "Bibliotheca Alexandrina", "Citadel of Qaitbay", "Temple of Hatshepsut",
+    "مكتبة الإسكندرية", "معبد الكرنك", "وادي الملوك", "قلعة قايتباي",
+]
+QUERIES = ["Karnac", "Abu Simble", "valey of the kings", "Khan el Khalilli",
+           "egyptain museum", "مكتبه الاسكندريه", "temple of hatshepsot"]
+SYLLABLES = ["ka", "ra", "mo", "el", "sha", "ba", "zi", "nu", "ta", "ho", "qa", "de", "al", "wa"]
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+
+def synthetic_names(size, seed=0):
+    rng = random.Random(seed)
+    real = pd.read_csv(os.path.join(CHATBOT_DIR, "filtered_landmark_dataset.csv"))["name"].astype(str).tolist()
+    names = real + EXTRA_NAMES
+    while len(names) < size:
+        words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+                 for _ in range(rng.randint(1, 3))]
+        names.append(" ".join(w.capitalize() for w in words) + " " + rng.choice(
+            ["Temple", "Museum", "Park", "Mosque", "Palace", "Gallery", "Market"]))
+    return names[:size]
+
+
+def pairwise_search(names, query, limit=5):
+    query = normalize_name(query)
+    max_distance = max(1, len(query) // 3)
+    scored = []
+    for row, name in enumerate(names):
+        distance = bounded_levenshtein(query, name, max_distance)
+        for window in name.split():
+            distance = min(distance, bounded_levenshtein(query, window, max_distance))
+        if distance <= max_distance:
+            scored.append((distance, row))
+    return sorted(scored)[:limit]
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+def main(size):
+    names = synthetic_names(size)
+    ids = [f"landmark_{i}" for i in range(len(names))]
+
+    start = time.perf_counter()
+    index = FuzzyNameIndex(ids, names)
+    print(f"indexed {len(names)} names in {time.perf_counter() - start:.2f}s")
+
+    normalized = [normalize_name(n) for n in names]
+    print(f"{'query':<22}{'index':>10}{'pairwise':>12}  top match")
+    for query in QUERIES:
+        start = time.perf_counter()
+        results = index.search(query, limit=3)
+        index_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        pairwise_search(normalized, query, limit=3)
+        pairwise_ms = (time.perf_counter() - start) * 1000
+
+        top = names[ids.index(results[0][0])] if results else "-"
+        print(f"{query:<22}{index_ms:>8.2f}ms{pairwise_ms:>10.0f}ms  {top}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    main(parser.parse_args().size)
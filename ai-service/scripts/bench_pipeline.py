@@ -0,0 +1,81 @@
+"""
+Time-to-first-token benchmark: sequential vs pipelined chat turns.
+
+Runs the same messages through EgyptianTourismChatbot with
+CONFIG["pipelined_generation"] off and on, against the fake Ollama server
+started in-process, and prints the mean per-stage timings.
+
+    python scripts/bench_pipeline.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+
+import uvicorn
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+FAKE_OLLAMA_PORT = 11436
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{FAKE_OLLAMA_PORT}/api"
+
+import fake_ollama  # noqa: E402
+from chatbot_core import CONFIG, EgyptianTourismChatbot  # noqa: E402
+
+# Ambiguous messages the local classifier defers to the LLM, plus clear ones
+MESSAGES = [
+    "Explain quantum computing simply",
+    "I'm not sure what to do next week",
+    "Tell me about the pyramids",
+    "What should I eat in Alexandria?",
+]
+STAGES = ["interests_ms", "classify_ms", "retrieval_ms", "ttft_ms", "total_ms"]
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+async def run_turns(pipelined: bool, rounds: int):
+    CONFIG["pipelined_generation"] = pipelined
+    # Built off the loop: the first Ollama health probe is a blocking call
+    chatbot = await asyncio.to_thread(EgyptianTourismChatbot)
+    samples = {stage: [] for stage in STAGES}
+
+    for _ in range(rounds):
+        for message in MESSAGES:
+            async for _chunk in chatbot.process_query_stream(message):
+                pass
+            for stage in STAGES:
+                samples[stage].append(chatbot.last_timings.get(stage, 0.0))
+
+    return {stage: statistics.mean(values) for stage, values in samples.items()}
+
+
+async def main(rounds: int = 3):
+    server = uvicorn.Server(uvicorn.Config(
+        fake_ollama.app, port=FAKE_OLLAMA_PORT, log_level="warning"
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    try:
+        sequential = await run_turns(False, rounds)
+        pipelined = await run_turns(True, rounds)
+    finally:
+        server.should_exit = True
+        await server_task
+
+    print(f"{'stage':<14}{'sequential':>12}{'pipelined':>12}")
+    for stage in STAGES:
+        print(f"{stage:<14}{sequential[stage]:>10.1f}ms{pipelined[stage]:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+Prompt prefix reuse benchmark: context-in-the-middle vs static persona prefix.
+
+Replays one conversation against the fake Ollama server (started in-process
+with prefix caching and a simulated CPU prefill rate) using the old prompt
+layout, where per-turn context sat inside the system prompt, and the
+current layout, where the persona is a byte-identical prefix. Reports the
+prompt tokens sent, the tokens the server had to prefill, and the prefill
+time that saved.
+
+    python scripts/bench_prompt_prefix.py --prefill-rate 500
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+import uvicorn
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+FAKE_OLLAMA_PORT = 11437
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{FAKE_OLLAMA_PORT}/api"
+
+import fake_ollama  # noqa: E402
+from chatbot_core import (CONFIG, PERSONA_PROMPT, AICore,  # noqa: E402
+                          ConversationManager, KnowledgeBase)
+
+MESSAGES = [
+    "Hi! I'm planning my first trip to Egypt",
+    "Tell me about the pyramids of Giza",
+    "What museums should I see in Cairo?",
+    "Is Luxor worth two days?",
+    "What about temples in Aswan?",
+    "Any good markets for souvenirs?",
+    "What should I eat in Alexandria?",
+    "How do I get from Cairo to Luxor?",
+]
+
+# ─────────────────────────────────────────────
+# Layouts
+# ─────────────────────────────────────────────
+
+def legacy_messages(ai_core, user_input, context, history, digest):
+    """The previous layout: context inside the system prompt, then history"""
+    head, tail = PERSONA_PROMPT.split("HOW TO USE THE KNOWLEDGE:")
+    system = f"{head}KNOWLEDGE BASE:\n{context}\n\nHOW TO USE THE KNOWLEDGE:{tail}"
+    messages = [{"role": "system", "content": system}]
+    messages.extend({"role": m["role"], "content": m["content"]} for m in list(history)[-6:])
+    messages.append({"role": "user", "content": user_input})
+    return messages
+
+
+def stable_messages(ai_core, user_input, context, history, digest):
+    return ai_core._build_messages(user_input, context, history, digest)
+
+# ─────────────────────────────────────────────
+# Runs
+# ─────────────────────────────────────────────
+
+async def replay(ai_core, knowledge_base, build):
+    fake_ollama.MODEL_STATE.update(loaded_until=0.0, slots=[])
+    conversation = ConversationManager()
+    sent = evaluated = 0
+
+    for message in MESSAGES:
+        context = conversation.update_context(knowledge_base, message)
+        messages = build(ai_core, message, context, conversation.history, conversation.digest)
+        sent += fake_ollama.count_tokens(fake_ollama._render_prompt(messages))
+
+        reply = ""
+        async for chunk in ai_core._chat_stream(messages, ai_core._generation_options(0.8)):
+            reply += chunk or ""
+        evaluated += ai_core.last_prompt.get("evaluated_tokens") or 0
+
+        conversation.add_message("user", message)
+        conversation.add_message("assistant", reply)
+
+    return sent, evaluated
+
+
+async def main(prefill_rate):
+    fake_ollama.FAKE_CONFIG.update(prefill_tokens_per_second=prefill_rate, first_token_latency=0.0,
+                                   tokens_per_second=10000, load_latency=2.0)
+    server = uvicorn.Server(uvicorn.Config(
+        fake_ollama.app, port=FAKE_OLLAMA_PORT, log_level="warning"
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    try:
+        # Built off the loop: the first Ollama health probe is a blocking call
+        ai_core = await asyncio.to_thread(AICore)
+        knowledge_base = await asyncio.to_thread(KnowledgeBase)
+        results = {"context in system prompt": await replay(ai_core, knowledge_base, legacy_messages),
+                   "static persona prefix": await replay(ai_core, knowledge_base, stable_messages)}
+    finally:
+        server.should_exit = True
+        await server_task
+
+    print(f"{len(MESSAGES)} turns, simulated prefill {prefill_rate:.0f} tokens/s, "
+          f"keep_alive={CONFIG['ollama_keep_alive']}")
+    print(f"{'layout':<26}{'sent':>8}{'prefilled':>11}{'avoided':>9}{'prefill s':>11}")
+    for name, (sent, evaluated) in results.items():
+        print(f"{name:<26}{sent:>8}{evaluated:>11}{sent - evaluated:>9}{evaluated / prefill_rate:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--prefill-rate", type=float, default=500.0,
+                        help="simulated prompt tokens per second (CPU Ollama)")
+    asyncio.run(main(parser.parse_args().prefill_rate))
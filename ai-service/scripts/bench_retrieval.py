@@ -0,0 +1,131 @@
+"""
+Landmark retrieval benchmark: legacy substring scan vs the BM25 inverted index.
+
+The real catalogue is replicated (with numbered names) up to each target
+size, then the same queries run through both approaches. First checks
+that messages made only of stopwords and possessive or contraction
+fragments ("what's near me") get no lexical hits on the real catalogue.
+
+    python scripts/bench_retrieval.py --sizes 500 50000 500000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+from chatbot_core import CONFIG, KnowledgeBase  # noqa: E402
+from search_index import InvertedIndex  # noqa: E402
+
+QUERIES = [
+    "Tell me about the pyramids",
+    "egyptian museum",
+    "khan el khalili bazaar",
+    "zamalek",
+    "parks in giza",
+    "cairo tower",
+]
+
+# Nothing in these names a landmark; "what's" must not match every "St. X's"
+NO_MATCH_QUERIES = [
+    "what's near me",
+    "I'm here, what's there?",
+    "where's the best place",
+]
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+
+def scan_search(landmarks, query, limit=5):
+    """The original KnowledgeBase.search_landmarks linear scan"""
+    query = query.lower()
+    results = []
+    for landmark in landmarks.values():
+        score = 0
+        if query in landmark['name'].lower():
+            score += 3
+        if query in landmark['city'].lower():
+            score += 2
+        if query in landmark['subcategory'].lower():
+            score += 1
+        if query in landmark['description'].lower():
+            score += 1
+        if score > 0:
+            results.append((score, landmark))
+    results.sort(key=lambda x: x[0], reverse=True)
+    return [item[1] for item in results[:limit]]
+
+
+def synthetic_catalog(base, size):
+    rows = list(base.values())
+    catalog = {}
+    for i in range(size):
+        row = dict(rows[i % len(rows)])
+        copy = i // len(rows)
+        if copy:
+            row["name"] = f"{row['name']} {copy}"
+        row["id"] = f"landmark_{i}"
+        catalog[row["id"]] = row
+    return catalog
+
+
+def time_queries(fn, repeats):
+    samples = []
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn(query)
+        samples.append((time.perf_counter() - start) / repeats * 1000)
+    return statistics.mean(samples), max(samples)
+
+
+def check_no_match(knowledge_base) -> bool:
+    ok = True
+    for query in NO_MATCH_QUERIES:
+        hits = knowledge_base.search_landmarks(query)
+        print(f"no-match {query!r}: {len(hits)} hits{'' if not hits else ' ' + repr(hits[0]['name'])}")
+        ok = ok and not hits
+    return ok
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+def main(sizes):
+    knowledge_base = KnowledgeBase()
+    if not check_no_match(knowledge_base):
+        print("FAILED")
+        return False
+    print()
+    base = knowledge_base.landmarks
+
+    print(f"{'landmarks':>10} {'build':>9} {'scan mean':>11} {'index mean':>11} {'index max':>10} {'speedup':>8}")
+    for size in sizes:
+        catalog = synthetic_catalog(base, size)
+
+        start = time.perf_counter()
+        index = InvertedIndex(CONFIG["search_field_weights"]).build(catalog.items())
+        build_s = time.perf_counter() - start
+
+        scan_repeats = max(1, 5000 // size)
+        scan_mean, _ = time_queries(lambda q: scan_search(catalog, q), scan_repeats)
+        index_mean, index_max = time_queries(lambda q: index.search(q, 5), 200)
+
+        print(f"{size:>10} {build_s:>8.2f}s {scan_mean:>9.2f}ms {index_mean:>9.3f}ms "
+              f"{index_max:>8.3f}ms {scan_mean / index_mean:>7.0f}x")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 50000, 500000])
+    sys.exit(0 if main(parser.parse_args().sizes) else 1)
@@ -0,0 +1,127 @@
+"""
+Rolling summary benchmark: prompt size and recall over a long conversation.
+
+Replays one long chat through EgyptianTourismChatbot against the fake
+Ollama server (started in-process), once with the history digest only and
+once with the background running summary. The tourist states their
+constraints in the first turn only. Reports the prompt tokens per turn, the
+part of them spent on earlier turns (history, digest, summary), and whether
+those constraints are still in the prompt of each later turn.
+
+    python scripts/bench_rolling_summary.py --turns 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+FAKE_OLLAMA_PORT = 11440
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{FAKE_OLLAMA_PORT}/api"
+
+import fake_ollama  # noqa: E402
+from local_servers import serve_in_thread  # noqa: E402
+from chatbot_core import CONFIG, EgyptianTourismChatbot, KnowledgeBase  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+FIRST_MESSAGE = "I'm vegetarian and travel in a wheelchair, planning ten days in Egypt"
+FACTS = ("vegetarian", "wheelchair")
+
+MESSAGES = [
+    "Tell me about the pyramids of Giza",
+    "What museums should I see in Cairo?",
+    "Is Luxor worth two days?",
+    "What about temples in Aswan?",
+    "Any good markets for souvenirs in Cairo?",
+    "What should I eat in Alexandria?",
+    "How do I get from Cairo to Luxor?",
+    "Tell me about the Valley of the Kings",
+    "Is Abu Simbel worth the trip from Aswan?",
+    "What beaches are near Hurghada?",
+    "Which mosques can I visit in Islamic Cairo?",
+    "What is there to see in Siwa?",
+]
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+
+def conversation(turns):
+    return [FIRST_MESSAGE] + [MESSAGES[i % len(MESSAGES)] for i in range(turns - 1)]
+
+# ─────────────────────────────────────────────
+# Runs
+# ─────────────────────────────────────────────
+
+async def replay(knowledge_base, messages, rolling_summary):
+    CONFIG["rolling_summary"] = rolling_summary
+    # Answers are never reused, so every turn reaches the model
+    cache = ResponseCache(ttl=-1)
+    chatbot = await asyncio.to_thread(EgyptianTourismChatbot, knowledge_base, cache)
+
+    # Keep the prompt of every generation call; summary requests go through chat()
+    prompts = []
+    build = chatbot.ai_core._build_messages
+
+    def recording_build(*args, **kwargs):
+        built = build(*args, **kwargs)
+        prompts.append("\n".join(m["content"] for m in built))
+        return built
+
+    chatbot.ai_core._build_messages = recording_build
+
+    tokens, carried, recalled = [], [], []
+    for message in messages:
+        async for _ in chatbot.process_query_stream(message):
+            pass
+        stats = chatbot.last_timings["prompt"]
+        tokens.append(stats["prompt_tokens"])
+        carried.append(stats["history_tokens"] + stats["digest_tokens"] + stats["summary_tokens"])
+        recalled.append(all(fact in prompts[-1].lower() for fact in FACTS))
+        # The tourist reads the answer before typing; a pending fold finishes meanwhile
+        if chatbot.summary_task is not None:
+            await chatbot.summary_task
+
+    return tokens, carried, recalled, chatbot.conversation.summary
+
+
+async def main(turns, summary_tokens):
+    fake_ollama.FAKE_CONFIG.update(first_token_latency=0.0, tokens_per_second=10000, num_tokens=60)
+    CONFIG["summary_tokens"] = summary_tokens
+    server, thread = await asyncio.to_thread(serve_in_thread, fake_ollama.app, FAKE_OLLAMA_PORT)
+
+    messages = conversation(turns)
+    try:
+        knowledge_base = await asyncio.to_thread(KnowledgeBase)
+        results = {"digest only": await replay(knowledge_base, messages, False),
+                   "rolling summary": await replay(knowledge_base, messages, True)}
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join)
+
+    print(f"{turns} turns, history limit {CONFIG['conversation_history_limit'] * 2} messages, "
+          f"summary every {CONFIG['summary_batch_messages']} messages "
+          f"keeping {CONFIG['summary_keep_messages']}, cap {summary_tokens} tokens")
+    print(f"{'mode':<18}{'prompt':>8}{'last 5':>8}{'earlier turns':>15}{'last 5':>8}"
+          f"{'recalled':>10}{'last turn':>11}")
+    for name, (tokens, carried, recalled, _) in results.items():
+        print(f"{name:<18}{sum(tokens) / len(tokens):>8.0f}{sum(tokens[-5:]) / 5:>8.0f}"
+              f"{sum(carried) / len(carried):>15.0f}{sum(carried[-5:]) / 5:>8.0f}"
+              f"{sum(recalled[1:]):>6}/{len(recalled) - 1:<3}"
+              f"{'yes' if recalled[-1] else 'no':>11}")
+    print(f"final summary: {results['rolling summary'][3]!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20, help="at least 5")
+    parser.add_argument("--summary-tokens", type=int, default=CONFIG["summary_tokens"])
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.summary_tokens))
@@ -0,0 +1,170 @@
+"""
+Session state backend benchmark: per-turn synchronous writes vs write-behind.
+
+Simulates chat turns against the memory, SQLite and Redis-compatible
+backends (Redis via an in-process stand-in with the redis-py client API),
+then checks that a second worker sharing the backend picks the
+conversation up where the first left off.
+
+    python scripts/bench_session_store.py --sessions 200 --turns 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+from chatbot_core import ConversationManager  # noqa: E402
+from session_backends import (MemoryStateBackend, RedisStateBackend,  # noqa: E402
+                              SQLiteStateBackend)
+from session_store import SessionStore, encode_state  # noqa: E402
+
+# ─────────────────────────────────────────────
+# Stand-ins
+# ─────────────────────────────────────────────
+
+class LocalRedis:
+    """The slice of the redis-py client API RedisStateBackend uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def pipeline(self):
+        return LocalRedisPipeline(self)
+
+
+class LocalRedisPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+
+    def execute(self):
+        for key, value in self.commands:
+            self.client.set(key, value)
+        self.commands = []
+
+
+class ChatSession:
+    """Conversation state only, no model or knowledge base"""
+
+    def __init__(self):
+        self.conversation = ConversationManager()
+        self.stats = {"total_queries": 0}
+
+    def turn(self, i):
+        self.stats["total_queries"] += 1
+        self.conversation.add_message("user", f"What can I see in Luxor on day {i}?")
+        self.conversation.add_message("assistant", "Karnak Temple, Luxor Temple and the Valley of the Kings. " * 4)
+
+    def export_state(self):
+        return {"conversation": self.conversation.export_state(), "stats": dict(self.stats)}
+
+    def restore_state(self, state):
+        self.conversation.restore_state(state["conversation"])
+        self.stats.update(state["stats"])
+
+# ─────────────────────────────────────────────
+# Runs
+# ─────────────────────────────────────────────
+
+def make_backends(tmpdir):
+    return {
+        "memory": lambda: MemoryStateBackend(),
+        "sqlite": lambda: SQLiteStateBackend(os.path.join(tmpdir, "sessions.sqlite3")),
+        "redis (stand-in)": lambda: RedisStateBackend(LocalRedis()),
+    }
+
+
+def sync_writes(backend, sessions, turns):
+    """The naive approach: one store write per turn"""
+    chats = [ChatSession() for _ in range(sessions)]
+    start = time.perf_counter()
+    for i in range(turns):
+        for n, chat in enumerate(chats):
+            chat.turn(i)
+            backend.put_many([(f"s{n}", encode_state(chat.export_state()))])
+    return time.perf_counter() - start
+
+
+async def write_behind(backend, sessions, turns):
+    store = SessionStore(ChatSession, backend=backend, max_sessions=sessions)
+    # Connections stay open across turns, as with the chat WebSocket
+    chats = [await store.acquire(f"s{n}") for n in range(sessions)]
+    start = time.perf_counter()
+    for i in range(turns):
+        for n, chat in enumerate(chats):
+            chat.turn(i)
+            store.touch(f"s{n}")
+    turn_time = time.perf_counter() - start
+    await store.flush()
+    return turn_time, time.perf_counter() - start, store
+
+
+async def handoff(backend_factory):
+    """Worker A serves two turns, worker B continues the same session"""
+    shared = backend_factory()
+    worker_a = SessionStore(ChatSession, backend=shared)
+    worker_b = SessionStore(ChatSession, backend=shared)
+
+    chat = await worker_a.acquire("traveller")
+    chat.turn(0)
+    chat.turn(1)
+    worker_a.touch("traveller")
+    worker_a.release("traveller")
+    await worker_a.flush()
+
+    chat = await worker_b.acquire("traveller")
+    return chat.stats["total_queries"], len(chat.conversation.history)
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+async def main(sessions, turns):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backends = make_backends(tmpdir)
+        total = sessions * turns
+        print(f"{total} turns ({sessions} sessions x {turns})")
+        print(f"{'backend':<18}{'sync us/turn':>14}{'write-behind us/turn':>22}{'incl. flush':>13}{'flushes':>9}")
+        for name, factory in backends.items():
+            sync_time = sync_writes(factory(), sessions, turns)
+            turn_time, flushed_time, store = await write_behind(factory(), sessions, turns)
+            stats = store.state.stats()
+            print(f"{name:<18}{sync_time / total * 1e6:>14.1f}{turn_time / total * 1e6:>22.1f}"
+                  f"{flushed_time / total * 1e6:>13.1f}{stats['flushes']:>9}")
+
+        print()
+        for name, factory in backends.items():
+            if name == "memory":
+                continue
+            queries, messages = await handoff(factory)
+            print(f"handoff via {name}: worker B sees {queries} queries, {messages} messages")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.turns))
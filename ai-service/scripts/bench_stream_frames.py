@@ -0,0 +1,125 @@
+"""
+Streaming output benchmark: one frame per token vs coalesced frames.
+
+Feeds a synthetic token stream at several rates (CPU-bound Ollama, a fast
+GPU backend, a cached answer replayed with no delay) through
+FrameCoalescer and counts frames, payload bytes and wire bytes, plus the
+extra delay coalescing adds to each token. Fails if the slow CPU stream
+is delayed (tokens there arrive too far apart to merge) or if the fast
+streams stop being merged.
+
+    python scripts/bench_stream_frames.py --frame-bytes 64 --frame-delay 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+from stream_frames import FrameCoalescer  # noqa: E402
+
+ANSWER = (
+    "Oh, the pyramids! They never get old for me. The Great Pyramid of Giza is the oldest "
+    "of the Seven Wonders and the only one still standing. Go early in the morning, before "
+    "the tour buses, and walk around to the panoramic viewpoint for the classic photo. "
+    "الأهرامات تحفة حقيقية، ولازم تزورها الصبح بدري. Have you been to Egypt before?"
+)
+RATES = {"cpu 8 tok/s": 8, "gpu 80 tok/s": 80, "fast 400 tok/s": 400, "cache replay": None}
+SLOW_RATE = "cpu 8 tok/s"
+# Scheduling noise allowed on the slow stream, as a fraction of the frame delay
+SLOW_DELAY_TOLERANCE = 0.25
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+
+def tokens():
+    """Roughly token-sized pieces of the answer"""
+    words = ANSWER.split(" ")
+    pieces = []
+    for word in words:
+        pieces.extend(word[i:i + 4] for i in range(0, len(word), 4))
+        pieces[-1] += " "
+    return pieces
+
+
+async def token_stream(rate, sent_at):
+    for piece in tokens():
+        if rate:
+            await asyncio.sleep(1 / rate)
+        sent_at.append(time.perf_counter())
+        yield piece
+
+
+def wire_bytes(payload_bytes):
+    """Server-to-client WebSocket frame: 2-byte header, 4 with extended length"""
+    return payload_bytes + (2 if payload_bytes < 126 else 4)
+
+
+async def run(rate, coalescer):
+    produced, frames = [], []
+    source = token_stream(rate, produced)
+    if coalescer is None:
+        async for chunk in source:
+            frames.append((time.perf_counter(), chunk))
+    else:
+        async for frame in coalescer.frames(source):
+            frames.append((time.perf_counter(), frame))
+
+    # Delay each token spends buffered: the time its frame went out minus the time it was produced
+    pieces = tokens()
+    delays, index = [], 0
+    for sent, frame in frames:
+        covered = 0
+        while index < len(produced) and covered < len(frame):
+            covered += len(pieces[index])
+            delays.append((sent - produced[index]) * 1000)
+            index += 1
+
+    payload = sum(len(frame.encode("utf-8")) for _, frame in frames)
+    wire = sum(wire_bytes(len(frame.encode("utf-8"))) for _, frame in frames)
+    return len(frames), payload, wire, statistics.mean(delays), max(delays)
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+async def main(frame_bytes, frame_delay):
+    print(f"{len(tokens())} tokens, {len(ANSWER.encode('utf-8'))} bytes; "
+          f"coalescing at {frame_bytes} B / {frame_delay * 1000:.0f} ms")
+    print(f"{'stream':<16}{'mode':<11}{'frames':>7}{'payload B':>11}{'wire B':>8}"
+          f"{'mean delay':>12}{'max delay':>11}")
+    results = {}
+    for name, rate in RATES.items():
+        for mode, coalescer in (("per-token", None), ("coalesced", FrameCoalescer(frame_bytes, frame_delay))):
+            frames, payload, wire, mean_delay, max_delay = results[name, mode] = await run(rate, coalescer)
+            print(f"{name:<16}{mode:<11}{frames:>7}{payload:>11}{wire:>8}"
+                  f"{mean_delay:>10.1f}ms{max_delay:>9.1f}ms")
+
+    slow_delay = results[SLOW_RATE, "coalesced"][4]
+    slow_ok = slow_delay <= frame_delay * 1000 * SLOW_DELAY_TOLERANCE
+    merged = [name for name in RATES if name != SLOW_RATE
+              if results[name, "coalesced"][0] < results[name, "per-token"][0]]
+    print(f"{SLOW_RATE}: max added delay {slow_delay:.1f}ms "
+          f"(limit {frame_delay * 1000 * SLOW_DELAY_TOLERANCE:.1f}ms); "
+          f"merged faster streams {len(merged)}/{len(RATES) - 1}")
+    ok = slow_ok and len(merged) == len(RATES) - 1
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frame-bytes", type=int, default=64)
+    parser.add_argument("--frame-delay", type=float, default=0.02)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.frame_bytes, args.frame_delay)) else 1)
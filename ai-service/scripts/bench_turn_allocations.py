@@ -0,0 +1,138 @@
+"""
+Per-turn allocation microbenchmark: reply accumulation and history records.
+
+Replays chat turns of an 800-token reply through the previous bookkeeping
+(full_response += chunk, a dict with an ISO timestamp per message, list
+slicing to trim history) and the current one (chunks joined once,
+HistoryEntry records in ConversationManager's bounded deques). Reports
+time per turn, peak traced memory during a turn, allocated blocks left
+behind, and the retained size of one history message.
+
+    python scripts/bench_turn_allocations.py --turns 2000 --tokens 800
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+from chatbot_core import CONFIG, ConversationManager  # noqa: E402
+from prompt_builder import digest_line  # noqa: E402
+
+# ─────────────────────────────────────────────
+# Bookkeeping variants
+# ─────────────────────────────────────────────
+
+class LegacyConversation:
+    """History as the chatbot kept it before: dicts, ISO timestamps, slicing"""
+
+    def __init__(self):
+        self.history = []
+        self.digest = []
+
+    def add_message(self, role, content):
+        self.history.append({
+            "role": role,
+            "content": content,
+            "timestamp": datetime.now().isoformat()
+        })
+        limit = CONFIG["conversation_history_limit"] * 2
+        if len(self.history) > limit:
+            self.digest.extend(digest_line(m) for m in self.history[:-limit])
+            self.digest = self.digest[-CONFIG["digest_max_lines"]:]
+            self.history = self.history[-limit:]
+
+
+def legacy_turn(conversation, user_input, tokens):
+    full_response = ""
+    for chunk in tokens:
+        full_response += chunk
+    conversation.add_message("user", user_input)
+    conversation.add_message("assistant", full_response)
+
+
+def current_turn(conversation, user_input, tokens):
+    parts = []
+    for chunk in tokens:
+        parts.append(chunk)
+    full_response = "".join(parts)
+    conversation.add_message("user", user_input)
+    conversation.add_message("assistant", full_response)
+
+# ─────────────────────────────────────────────
+# Measurement
+# ─────────────────────────────────────────────
+
+def reply_tokens(count):
+    words = ["Karnak ", "is ", "a ", "vast ", "temple ", "complex ", "in ", "Luxor", ", ",
+             "built ", "over ", "two ", "thousand ", "years", ". "]
+    # Fresh string objects, like chunks decoded from the model stream
+    return ["".join(list(words[i % len(words)])) for i in range(count)]
+
+
+def measure(turn, conversation, turns, tokens):
+    user_input = "Tell me about Karnak temple in Luxor"
+    # Warm up until history is full, so trimming is part of every measured turn
+    for _ in range(CONFIG["conversation_history_limit"] + CONFIG["digest_max_lines"]):
+        turn(conversation, user_input, tokens)
+
+    start = time.perf_counter()
+    for _ in range(turns):
+        turn(conversation, user_input, tokens)
+    per_turn_us = (time.perf_counter() - start) / turns * 1e6
+
+    tracemalloc.start()
+    peaks = []
+    blocks_before = sys.getallocatedblocks()
+    for _ in range(50):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        turn(conversation, user_input, tokens)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    leftover = (sys.getallocatedblocks() - blocks_before) / 50
+    return per_turn_us, max(peaks), leftover
+
+
+def entry_bytes(entry):
+    """Retained size of one history message, excluding the shared role and content strings"""
+    if isinstance(entry, dict):
+        return sys.getsizeof(entry) + sys.getsizeof(entry["timestamp"])
+    return sys.getsizeof(entry) + sys.getsizeof(entry.timestamp)
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+def main(turns, token_count):
+    tokens = reply_tokens(token_count)
+    reply_bytes = len("".join(tokens).encode("utf-8"))
+    print(f"{turns} turns, {token_count}-token replies ({reply_bytes} B), "
+          f"history limit {CONFIG['conversation_history_limit'] * 2} messages")
+    print(f"{'bookkeeping':<34}{'us/turn':>9}{'peak B/turn':>13}{'blocks left':>13}{'B/message':>11}")
+
+    variants = (
+        ("+= / dict + isoformat / slicing", legacy_turn, LegacyConversation()),
+        ("join / HistoryEntry / deque", current_turn, ConversationManager()),
+    )
+    for name, turn, conversation in variants:
+        per_turn_us, peak, leftover = measure(turn, conversation, turns, tokens)
+        size = entry_bytes(conversation.history[-1])
+        print(f"{name:<34}{per_turn_us:>9.1f}{peak:>13}{leftover:>13.1f}{size:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--tokens", type=int, default=800)
+    args = parser.parse_args()
+    main(args.turns, args.tokens)
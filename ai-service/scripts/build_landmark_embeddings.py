@@ -0,0 +1,60 @@
+"""
+Precompute landmark full_text embeddings for the chatbot.
+
+Writes CONFIG["embedding_index_path"].npy/.json (plus an IVF partition for
+large catalogs), which KnowledgeBase memory-maps at load.
+
+    python scripts/build_landmark_embeddings.py                 # Ollama embedding_model
+    python scripts/build_landmark_embeddings.py --backend hashing
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+from chatbot_core import CONFIG, KnowledgeBase, create_embedder  # noqa: E402
+from embedding_index import EmbeddingIndex  # noqa: E402
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+def main(args):
+    if args.backend:
+        CONFIG["embedding_backend"] = args.backend
+
+    kb = KnowledgeBase()
+    embedder = create_embedder()
+    ids = list(kb.landmarks.keys())
+    texts = [kb.landmarks[i]["full_text"] for i in ids]
+
+    start = time.perf_counter()
+    index = EmbeddingIndex.build(ids, texts, embedder, batch_size=args.batch_size,
+                                 fingerprint=kb.dataset_fingerprint())
+    print(f"embedded {len(ids)} landmarks with '{embedder.model}' "
+          f"in {time.perf_counter() - start:.1f}s (dim={index.vectors.shape[1]})")
+
+    if len(index) >= CONFIG["embedding_ivf_threshold"]:
+        num_lists = int(math.sqrt(len(index)))
+        index.build_ivf(num_lists)
+        print(f"built IVF partition with {num_lists} lists")
+
+    index.save(args.output)
+    print(f"saved {args.output}.npy")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["ollama", "hashing"])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--output", default=CONFIG["embedding_index_path"])
+    main(parser.parse_args())
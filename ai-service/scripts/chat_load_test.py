@@ -0,0 +1,255 @@
+"""
+Concurrent load test for the chat WebSocket and the storytelling endpoint.
+
+Opens N chat sessions at once, sends one message on each and measures time
+to first chunk and total stream time. If sessions stream in parallel the
+"parallelism" figure approaches N; if one session blocks the event loop
+it stays near 1. With the LLM dispatcher it is capped by
+LLM_MAX_CONCURRENT; queued and rejected (busy) turns are counted.
+Storytelling clients POST a place and wait for the whole story.
+
+Example (fully offline, against the fake model server):
+    python scripts/chat_load_test.py --spawn --clients 300 --stories 300 \
+        --backend openai --llm-concurrency 300 --fake-rate 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+import websockets
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHATBOT_DIR = os.path.join(BASE_DIR, "chatbot")
+
+FAKE_OLLAMA_PORT = 11435
+CHAT_PORT = 8001
+STORY_PORT = 8003
+
+STORY_PAYLOAD = {
+    "name": "Karnak Temple",
+    "description": "A vast temple complex in Luxor built over two thousand years.",
+}
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+
+def spawn_servers(args):
+    """Start the fake model server, the chat app and the storytelling router locally"""
+    env = dict(
+        os.environ,
+        OLLAMA_BASE_URL=f"http://127.0.0.1:{FAKE_OLLAMA_PORT}/api",
+        LLM_BACKEND=args.backend,
+        LLM_BASE_URL=f"http://127.0.0.1:{FAKE_OLLAMA_PORT}/v1",
+        LLM_MODEL=os.getenv("FAKE_OLLAMA_MODEL", "mistral:7b"),
+        STORY_LLM_BASE_URL=f"http://127.0.0.1:{FAKE_OLLAMA_PORT}/v1",
+        GROQ_API_KEY=os.getenv("GROQ_API_KEY", "offline"),
+    )
+    if args.fake_rate:
+        env["FAKE_OLLAMA_TOKENS_PER_SEC"] = str(args.fake_rate)
+    if args.fake_latency is not None:
+        env["FAKE_OLLAMA_LATENCY"] = str(args.fake_latency)
+    if args.llm_concurrency:
+        env["LLM_MAX_CONCURRENT"] = str(args.llm_concurrency)
+        env.setdefault("LLM_MAX_QUEUE", str(max(64, args.clients)))
+
+    def serve(app, port, cwd):
+        return subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", app,
+             "--port", str(port), "--log-level", "warning"],
+            cwd=cwd, env=env,
+        )
+
+    procs = [serve("fake_ollama:app", FAKE_OLLAMA_PORT, CHATBOT_DIR)]
+    if args.clients:
+        procs.append(serve("app:app", CHAT_PORT, CHATBOT_DIR))
+    if args.stories:
+        # main.py would also load the recommender; serve only the storytelling router
+        procs.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve-storytelling"],
+            cwd=BASE_DIR, env=env,
+        ))
+    return procs
+
+
+def serve_storytelling():
+    import uvicorn
+    from fastapi import FastAPI
+
+    sys.path.insert(0, BASE_DIR)
+    from storytelling.storytelling import router
+
+    app = FastAPI()
+    app.include_router(router)
+    uvicorn.run(app, port=STORY_PORT, log_level="warning")
+
+
+async def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready")
+
+
+async def run_client(ws_url: str, session_id: str, message: str, started: float):
+    async with websockets.connect(f"{ws_url}/{session_id}") as ws:
+        sent = time.perf_counter()
+        await ws.send(json.dumps({"message": message}))
+
+        first = None
+        chunks = 0
+        queued = busy = False
+        while True:
+            frame = await ws.recv()
+            if frame == "__END__":
+                break
+            if frame.startswith("__QUEUE__:"):
+                queued = True
+                continue
+            if frame == "__BUSY__":
+                busy = True
+                continue
+            if first is None:
+                first = time.perf_counter()
+            chunks += 1
+
+        done = time.perf_counter()
+
+    return {
+        "ttft": (first or done) - sent,
+        "duration": done - sent,
+        "finished_at": done - started,
+        "chunks": chunks,
+        "queued": queued,
+        "busy": busy,
+    }
+
+
+async def run_story_client(http: httpx.AsyncClient, url: str, started: float):
+    sent = time.perf_counter()
+    try:
+        response = await http.post(url, json=STORY_PAYLOAD)
+        ok = response.status_code == 200 and bool(response.json().get("story"))
+    except httpx.HTTPError:
+        ok = False
+    done = time.perf_counter()
+    return {"duration": done - sent, "finished_at": done - started, "ok": ok}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report_chat(results, wall):
+    served = [r for r in results if not r["busy"]] or results
+    ttfts = [r["ttft"] for r in served]
+    durations = [r["duration"] for r in served]
+
+    print(f"chat clients:     {len(results)}")
+    print(f"ttft mean / p95:  {statistics.mean(ttfts):.3f}s / {percentile(ttfts, 95):.3f}s")
+    print(f"stream mean/p95:  {statistics.mean(durations):.3f}s / {percentile(durations, 95):.3f}s")
+    print(f"chunks total:     {sum(r['chunks'] for r in results)}")
+    print(f"queued / busy:    {sum(r['queued'] for r in results)} / {sum(r['busy'] for r in results)}")
+    print(f"parallelism:      {sum(durations) / wall:.1f}x (ideal {len(results)}x)")
+
+
+def report_stories(results, wall):
+    durations = [r["duration"] for r in results]
+
+    print(f"story clients:    {len(results)}")
+    print(f"latency mean/p95: {statistics.mean(durations):.3f}s / {percentile(durations, 95):.3f}s")
+    print(f"failed:           {sum(not r['ok'] for r in results)}")
+    print(f"parallelism:      {sum(durations) / wall:.1f}x (ideal {len(results)}x)")
+
+def report_turns(turns):
+    """Server-side view from /metrics"""
+    print(f"server turns:     {turns['turns']} {turns['outcomes']}")
+    for name in ("ttft_ms", "queue_ms", "retrieval_ms", "classify_ms", "prompt_tokens", "tokens_per_second"):
+        summary = turns[name]
+        if summary["count"]:
+            print(f"  {name:<18} p50 {summary['p50']:>9.1f}  p95 {summary['p95']:>9.1f}  max {summary['max']:>9.1f}")
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+async def main(args):
+    procs = spawn_servers(args) if args.spawn else []
+
+    try:
+        if args.spawn:
+            await wait_ready(f"http://127.0.0.1:{FAKE_OLLAMA_PORT}/api/tags")
+            if args.clients:
+                await wait_ready(f"http://127.0.0.1:{CHAT_PORT}/health")
+            if args.stories:
+                await wait_ready(f"http://127.0.0.1:{STORY_PORT}/openapi.json")
+
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(timeout=120, limits=limits) as http:
+            started = time.perf_counter()
+            chat = [run_client(args.url, f"load-{i}", args.message, started)
+                    for i in range(args.clients)]
+            stories = [run_story_client(http, args.story_url, started)
+                       for _ in range(args.stories)]
+            results = await asyncio.gather(*chat, *stories)
+            wall = time.perf_counter() - started
+
+            turns = None
+            if args.clients and args.server_metrics:
+                turns = (await http.get(f"http://127.0.0.1:{CHAT_PORT}/metrics")).json()["turns"]
+
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+    print(f"wall time:        {wall:.2f}s")
+    if args.clients:
+        report_chat(results[:args.clients], wall)
+    if args.stories:
+        report_stories(results[args.clients:], wall)
+    if turns:
+        report_turns(turns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=f"ws://127.0.0.1:{CHAT_PORT}/chat")
+    parser.add_argument("--story-url", default=f"http://127.0.0.1:{STORY_PORT}/storytelling")
+    parser.add_argument("--clients", type=int, default=20, help="chat WebSocket clients")
+    parser.add_argument("--stories", type=int, default=0, help="storytelling clients")
+    parser.add_argument("--message", default="Tell me about the pyramids in Giza")
+    parser.add_argument("--spawn", action="store_true",
+                        help="start fake_ollama, the chat app and the storytelling router locally")
+    parser.add_argument("--backend", choices=["ollama", "openai"], default="ollama",
+                        help="protocol the spawned chat app uses to reach the fake server")
+    parser.add_argument("--fake-rate", type=float, help="fake server tokens per second")
+    parser.add_argument("--fake-latency", type=float, help="fake server seconds to first token")
+    parser.add_argument("--llm-concurrency", type=int, help="LLM_MAX_CONCURRENT for the spawned chat app")
+    parser.add_argument("--server-metrics", action="store_true",
+                        help="also print the chat app's /metrics turn summary")
+    parser.add_argument("--serve-storytelling", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve_storytelling:
+        serve_storytelling()
+    else:
+        asyncio.run(main(args))
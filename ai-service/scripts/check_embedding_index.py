@@ -0,0 +1,148 @@
+"""
+Checks the landmark embedding index end to end with the hashing embedder.
+
+Uses the deterministic HashingEmbedder (no Ollama needed) on the real
+landmark dataset and checks:
+  * build/save/load: ids, model and fingerprint survive, vectors are memory-mapped
+  * flat top-k:      matches a brute-force scan, a landmark finds itself first
+  * IVF top-k:       lists partition every row, probing all lists equals the
+                     flat result, and recall@k with the default nprobe
+  * KnowledgeBase:   search_semantic uses a matching index and ignores one
+                     built for another dataset
+
+    python scripts/check_embedding_index.py
+"""
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+from chatbot_core import CONFIG, KnowledgeBase  # noqa: E402
+from embedding_index import EmbeddingIndex, HashingEmbedder  # noqa: E402
+
+# ─────────────────────────────────────────────
+# Checks
+# ─────────────────────────────────────────────
+
+def brute_force(vectors, query, limit):
+    scores = np.asarray(vectors) @ query
+    top = np.argsort(-scores, kind="stable")[:limit]
+    return [float(scores[i]) for i in top]
+
+
+def check_round_trip(index, path):
+    index.save(path)
+    loaded = EmbeddingIndex.load(path)
+    ok = (loaded.ids == index.ids and loaded.model == index.model
+          and loaded.fingerprint == index.fingerprint
+          and isinstance(loaded.vectors, np.memmap)
+          and np.array_equal(np.asarray(loaded.vectors), index.vectors))
+    return ok, loaded
+
+
+def check_flat(index, samples, k):
+    """Same scores as a brute-force scan, and each sampled row ranks itself first"""
+    same = self_first = 0
+    for row in samples:
+        query = np.asarray(index.vectors[row])
+        results = index.search(query, k)
+        expected = brute_force(index.vectors, query, k)
+        same += np.allclose([score for _, score in results], expected, atol=1e-5)
+        # Duplicate texts tie at 1.0; any of them counts
+        self_first += results[0][1] >= 0.999 and index.ids[row] in {
+            landmark_id for landmark_id, score in results if score >= 0.999
+        }
+    return same, self_first
+
+
+def check_ivf(index, path, samples, k, nprobe):
+    num_lists = max(2, int(math.sqrt(len(index))))
+    index.build_ivf(num_lists)
+    _, loaded = check_round_trip(index, path)
+
+    rows = np.concatenate(loaded.lists)
+    partitioned = len(rows) == len(index) and len(np.unique(rows)) == len(index)
+
+    exhaustive = recall_hits = 0
+    for row in samples:
+        query = np.asarray(index.vectors[row])
+        flat = [score for _, score in EmbeddingIndex(index.ids, index.vectors, index.model).search(query, k)]
+        every_list = [score for _, score in loaded.search(query, k, nprobe=num_lists)]
+        exhaustive += np.allclose(every_list, flat, atol=1e-5)
+        probed = [score for _, score in loaded.search(query, k, nprobe=nprobe)]
+        recall_hits += sum(1 for score in probed if score >= flat[-1] - 1e-6)
+    recall = recall_hits / (len(samples) * k)
+    return num_lists, partitioned, exhaustive, recall
+
+
+def check_knowledge_base(index, path):
+    """A matching index is used; one whose rows no longer line up is ignored"""
+    CONFIG["embedding_index_path"] = path
+    index.centroids, index.lists = None, []
+    index.save(path)
+    kb = KnowledgeBase()
+    landmark = next(iter(kb.landmarks.values()))
+    found = kb.search_semantic(f"{landmark['name']} in {landmark['city']}", limit=5)
+    used = kb.embeddings is not None and landmark["id"] in [lm["id"] for lm in found]
+
+    # The same vectors under a different dataset (rows shifted by one)
+    stale = EmbeddingIndex(index.ids, np.roll(index.vectors, 1, axis=0), index.model,
+                           fingerprint="another dataset")
+    stale.save(path)
+    ignored = KnowledgeBase().embeddings is None
+    return used, ignored
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+def main(samples_count, k, nprobe):
+    CONFIG["embedding_backend"] = "hashing"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "landmark_embeddings")
+        CONFIG["embedding_index_path"] = path
+        kb = KnowledgeBase()
+        ids = list(kb.landmarks)
+        texts = [kb.landmarks[i]["full_text"] for i in ids]
+        index = EmbeddingIndex.build(ids, texts, HashingEmbedder(), fingerprint=kb.dataset_fingerprint())
+
+        rng = np.random.default_rng(0)
+        samples = rng.choice(len(index), size=min(samples_count, len(index)), replace=False)
+
+        round_trip, loaded = check_round_trip(index, path)
+        same, self_first = check_flat(loaded, samples, k)
+        num_lists, partitioned, exhaustive, recall = check_ivf(index, path, samples, k, nprobe)
+        used, ignored = check_knowledge_base(index, path)
+
+    n = len(samples)
+    print(f"{len(index)} landmarks, dim {index.vectors.shape[1]}, {n} sampled queries, k={k}")
+    print(f"round trip (memmap):     {'ok' if round_trip else 'MISMATCH'}")
+    print(f"flat vs brute force:     {same}/{n}, landmark ranks itself first {self_first}/{n}")
+    print(f"IVF {num_lists} lists:            partition {'ok' if partitioned else 'BROKEN'}, "
+          f"all lists == flat {exhaustive}/{n}, recall@{k} nprobe={nprobe}: {recall:.1%}")
+    print(f"KnowledgeBase:           matching index used {used}, stale index ignored {ignored}")
+
+    ok = (round_trip and same == n and self_first == n and partitioned
+          and exhaustive == n and used and ignored)
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+    sys.exit(0 if main(args.samples, args.k, args.nprobe) else 1)
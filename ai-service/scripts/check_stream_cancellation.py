@@ -0,0 +1,154 @@
+"""
+Checks that abandoned chat turns stop the upstream Ollama generation.
+
+Starts a slow fake Ollama server and the chat app locally, then:
+  * disconnect: the client closes the WebSocket mid-answer
+  * supersede:  the client sends a new message mid-answer
+and reports how quickly the fake server saw its stream dropped, how many
+tokens it generated after the client stopped listening, and whether the
+LLM dispatcher got its slot back.
+
+    python scripts/check_stream_cancellation.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+import websockets
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+FAKE_OLLAMA_PORT = 11439
+CHAT_PORT = 8002
+os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{FAKE_OLLAMA_PORT}/api"
+
+import fake_ollama  # noqa: E402
+from local_servers import serve_in_thread  # noqa: E402
+
+STREAMS = fake_ollama.STREAM_STATE
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+
+async def wait_closed(timeout: float = 5.0) -> float:
+    """Seconds until the fake server has no open generation left"""
+    start = time.perf_counter()
+    while STREAMS["open"] and time.perf_counter() - start < timeout:
+        await asyncio.sleep(0.005)
+    return time.perf_counter() - start
+
+
+async def read_until_text(ws, chunks: int):
+    """Read frames until `chunks` answer chunks have arrived"""
+    seen = 0
+    while seen < chunks:
+        frame = await ws.recv()
+        if not frame.startswith("__"):
+            seen += 1
+
+
+async def llm_active() -> int:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"http://127.0.0.1:{CHAT_PORT}/llm/metrics")
+        return response.json()["active"]
+
+# ─────────────────────────────────────────────
+# Scenarios
+# ─────────────────────────────────────────────
+
+async def check_disconnect():
+    url = f"ws://127.0.0.1:{CHAT_PORT}/chat/cancel-disconnect"
+    before = dict(STREAMS)
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"message": "Tell me about the pyramids of Giza"}))
+        await read_until_text(ws, 3)
+    tokens_at_close = STREAMS["tokens"]
+    closed_after = await wait_closed()
+    await asyncio.sleep(0.2)
+    return {
+        "closed_after_ms": closed_after * 1000,
+        "aborted": STREAMS["aborted"] - before["aborted"],
+        "tokens_after_close": STREAMS["tokens"] - tokens_at_close,
+        "llm_active": await llm_active(),
+    }
+
+
+async def check_supersede():
+    url = f"ws://127.0.0.1:{CHAT_PORT}/chat/cancel-supersede"
+    before = dict(STREAMS)
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"message": "Tell me about the pyramids of Giza"}))
+        await read_until_text(ws, 3)
+
+        sent_at = time.perf_counter()
+        await ws.send(json.dumps({"message": "Actually, what about Luxor temples?"}))
+        first_end = None
+        ends = 0
+        while ends < 2:
+            frame = await ws.recv()
+            if frame == "__END__":
+                ends += 1
+                if first_end is None:
+                    first_end = time.perf_counter() - sent_at
+
+    return {
+        "old_answer_ended_ms": first_end * 1000,
+        "aborted": STREAMS["aborted"] - before["aborted"],
+        "completed": STREAMS["completed"] - before["completed"],
+        "llm_active": await llm_active(),
+    }
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+async def main(tokens_per_second, num_tokens):
+    # Each answer takes num_tokens / tokens_per_second seconds if left running
+    fake_ollama.FAKE_CONFIG.update(tokens_per_second=tokens_per_second, num_tokens=num_tokens,
+                                   first_token_latency=0.05)
+    fake_server, fake_thread = await asyncio.to_thread(serve_in_thread, fake_ollama.app, FAKE_OLLAMA_PORT)
+
+    import app as chat_app  # noqa: E402 (reads OLLAMA_BASE_URL on import)
+    chat_server, chat_thread = await asyncio.to_thread(serve_in_thread, chat_app.app, CHAT_PORT)
+
+    try:
+        disconnect = await check_disconnect()
+        supersede = await check_supersede()
+    finally:
+        chat_server.should_exit = fake_server.should_exit = True
+        await asyncio.to_thread(chat_thread.join)
+        await asyncio.to_thread(fake_thread.join)
+
+    print(f"Upstream answer: {num_tokens} tokens at {tokens_per_second:.0f} tok/s "
+          f"({num_tokens / tokens_per_second:.0f}s if never cancelled)")
+    print(f"disconnect: upstream closed {disconnect['closed_after_ms']:.0f} ms after the client left, "
+          f"{disconnect['tokens_after_close']} tokens generated after, "
+          f"aborted={disconnect['aborted']}, llm_active={disconnect['llm_active']}")
+    print(f"supersede:  old answer ended {supersede['old_answer_ended_ms']:.0f} ms after the new message, "
+          f"aborted={supersede['aborted']}, completed={supersede['completed']}, "
+          f"llm_active={supersede['llm_active']}")
+
+    ok = (disconnect["aborted"] == 1 and disconnect["llm_active"] == 0
+          and supersede["aborted"] == 1 and supersede["completed"] >= 1
+          and supersede["llm_active"] == 0 and STREAMS["open"] == 0)
+    print("OK" if ok else "FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens-per-second", type=float, default=20.0)
+    parser.add_argument("--num-tokens", type=int, default=400)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.tokens_per_second, args.num_tokens)) else 1)
@@ -0,0 +1,110 @@
+"""
+Offline accuracy and latency evaluation for the local tourism classifier.
+
+Reports how many messages the classifier decides on its own (coverage),
+its accuracy on those, and per-message latency. Messages below the
+confidence threshold would fall back to the LLM in production.
+
+    python scripts/eval_tourism_classifier.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+from chatbot_core import CONFIG, ConversationManager, KnowledgeBase  # noqa: E402
+
+# ─────────────────────────────────────────────
+# Labelled messages (text, is_tourism)
+# ─────────────────────────────────────────────
+
+LABELLED = [
+    ("Tell me about the pyramids", True),
+    ("What's the best time to visit Egypt?", True),
+    ("أنا عايز أعرف عن المتحف المصري", True),
+    ("Quels sont les meilleurs endroits au Caire?", True),
+    ("Where can I buy souvenirs in Khan el Khalili?", True),
+    ("Is the Egyptian Museum open on Fridays?", True),
+    ("Recommend a Nile cruise from Luxor to Aswan", True),
+    ("How much are tickets for the Giza plateau?", True),
+    ("Plan a 3 day itinerary in Cairo", True),
+    ("What should I eat in Alexandria?", True),
+    ("Do I need a visa for Egypt?", True),
+    ("Any good parks for kids in Giza?", True),
+    ("What is the Cairo Tower?", True),
+    ("عايز أزور الأهرامات", True),
+    ("فين أحسن شاطئ في مصر؟", True),
+    ("Je veux visiter les pyramides", True),
+    ("Is it safe to walk around Zamalek at night?", True),
+    ("Best hotels near the sphinx", True),
+    ("Tell me about Al-Azhar Mosque", True),
+    ("Which temples are worth seeing?", True),
+    ("Hello! How are you?", False),
+    ("مرحباً! عامل إيه؟", False),
+    ("Thanks!", False),
+    ("Hi", False),
+    ("Who are you?", False),
+    ("What is your name?", False),
+    ("bonjour ça va", False),
+    ("شكرا جزيلا", False),
+    ("Can you help me with my python homework?", False),
+    ("What is 2 + 2?", False),
+    ("Write me a poem about my cat", False),
+    ("good morning", False),
+    ("I'm bored", False),
+    ("What's the capital of Japan?", False),
+    ("Explain quantum computing simply", False),
+]
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+def main(repeats: int = 200):
+    kb = KnowledgeBase()
+    conversation = ConversationManager()
+    classifier = kb.classifier
+    threshold = CONFIG["classifier_confidence_threshold"]
+
+    decided = correct = 0
+    overall_correct = 0
+    latencies = []
+    misses = []
+
+    for text, label in LABELLED:
+        interests = conversation.extract_interests(text)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            is_tourism, confidence = classifier.classify(text, interests)
+        latencies.append((time.perf_counter() - start) / repeats)
+
+        overall_correct += is_tourism == label
+        if confidence >= threshold:
+            decided += 1
+            correct += is_tourism == label
+            if is_tourism != label:
+                misses.append((text, label, confidence))
+
+    total = len(LABELLED)
+    print(f"messages:               {total}")
+    print(f"decided locally:        {decided} ({decided / total:.0%}), rest go to the LLM")
+    print(f"accuracy when decided:  {correct / decided:.1%}" if decided else "accuracy: n/a")
+    print(f"accuracy on all labels: {overall_correct / total:.1%}")
+    print(f"latency mean / max:     {statistics.mean(latencies) * 1e6:.1f}µs / "
+          f"{max(latencies) * 1e6:.1f}µs per message")
+
+    for text, label, confidence in misses:
+        print(f"  wrong: {text!r} expected={label} confidence={confidence:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Helpers for scripts that run the fake model server or the chat app in-process.
+"""
+
+import threading
+import time
+
+import uvicorn
+
+
+def serve_in_thread(app, port):
+    """Run an ASGI app on its own event loop, so blocking calls in one can't stall the other"""
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
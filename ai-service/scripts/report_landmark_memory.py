@@ -0,0 +1,91 @@
+"""
+Memory report for landmark storage: legacy dict-of-dicts vs Landmark records.
+
+Replicates the catalogue to each size and measures the bytes still allocated
+per landmark (tracemalloc), field strings included, for both representations.
+
+    python scripts/report_landmark_memory.py --sizes 477 50000
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+# ─────────────────────────────────────────────
+# Paths
+# ─────────────────────────────────────────────
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "chatbot"))
+
+from chatbot_core import KnowledgeBase  # noqa: E402
+from landmark_store import Landmark, render_description, render_full_text  # noqa: E402
+
+# ─────────────────────────────────────────────
+# Builders
+# ─────────────────────────────────────────────
+
+def rows_for(base, size):
+    """Plain field tuples, copied so both builders allocate their own strings"""
+    rows = list(base.values())
+    for i in range(size):
+        lm = rows[i % len(rows)]
+        yield (f"landmark_{i}", "".join(lm.name), "".join(lm.city), "".join(lm.subcategory),
+               lm.rating if lm.rated else None, "".join(lm.address), lm.latitude, lm.longitude)
+
+
+def build_legacy(rows):
+    """The previous representation: one dict per row with pre-rendered text"""
+    landmarks = {}
+    for landmark_id, name, city, subcategory, rating, address, lat, lon in rows:
+        record = Landmark(landmark_id, name, city, subcategory, rating, address, lat, lon)
+        landmarks[landmark_id] = {
+            "id": landmark_id,
+            "name": name,
+            "city": city,
+            "subcategory": subcategory,
+            "rating": rating if rating is not None else 0.0,
+            "address": address,
+            "latitude": lat,
+            "longitude": lon,
+            "description": render_description.__wrapped__(record),
+            "full_text": render_full_text.__wrapped__(record),
+        }
+    return landmarks
+
+
+def build_compact(rows):
+    return {
+        landmark_id: Landmark(landmark_id, name, city, subcategory, rating, address, lat, lon)
+        for landmark_id, name, city, subcategory, rating, address, lat, lon in rows
+    }
+
+
+def measure(builder, base, size):
+    tracemalloc.start()
+    result = builder(rows_for(base, size))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+
+def main(sizes):
+    base = KnowledgeBase().landmarks
+
+    print(f"{'landmarks':>10} {'legacy B/lm':>12} {'compact B/lm':>13} {'saved':>7}")
+    for size in sizes:
+        legacy = measure(build_legacy, base, size)
+        compact = measure(build_compact, base, size)
+        print(f"{size:>10} {legacy / size:>12.0f} {compact / size:>13.0f} "
+              f"{1 - compact / legacy:>6.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[477, 50000])
+    main(parser.parse_args().sizes)
@@ -1,19 +1,25 @@
 from fastapi import APIRouter, HTTPException
 import os
-import requests
 import traceback
 
+from chatbot.llm_backends import LLMBackendError, OpenAIBackend
+
 router = APIRouter(
     prefix="/storytelling",
     tags=["storytelling"],
 )
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+# Any OpenAI-compatible API; point at fake_ollama's /v1 for offline load tests
+STORY_LLM_BASE_URL = os.getenv("STORY_LLM_BASE_URL", "https://api.groq.com/openai/v1")
+STORY_LLM_MODEL = os.getenv("STORY_LLM_MODEL", "llama-3.1-8b-instant")
+
+# One pooled async client for every request instead of a new connection each
+backend = OpenAIBackend(STORY_LLM_BASE_URL, STORY_LLM_MODEL, api_key=GROQ_API_KEY, read_timeout=60)
 
 
 @router.post("")
-def generate_story(payload: dict):
+async def generate_story(payload: dict):
     try:
         name = payload.get("name")
         description = payload.get("description")
@@ -31,35 +37,20 @@ Name: {name}
 Description: {description}
 """
 
-        response = requests.post(
-            GROQ_URL,
-            headers={
-                "Authorization": f"Bearer {GROQ_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "llama-3.1-8b-instant",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.7,
-                "max_tokens": 400,
-            },
-            timeout=60,
+        story = await backend.chat(
+            [{"role": "user", "content": prompt}],
+            {"temperature": 0.7, "num_predict": 400},
         )
 
-        print("GROQ STATUS:", response.status_code)
-        print("GROQ RAW:", response.text)
-
-        data = response.json()
-
-        if "choices" not in data or not data["choices"]:
-            raise HTTPException(status_code=500, detail=data)
-
         return {
-            "story": data["choices"][0]["message"]["content"]
+            "story": story
         }
 
     except HTTPException:
         raise
+    except LLMBackendError as e:
+        print("❌ STORYTELLING LLM ERROR:", e)
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception:
         print("❌ STORYTELLING CRASH")
         traceback.print_exc()
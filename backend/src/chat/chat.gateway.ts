@@ -58,7 +58,7 @@ export class ChatGateway
   // ─────────────────────────────────────────────
   @SubscribeMessage('message')
   async handleMessage(
-    @MessageBody() body: { message: string },
+    @MessageBody() body: { message: string; location?: { lat: number; lon: number } },
     @ConnectedSocket() client: Socket,
   ) {
     const userId = client.data.userId;
@@ -84,10 +84,20 @@ export class ChatGateway
       pyWs.on('message', (data) => {
         const chunk = data.toString();
 
+        if (chunk.startsWith('__QUEUE__:')) {
+          client.emit('queue', Number(chunk.slice('__QUEUE__:'.length)));
+          return;
+        }
+
+        if (chunk === '__BUSY__') {
+          client.emit('busy');
+          return;
+        }
+
         if (chunk === '__END__') {
           const full = this.responseBuffers.get(client.id) || '';
 
-          this.chatService.saveAssistantMessage(userId, full);
+          if (full) this.chatService.saveAssistantMessage(userId, full);
 
           this.responseBuffers.set(client.id, '');
           client.emit('end');
@@ -111,7 +121,8 @@ export class ChatGateway
       });
     }
 
-    const payload = JSON.stringify({ message: body.message });
+    // The AI service uses the location for nearby landmarks; it ignores a malformed one
+    const payload = JSON.stringify({ message: body.message, location: body.location });
 
     if (pyWs.readyState === WebSocket.OPEN) {
       pyWs.send(payload);